@@ -0,0 +1,147 @@
+# core/analitik_kelas.py
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import SnapshotKelas, SubTopik, User
+from .papan_peringkat import papan_peringkat
+from .statistik import pertanyaan_tersulit
+
+_KUNCI_SEDANG_DIBUAT = "ekosphere:snapshot_kelas:sedang_dibuat"
+
+
+def hitung_kpi_kelas():
+    """
+    Menghitung seluruh KPI dashboard guru (dulu dihitung langsung di
+    teacher_dashboard_view) sebagai dict yang bisa disimpan di JSONField.
+    """
+    siswa_list = User.objects.filter(role="Siswa")
+    total_siswa = siswa_list.count() or 1
+    # Penghitung per modul dibaca dalam satu query (LEFT JOIN ke StatistikModul)
+    semua_materi = list(
+        SubTopik.objects.select_related("statistik").order_by("topik__urutan", "urutan")
+    )
+    progres_modul_kelas = []
+    total_modul_selesai = 0
+    for materi in semua_materi:
+        statistik = getattr(materi, "statistik", None)
+        siswa_selesai_count = statistik.jumlah_selesai if statistik else 0
+        total_modul_selesai += siswa_selesai_count
+        persentase = (siswa_selesai_count / total_siswa) * 100
+        progres_modul_kelas.append(
+            {
+                "nama_materi": materi.judul,
+                "persentase": round(persentase),
+                "label": f"{siswa_selesai_count} dari {total_siswa} siswa",
+            }
+        )
+    total_modul_seharusnya = total_siswa * len(semua_materi)
+    avg_completion_rate = (
+        (total_modul_selesai / total_modul_seharusnya) * 100
+        if total_modul_seharusnya > 0
+        else 0
+    )
+    one_week_ago = timezone.now() - timezone.timedelta(days=7)
+    siswa_aktif_count = siswa_list.filter(last_login__gte=one_week_ago).count()
+    return {
+        "progres_modul_kelas": progres_modul_kelas,
+        "siswa_berprestasi": papan_peringkat.teratas(3),
+        "siswa_perlu_perhatian": papan_peringkat.terbawah(3, kurang_dari=50),
+        "kpi_avg_completion": round(avg_completion_rate),
+        "kpi_siswa_aktif": f"{siswa_aktif_count} dari {total_siswa} siswa",
+        # Pertanyaan tersulit (tingkat kesalahan tertinggi) dari tabel rekap berindeks
+        "peta_kesulitan": [
+            {
+                "teks_pertanyaan": statistik.pertanyaan.teks_pertanyaan,
+                "jumlah_salah": statistik.jumlah_salah,
+                "jumlah_percobaan": statistik.jumlah_percobaan,
+            }
+            for statistik in pertanyaan_tersulit(5)
+        ],
+        "total_siswa": total_siswa,
+    }
+
+
+def buat_snapshot_kelas(simpan=None):
+    """
+    Menghitung KPI dan menyimpannya sebagai SnapshotKelas baru. Jika `simpan`
+    diberikan, hanya `simpan` snapshot terbaru yang dipertahankan.
+    """
+    mulai = time.perf_counter()
+    data = hitung_kpi_kelas()
+    snapshot = SnapshotKelas.objects.create(
+        dibuat_pada=timezone.now(),
+        durasi_ms=round((time.perf_counter() - mulai) * 1000, 3),
+        data=data,
+    )
+    if simpan:
+        batas = (
+            SnapshotKelas.objects.order_by("-dibuat_pada")
+            .values_list("dibuat_pada", flat=True)[simpan - 1 : simpan]
+            .first()
+        )
+        if batas is not None:
+            SnapshotKelas.objects.filter(dibuat_pada__lt=batas).delete()
+    return snapshot
+
+
+def snapshot_kelas_terbaru():
+    return SnapshotKelas.objects.order_by("-dibuat_pada").first()
+
+
+def umur_detik(snapshot):
+    return (timezone.now() - snapshot.dibuat_pada).total_seconds()
+
+
+def umur_teks(snapshot):
+    """Umur snapshot untuk ditampilkan, mis. "baru saja", "12 menit lalu"."""
+    menit = int(umur_detik(snapshot) // 60)
+    if menit < 1:
+        return "baru saja"
+    if menit < 60:
+        return f"{menit} menit lalu"
+    return f"{menit // 60} jam {menit % 60} menit lalu"
+
+
+def perbarui_snapshot_kelas(terbaru=None, jeda_minimum=None):
+    """
+    Membuat snapshot baru kecuali snapshot terakhir masih lebih muda dari
+    `jeda_minimum` detik atau proses lain sedang membuatnya (kunci di cache),
+    sehingga beberapa guru yang menekan "Perbarui" bersamaan tidak memicu
+    perhitungan berulang. Mengembalikan snapshot terbaru yang tersedia.
+    """
+    if jeda_minimum is None:
+        jeda_minimum = getattr(settings, "EKOSPHERE_SNAPSHOT_KELAS_JEDA_MINIMUM", 30)
+    if terbaru is None:
+        terbaru = snapshot_kelas_terbaru()
+    if terbaru is not None and umur_detik(terbaru) < jeda_minimum:
+        return terbaru
+    if not cache.add(_KUNCI_SEDANG_DIBUAT, True, timeout=60):
+        return terbaru
+    try:
+        return buat_snapshot_kelas(
+            simpan=getattr(settings, "EKOSPHERE_SNAPSHOT_KELAS_SIMPAN", None)
+        )
+    finally:
+        cache.delete(_KUNCI_SEDANG_DIBUAT)
+
+
+def snapshot_basi(snapshot):
+    """Snapshot lebih tua dari EKOSPHERE_SNAPSHOT_KELAS_MAKS_UMUR detik."""
+    return umur_detik(snapshot) > getattr(settings, "EKOSPHERE_SNAPSHOT_KELAS_MAKS_UMUR", 15 * 60)
+
+
+def snapshot_untuk_dashboard():
+    """
+    Snapshot yang ditampilkan dashboard guru: yang terbaru (satu query),
+    walaupun sudah basi, agar GET dashboard tidak pernah menanggung
+    perhitungan KPI. Snapshot baru dibuat oleh `buat_snapshot_kelas`
+    (terjadwal) atau tombol "Perbarui"; di sini hanya jika belum ada sama sekali.
+    """
+    terbaru = snapshot_kelas_terbaru()
+    if terbaru is None:
+        terbaru = perbarui_snapshot_kelas(terbaru) or buat_snapshot_kelas()
+    return terbaru
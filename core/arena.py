@@ -0,0 +1,89 @@
+# core/arena.py
+
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import PertanyaanArena
+from .versi import VERSI_ARENA, ambil_versi
+
+logger = logging.getLogger(__name__)
+
+
+def _ke_json(data):
+    # Format sama dengan JsonResponse/json.dumps yang dipakai view sebelumnya
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def bangun_pool_arena():
+    """
+    Membangun pool semua PertanyaanArena dalam satu query, dikelompokkan per
+    tipe. Setiap pool menyimpan JSON yang sudah diserialisasi:
+    - "daftar": list konten (dengan "id") untuk halaman Duel Simbiosis
+    - "pertama_id" / "pertama": pertanyaan pertama dan kontennya (klasifikasi,
+      cerita predator), plus "pertama_bytes" untuk langsung dikirim oleh API
+    Pertanyaan yang konten_json-nya bukan objek JSON dilewati (dengan peringatan
+    di log) agar satu baris rusak tidak membuat seluruh arena gagal dimuat.
+    """
+    per_tipe = {}
+    for pertanyaan_id, tipe, konten in PertanyaanArena.objects.order_by("id").values_list(
+        "id", "tipe", "konten_json"
+    ):
+        if not isinstance(konten, dict):
+            logger.warning(
+                "PertanyaanArena %s dilewati: konten_json harus objek, bukan %s",
+                pertanyaan_id,
+                type(konten).__name__,
+            )
+            continue
+        per_tipe.setdefault(tipe, []).append((pertanyaan_id, konten))
+
+    pool = {}
+    for tipe, daftar in per_tipe.items():
+        pertama_id, pertama = daftar[0]
+        pertama_json = _ke_json(pertama)
+        pool[tipe] = {
+            "daftar": _ke_json([{**konten, "id": pertanyaan_id} for pertanyaan_id, konten in daftar]),
+            "pertama_id": pertama_id,
+            "pertama": pertama_json,
+            "pertama_bytes": pertama_json.encode(),
+        }
+    return pool
+
+
+class PoolArena:
+    """
+    Pool pertanyaan arena di memori proses, dibangun ulang hanya jika stempel
+    VERSI_ARENA berubah (sinyal pada PertanyaanArena). Membuka halaman arena
+    atau memanggil API-nya tidak butuh query maupun json.dumps.
+    """
+
+    def __init__(self):
+        self._data = (None, None)
+
+    def _muat(self):
+        versi = ambil_versi(VERSI_ARENA)
+        data = self._data
+        if data[0] != versi:
+            data = (versi, bangun_pool_arena())
+            self._data = data
+        return data[1]
+
+    async def _amuat(self):
+        # Jalur cepat tanpa pindah thread; ORM hanya disentuh saat pool basi
+        data = self._data
+        if data[0] == ambil_versi(VERSI_ARENA):
+            return data[1]
+        return await sync_to_async(self._muat)()
+
+    def pool(self, tipe):
+        """Pool untuk `tipe`, atau None jika belum ada pertanyaan bertipe itu."""
+        return self._muat().get(tipe)
+
+    async def apool(self, tipe):
+        return (await self._amuat()).get(tipe)
+
+
+pool_arena = PoolArena()
@@ -0,0 +1,125 @@
+# core/basisdata.py
+
+import contextlib
+import functools
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def terapkan_pragma_sqlite(koneksi):
+    """
+    Menerapkan EKOSPHERE_SQLITE_PRAGMA (WAL, synchronous=NORMAL, busy_timeout,
+    mmap, cache) ke koneksi SQLite baru. Hanya aktif pada mode produksi
+    (EKOSPHERE_SQLITE_PRODUKSI), dipanggil dari sinyal connection_created.
+    """
+    if koneksi.vendor != "sqlite" or not getattr(settings, "EKOSPHERE_SQLITE_PRODUKSI", False):
+        return
+    with koneksi.cursor() as cursor:
+        for nama, nilai in getattr(settings, "EKOSPHERE_SQLITE_PRAGMA", {}).items():
+            cursor.execute(f"PRAGMA {nama} = {nilai}")
+
+
+def _mode_produksi():
+    return connection.vendor == "sqlite" and getattr(settings, "EKOSPHERE_SQLITE_PRODUKSI", False)
+
+
+@contextlib.contextmanager
+def _begin_immediate():
+    """
+    Selama blok ini transaksi baru pada koneksi default dibuka dengan
+    BEGIN IMMEDIATE (atribut transaction_mode backend SQLite, Django 5.1+).
+    Koneksi dibuka dulu karena connect() mengisi ulang atribut itu dari
+    OPTIONS; transaksi lain di luar transaksi_tulis tetap BEGIN biasa.
+    """
+    if not _mode_produksi():
+        yield
+        return
+    connection.ensure_connection()
+    mode_lama = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        yield
+    finally:
+        connection.transaction_mode = mode_lama
+
+
+# Antrean tulis per proses: thread dalam satu proses menunggu giliran di sini
+# (kunci Python, dibangunkan begitu kunci dilepas) alih-alih berebut kunci tulis
+# SQLite lewat busy handler yang tidur bertahap hingga 100 ms per percobaan,
+# sehingga sebagian penulis kelaparan saat ratusan thread mengantre
+_kunci_antrean_tulis = threading.Lock()
+
+
+def batas_antrean_tulis():
+    """Lama maksimum (detik) menunggu giliran menulis; lihat EKOSPHERE_SQLITE_ANTREAN_MS."""
+    return getattr(settings, "EKOSPHERE_SQLITE_ANTREAN_MS", 5000) / 1000
+
+
+@contextlib.contextmanager
+def _antrean_tulis():
+    """
+    Pada mode produksi, hanya satu transaksi_tulis per proses yang berjalan
+    sekaligus. Penulis dari proses lain tetap diatur oleh busy_timeout SQLite.
+    Jika giliran tidak didapat dalam batas_antrean_tulis() detik, dilempar
+    OperationalError "database is locked" agar ditangani seperti kunci SQLite.
+    """
+    if not _mode_produksi():
+        yield
+        return
+    if not _kunci_antrean_tulis.acquire(timeout=batas_antrean_tulis()):
+        raise OperationalError("database is locked (antrean tulis proses penuh)")
+    try:
+        yield
+    finally:
+        _kunci_antrean_tulis.release()
+
+
+def _database_terkunci(exc):
+    pesan = str(exc).lower()
+    return "locked" in pesan or "busy" in pesan
+
+
+def transaksi_tulis(fungsi):
+    """
+    Menjalankan `fungsi` dalam transaction.atomic() dan mengulanginya (dengan
+    backoff acak) jika SQLite melaporkan "database is locked". Pada mode
+    produksi penulis dalam satu proses mengantre (_antrean_tulis) dan
+    transaksinya dibuka dengan BEGIN IMMEDIATE (_begin_immediate), jadi kunci
+    tulis diambil di awal dan kegagalan hanya mungkin terjadi sebelum ada yang
+    ditulis. Jika sudah berada di dalam transaksi lain, pengulangan
+    diserahkan ke transaksi terluar.
+    """
+
+    @functools.wraps(fungsi)
+    def pembungkus(*args, **kwargs):
+        if connection.in_atomic_block:
+            with transaction.atomic():
+                return fungsi(*args, **kwargs)
+
+        konfigurasi = getattr(settings, "EKOSPHERE_RETRY_TULIS", {})
+        maks_percobaan = konfigurasi.get("percobaan", 5)
+        jeda = konfigurasi.get("jeda_awal", 0.05)
+        for percobaan in range(1, maks_percobaan + 1):
+            try:
+                with _antrean_tulis(), _begin_immediate(), transaction.atomic():
+                    return fungsi(*args, **kwargs)
+            except OperationalError as exc:
+                if not _database_terkunci(exc) or percobaan == maks_percobaan:
+                    raise
+                logger.warning(
+                    "%s: database terkunci, percobaan %d/%d",
+                    fungsi.__qualname__,
+                    percobaan,
+                    maks_percobaan,
+                )
+                time.sleep(jeda * random.uniform(0.5, 1.5))
+                jeda *= 2
+
+    return pembungkus
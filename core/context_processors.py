@@ -1,15 +1,16 @@
 # core/context_processors.py
 
-from .models import ProfilSiswa
+from .profil import profil_siswa_lazy
 
 def add_profil_to_context(request):
     """
     Fungsi ini akan otomatis menambahkan data profil siswa
     ke setiap halaman jika pengguna adalah seorang siswa.
+    Profil bersifat lazy dan dipakai bersama dengan view
+    (lihat core.profil), jadi query hanya terjadi sekali
+    dan hanya jika template benar-benar memakainya.
     """
     if request.user.is_authenticated and request.user.role == 'Siswa':
-        # Ambil atau buat profil untuk siswa yang sedang login
-        profil, created = ProfilSiswa.objects.get_or_create(user=request.user)
-        # Kirim data profil ke semua template
-        return {'profil_siswa': profil}
-    return {}
\ No newline at end of file
+        # Kirim data profil (lazy) ke semua template
+        return {'profil_siswa': profil_siswa_lazy(request)}
+    return {}
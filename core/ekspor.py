@@ -0,0 +1,208 @@
+# core/ekspor.py
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import HasilKuis, JawabanSiswa, QuizAttemptLog, RekapHarianArena, RekapHarianKuis
+
+UKURAN_CHUNK = 2000
+FORMAT_EKSPOR = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Jenis ekspor: model sumber, kolom (nama di berkas -> lookup values_list),
+# dan lookup untuk filter waktu/kuis/siswa (None = filter tidak berlaku).
+# log-kuis dan jawaban-arena hanya berisi log dalam jendela retensi
+# (EKOSPHERE_RETENSI_LOG_HARI); log yang lebih tua sudah dipadatkan dan
+# tersedia sebagai rekap-kuis/rekap-arena (satu baris per siswa, pertanyaan
+# dan tanggal). Kolom waktu rekap berupa tanggal ("tanggal": True).
+SPESIFIKASI_EKSPOR = {
+    "hasil-kuis": {
+        "model": HasilKuis,
+        "kolom": {
+            "id": "id",
+            "siswa_id": "siswa_id",
+            "username": "siswa__username",
+            "kuis_id": "kuis_id",
+            "kuis": "kuis__judul",
+            "skor": "skor",
+            "waktu_selesai": "waktu_selesai",
+        },
+        "waktu": "waktu_selesai",
+        "kuis": "kuis_id",
+        "siswa": "siswa_id",
+    },
+    "log-kuis": {
+        "model": QuizAttemptLog,
+        "kolom": {
+            "id": "id",
+            "siswa_id": "user_id",
+            "username": "user__username",
+            "kuis_id": "question__kuis_id",
+            "pertanyaan_id": "question_id",
+            "benar": "is_correct",
+            "waktu_jawab": "answered_at",
+        },
+        "waktu": "answered_at",
+        "kuis": "question__kuis_id",
+        "siswa": "user_id",
+    },
+    "jawaban-arena": {
+        "model": JawabanSiswa,
+        "kolom": {
+            "id": "id",
+            "siswa_id": "siswa_id",
+            "username": "siswa__username",
+            "pertanyaan_id": "pertanyaan_id",
+            "tipe": "pertanyaan__tipe",
+            "benar": "jawaban_benar",
+            "waktu_jawab": "waktu_jawab",
+        },
+        "waktu": "waktu_jawab",
+        "kuis": None,
+        "siswa": "siswa_id",
+    },
+    "rekap-kuis": {
+        "model": RekapHarianKuis,
+        "kolom": {
+            "id": "id",
+            "siswa_id": "user_id",
+            "username": "user__username",
+            "kuis_id": "question__kuis_id",
+            "pertanyaan_id": "question_id",
+            "tanggal": "tanggal",
+            "jumlah": "jumlah",
+            "jumlah_benar": "jumlah_benar",
+        },
+        "waktu": "tanggal",
+        "tanggal": True,
+        "kuis": "question__kuis_id",
+        "siswa": "user_id",
+    },
+    "rekap-arena": {
+        "model": RekapHarianArena,
+        "kolom": {
+            "id": "id",
+            "siswa_id": "siswa_id",
+            "username": "siswa__username",
+            "pertanyaan_id": "pertanyaan_id",
+            "tipe": "pertanyaan__tipe",
+            "tanggal": "tanggal",
+            "jumlah": "jumlah",
+            "jumlah_benar": "jumlah_benar",
+        },
+        "waktu": "tanggal",
+        "tanggal": True,
+        "kuis": None,
+        "siswa": "siswa_id",
+    },
+}
+
+
+class FilterEksporTidakValid(ValueError):
+    pass
+
+
+def _tanggal(nilai, nama):
+    try:
+        return datetime.strptime(nilai, "%Y-%m-%d").date()
+    except ValueError:
+        raise FilterEksporTidakValid(f"Parameter {nama} harus berformat YYYY-MM-DD")
+
+
+def _angka(nilai, nama):
+    try:
+        return int(nilai)
+    except ValueError:
+        raise FilterEksporTidakValid(f"Parameter {nama} harus berupa angka")
+
+
+def queryset_ekspor(jenis, parameter):
+    """
+    Queryset values_list untuk ekspor `jenis` dengan filter dari query string:
+    dari/sampai (tanggal lokal, inklusif), kuis (id) dan siswa (id user).
+    """
+    spek = SPESIFIKASI_EKSPOR[jenis]
+    filter_ = {}
+    if parameter.get("dari"):
+        awal = _tanggal(parameter["dari"], "dari")
+        if not spek.get("tanggal"):
+            awal = timezone.make_aware(datetime.combine(awal, time.min))
+        filter_[f"{spek['waktu']}__gte"] = awal
+    if parameter.get("sampai"):
+        akhir = _tanggal(parameter["sampai"], "sampai") + timedelta(days=1)
+        if not spek.get("tanggal"):
+            akhir = timezone.make_aware(datetime.combine(akhir, time.min))
+        filter_[f"{spek['waktu']}__lt"] = akhir
+    if parameter.get("kuis"):
+        if spek["kuis"] is None:
+            raise FilterEksporTidakValid(f"Filter kuis tidak berlaku untuk ekspor {jenis}")
+        filter_[spek["kuis"]] = _angka(parameter["kuis"], "kuis")
+    if parameter.get("siswa"):
+        filter_[spek["siswa"]] = _angka(parameter["siswa"], "siswa")
+    return (
+        spek["model"]
+        .objects.filter(**filter_)
+        .order_by("id")
+        .values_list(*spek["kolom"].values())
+    )
+
+
+class _Gema:
+    """Objek mirip berkas untuk csv.writer: write() mengembalikan teksnya."""
+
+    def write(self, nilai):
+        return nilai
+
+
+def _per_chunk(queryset, ukuran):
+    """
+    Baris queryset (values_list berkolom pertama id, urut id) per `ukuran`,
+    dengan keyset pada id: setiap chunk adalah SELECT tersendiri yang selesai
+    sebelum chunk dikirim. Kunci baca SQLite hanya dipegang selama satu chunk
+    dibaca, bukan sepanjang unduhan, jadi penulis tidak tertahan (mode
+    journal default maupun WAL).
+    """
+    terakhir = None
+    while True:
+        potongan = queryset if terakhir is None else queryset.filter(id__gt=terakhir)
+        chunk = list(potongan[:ukuran])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < ukuran:
+            return
+        terakhir = chunk[-1][0]
+
+
+# Awalan yang membuat spreadsheet menafsirkan sel sebagai rumus
+_AWALAN_RUMUS = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _sel_csv(nilai):
+    """Teks yang bisa ditafsirkan sebagai rumus diberi awalan ' (CSV injection)."""
+    if isinstance(nilai, str) and nilai.startswith(_AWALAN_RUMUS):
+        return "'" + nilai
+    return nilai
+
+
+def alirkan_ekspor(jenis, queryset, format_="csv"):
+    """
+    Generator potongan teks CSV/NDJSON. Baris dibaca per UKURAN_CHUNK (lihat
+    _per_chunk) dan setiap chunk langsung dikirim, jadi memori tetap datar
+    berapa pun jumlah barisnya dan byte pertama terkirim segera.
+    """
+    header = list(SPESIFIKASI_EKSPOR[jenis]["kolom"])
+    if format_ == "csv":
+        penulis = csv.writer(_Gema())
+        yield penulis.writerow(header)
+        for chunk in _per_chunk(queryset, UKURAN_CHUNK):
+            yield "".join(penulis.writerow([_sel_csv(v) for v in nilai]) for nilai in chunk)
+    else:
+        for chunk in _per_chunk(queryset, UKURAN_CHUNK):
+            yield "".join(
+                json.dumps(dict(zip(header, nilai)), cls=DjangoJSONEncoder) + "\n"
+                for nilai in chunk
+            )
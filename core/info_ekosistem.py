@@ -0,0 +1,89 @@
+# core/info_ekosistem.py
+
+import math
+import random
+
+from django.core.cache import cache
+
+from .models import InfoEkosistem
+from .versi import VERSI_INFO, ambil_versi
+
+SEMUA_KATEGORI = "__semua__"
+TTL_ROTASI = 60 * 60 * 24 * 7
+
+
+def bangun_daftar_id_info():
+    """{kategori: tuple id}, plus SEMUA_KATEGORI untuk seluruh tabel, dari satu query."""
+    daftar = {SEMUA_KATEGORI: []}
+    for info_id, kategori in InfoEkosistem.objects.order_by("id").values_list("id", "kategori"):
+        daftar[SEMUA_KATEGORI].append(info_id)
+        daftar.setdefault(kategori, []).append(info_id)
+    return {kategori: tuple(ids) for kategori, ids in daftar.items()}
+
+
+class SamplerInfoEkosistem:
+    """
+    Pengganti InfoEkosistem.objects.order_by("?"): menyimpan array id per
+    kategori di memori proses (dibangun ulang saat stempel VERSI_INFO naik),
+    mengundi k id berbeda dalam O(k), lalu hanya mengambil baris itu.
+
+    Jika user_id diberikan, kartu dirotasi per pengguna tanpa pengulangan:
+    id dijalani dengan langkah acak yang koprima dengan panjang array, jadi
+    setiap id muncul tepat sekali per putaran. Parameter putaran dan posisinya
+    disimpan di cache.
+    """
+
+    def __init__(self):
+        self._data = (None, None)
+
+    def _muat(self):
+        versi = ambil_versi(VERSI_INFO)
+        data = self._data
+        if data[0] != versi:
+            data = (versi, bangun_daftar_id_info())
+            self._data = data
+        return data
+
+    def _ids_rotasi(self, versi, ids, k, user_id, kategori):
+        n = len(ids)
+        kunci_cache = f"ekosphere:rotasi_info:{user_id}:{kategori}"
+        kunci_posisi = f"{kunci_cache}:posisi"
+        # Parameter putaran hanya ditulis saat putaran baru dimulai; selebihnya
+        # posisi dimajukan dengan cache.incr (atomik, tanpa menulis ulang dict)
+        rotasi = cache.get(kunci_cache)
+        posisi_akhir = None
+        if rotasi is not None and rotasi["versi"] == versi:
+            try:
+                posisi_akhir = cache.incr(kunci_posisi, k)
+            except ValueError:
+                # Penghitung posisi sudah hilang dari cache
+                pass
+        if posisi_akhir is None or posisi_akhir > n:
+            # Putaran baru (atau daftar berubah): titik awal dan langkah baru
+            langkah = random.randrange(1, n) if n > 1 else 1
+            while math.gcd(langkah, n) != 1:
+                langkah = random.randrange(1, n)
+            rotasi = {"versi": versi, "awal": random.randrange(n), "langkah": langkah}
+            cache.set_many({kunci_cache: rotasi, kunci_posisi: k}, timeout=TTL_ROTASI)
+            posisi_akhir = k
+        posisi = posisi_akhir - k
+        return [ids[(rotasi["awal"] + (posisi + i) * rotasi["langkah"]) % n] for i in range(k)]
+
+    def sampel(self, k, kategori=None, user_id=None):
+        """Daftar berisi hingga `k` InfoEkosistem acak (berbeda), opsional per kategori."""
+        kategori = kategori or SEMUA_KATEGORI
+        versi, daftar = self._muat()
+        ids = daftar.get(kategori, ())
+        k = min(k, len(ids))
+        if not k:
+            return []
+        if user_id is None:
+            terpilih = random.sample(ids, k)
+        else:
+            terpilih = self._ids_rotasi(versi, ids, k, user_id, kategori)
+        baris = InfoEkosistem.objects.in_bulk(terpilih)
+        # Baris yang terhapus setelah array dibangun dilewati saja
+        return [baris[info_id] for info_id in terpilih if info_id in baris]
+
+
+sampler_info = SamplerInfoEkosistem()
@@ -0,0 +1,127 @@
+# core/kompaksi.py
+
+import json
+import time as waktu_proses
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .basisdata import transaksi_tulis
+from .models import JawabanSiswa, QuizAttemptLog, RekapHarianArena, RekapHarianKuis
+
+# Pemetaan tabel log mentah -> tabel rekap harian
+SPESIFIKASI = {
+    "kuis": {
+        "log": QuizAttemptLog,
+        "rekap": RekapHarianKuis,
+        "user": "user",
+        "soal": "question",
+        "benar": "is_correct",
+        "waktu": "answered_at",
+    },
+    "arena": {
+        "log": JawabanSiswa,
+        "rekap": RekapHarianArena,
+        "user": "siswa",
+        "soal": "pertanyaan",
+        "benar": "jawaban_benar",
+        "waktu": "waktu_jawab",
+    },
+}
+
+
+def batas_retensi(hari):
+    """Awal hari (zona waktu lokal) `hari` hari yang lalu; log sebelum ini dipadatkan."""
+    tanggal = timezone.localdate() - timedelta(days=hari)
+    return timezone.make_aware(datetime.combine(tanggal, time.min))
+
+
+def _lipat_ke_rekap(spek, baris):
+    """Menambahkan baris log mentah ke rekap harian (update yang ada, buat yang baru)."""
+    agregat = defaultdict(lambda: [0, 0])
+    for _, user_id, soal_id, benar, waktu in baris:
+        kunci = (user_id, soal_id, timezone.localdate(waktu))
+        agregat[kunci][0] += 1
+        agregat[kunci][1] += 1 if benar else 0
+
+    Rekap = spek["rekap"]
+    kolom_user, kolom_soal = f"{spek['user']}_id", f"{spek['soal']}_id"
+    # Superset kandidat baris rekap yang sudah ada, dicocokkan di Python
+    kandidat = Rekap.objects.filter(
+        **{
+            f"{kolom_user}__in": {k[0] for k in agregat},
+            f"{kolom_soal}__in": {k[1] for k in agregat},
+            "tanggal__in": {k[2] for k in agregat},
+        }
+    )
+    diperbarui = []
+    for rekap in kandidat:
+        kunci = (getattr(rekap, kolom_user), getattr(rekap, kolom_soal), rekap.tanggal)
+        tambahan = agregat.pop(kunci, None)
+        if tambahan:
+            rekap.jumlah += tambahan[0]
+            rekap.jumlah_benar += tambahan[1]
+            diperbarui.append(rekap)
+    Rekap.objects.bulk_update(diperbarui, ["jumlah", "jumlah_benar"], batch_size=500)
+    Rekap.objects.bulk_create(
+        [
+            Rekap(
+                **{kolom_user: user_id, kolom_soal: soal_id},
+                tanggal=tanggal,
+                jumlah=jumlah,
+                jumlah_benar=jumlah_benar,
+            )
+            for (user_id, soal_id, tanggal), (jumlah, jumlah_benar) in agregat.items()
+        ],
+        batch_size=500,
+    )
+
+
+def kompaksi(nama, batas, ukuran_batch=5000, berkas_arsip=None, maks_batch=None, jeda=0):
+    """
+    Memadatkan log `nama` ("kuis"/"arena") yang lebih tua dari `batas` ke tabel
+    rekap harian, lalu menghapus baris mentahnya. Setiap batch adalah satu
+    transaksi_tulis (BEGIN IMMEDIATE, diulang jika database terkunci) sehingga
+    kunci tulis SQLite hanya dipegang sebentar. Jika `berkas_arsip` (file
+    terbuka) diberikan, baris mentah batch ditulis sebagai NDJSON setelah
+    transaksinya di-commit, jadi batch yang dibatalkan atau diulang tidak
+    terarsip dua kali. `jeda` (detik) memberi kesempatan penulis lain di antara
+    batch. Mengembalikan jumlah baris yang dipadatkan.
+    """
+    spek = SPESIFIKASI[nama]
+    Log = spek["log"]
+    kolom = ["id", f"{spek['user']}_id", f"{spek['soal']}_id", spek["benar"], spek["waktu"]]
+
+    @transaksi_tulis
+    def padatkan_batch():
+        # Log disisipkan berurutan waktu, jadi baris tertua ada di id terkecil
+        baris = list(
+            Log.objects.filter(**{f"{spek['waktu']}__lt": batas})
+            .order_by("id")
+            .values_list(*kolom)[:ukuran_batch]
+        )
+        if baris:
+            _lipat_ke_rekap(spek, baris)
+            Log.objects.filter(id__in=[nilai[0] for nilai in baris]).delete()
+        return baris
+
+    total = 0
+    jumlah_batch = 0
+    while maks_batch is None or jumlah_batch < maks_batch:
+        baris = padatkan_batch()
+        if not baris:
+            break
+        if berkas_arsip is not None:
+            for nilai in baris:
+                berkas_arsip.write(
+                    json.dumps({"tabel": nama, **dict(zip(kolom, nilai))}, cls=DjangoJSONEncoder)
+                    + "\n"
+                )
+            berkas_arsip.flush()
+        total += len(baris)
+        jumlah_batch += 1
+        if jeda:
+            waktu_proses.sleep(jeda)
+    return total
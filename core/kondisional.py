@@ -0,0 +1,52 @@
+# core/kondisional.py
+
+import hashlib
+
+from django.middleware.csrf import get_token
+
+from .versi import (
+    VERSI_ARENA,
+    VERSI_KURIKULUM,
+    VERSI_LENCANA,
+    ambil_versi,
+    versi_siswa,
+)
+
+# Argumen untuk django.views.decorators.cache.cache_control.
+# Publik: boleh disimpan cache bersama, tetapi divalidasi ulang setelah 5 menit.
+# Privat: hanya browser pengguna itu sendiri, selalu divalidasi ulang (ETag).
+CACHE_CONTROL_PUBLIK = {"public": True, "max_age": 300}
+CACHE_CONTROL_PRIVAT = {"private": True, "no_cache": True}
+
+
+def _etag(*bagian):
+    return hashlib.md5(":".join(map(str, bagian)).encode(), usedforsecurity=False).hexdigest()
+
+
+def etag_statis(isi):
+    """ETag untuk respons yang isinya tetap selama proses berjalan."""
+    return _etag("statis", hashlib.md5(isi, usedforsecurity=False).hexdigest())
+
+
+def etag_arena(request, *args, **kwargs):
+    return _etag("arena", ambil_versi(VERSI_ARENA))
+
+
+def etag_materi(request, pk):
+    """
+    ETag halaman materi. Selain konten kurikulum, halaman ini memuat data
+    pengguna (progres, hasil kuis, poin, lencana) dan token CSRF, jadi
+    stempel data siswa dan rahasia CSRF ikut dihitung. Rahasia itu dibuat
+    dulu lewat get_token() bila belum ada, sehingga ETag respons pertama
+    sama dengan ETag permintaan berikutnya yang membawa cookie barunya.
+    """
+    get_token(request)
+    return _etag(
+        "materi",
+        pk,
+        request.user.pk,
+        ambil_versi(VERSI_KURIKULUM),
+        ambil_versi(VERSI_LENCANA),
+        ambil_versi(versi_siswa(request.user.pk)),
+        request.META["CSRF_COOKIE"],
+    )
@@ -0,0 +1,79 @@
+# core/kunci_jawaban.py
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import FilteredRelation, Q
+
+from .models import Pertanyaan
+from .versi import VERSI_KUIS, ambil_versi
+
+
+def ambil_kunci_jawaban(kuis_id):
+    """
+    Mengambil kunci jawaban sebuah kuis dalam satu query:
+    {id pertanyaan: id pilihan benar (atau None jika belum diatur)}.
+    """
+    baris = (
+        Pertanyaan.objects.filter(kuis_id=kuis_id)
+        .annotate(pilihan_benar=FilteredRelation("pilihan", condition=Q(pilihan__is_benar=True)))
+        .values_list("id", "pilihan_benar__id")
+        .order_by("id", "pilihan_benar__id")
+    )
+    kunci = {}
+    for pertanyaan_id, pilihan_id in baris:
+        # Jika ada lebih dari satu pilihan benar, pakai yang pertama
+        kunci.setdefault(pertanyaan_id, pilihan_id)
+    return kunci
+
+
+class CacheKunciJawaban:
+    """
+    Cache LRU in-process untuk kunci jawaban per kuis.
+
+    Setiap entri menyimpan stempel versi konten kuis saat entri dibuat.
+    Sinyal post_save/post_delete pada Kuis, Pertanyaan dan PilihanJawaban
+    menaikkan stempel tersebut (lihat core/signals.py), sehingga entri lama
+    otomatis dianggap basi tanpa perlu dihapus satu per satu.
+    """
+
+    def __init__(self, maksimum=256):
+        self.maksimum = maksimum
+        self.hit = 0
+        self.miss = 0
+        self._entri = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kuis_id):
+        versi = ambil_versi(VERSI_KUIS)
+        with self._lock:
+            entri = self._entri.get(kuis_id)
+            if entri is not None and entri[0] == versi:
+                self._entri.move_to_end(kuis_id)
+                self.hit += 1
+                return entri[1]
+            self.miss += 1
+
+        kunci = ambil_kunci_jawaban(kuis_id)
+        with self._lock:
+            self._entri[kuis_id] = (versi, kunci)
+            self._entri.move_to_end(kuis_id)
+            while len(self._entri) > self.maksimum:
+                self._entri.popitem(last=False)
+        return kunci
+
+    def clear(self):
+        with self._lock:
+            self._entri.clear()
+            self.hit = 0
+            self.miss = 0
+
+    def statistik(self):
+        with self._lock:
+            return {"hit": self.hit, "miss": self.miss, "ukuran": len(self._entri)}
+
+
+cache_kunci_jawaban = CacheKunciJawaban(
+    maksimum=getattr(settings, "EKOSPHERE_CACHE_KUNCI_JAWABAN_MAKS", 256)
+)
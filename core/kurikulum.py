@@ -0,0 +1,137 @@
+# core/kurikulum.py
+
+import re
+import secrets
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import SubTopik, Topik
+from .versi import VERSI_KURIKULUM, ambil_versi
+
+IKON_SELESAI = '<i class="bi bi-check-circle-fill text-success" title="Telah Selesai"></i>'
+
+
+def _pola_penanda_sidebar(nonce):
+    return re.compile(rf"__aktif_{nonce}_(\d+)__|<!--selesai:{nonce}:(\d+)-->")
+
+
+def bangun_indeks_kurikulum():
+    """
+    Membangun indeks navigasi kurikulum dari dua query:
+    - "topik": daftar topik terurut, masing-masing dengan id subtopiknya
+    - "subtopik": {id subtopik: data subtopik + id sebelumnya/selanjutnya}
+    """
+    topik_list = [
+        {"id": topik_id, "judul": judul, "subtopik_ids": []}
+        for topik_id, judul in Topik.objects.order_by("urutan", "id").values_list("id", "judul")
+    ]
+    topik_per_id = {topik["id"]: topik for topik in topik_list}
+
+    # Navigasi sebelumnya/selanjutnya sengaja melintasi batas topik (subtopik
+    # terakhir suatu topik berlanjut ke subtopik pertama topik berikutnya).
+    # Urutan topik sama dengan daftar topik di atas, termasuk id sebagai
+    # pemecah seri, agar subtopik dua topik berurutan sama tidak berselang-seling.
+    subtopik = {}
+    sebelumnya = None
+    baris = SubTopik.objects.order_by("topik__urutan", "topik_id", "urutan", "id").values_list(
+        "id", "judul", "topik_id", "kuis__id"
+    )
+    for subtopik_id, judul, topik_id, kuis_id in baris:
+        subtopik[subtopik_id] = {
+            "id": subtopik_id,
+            "judul": judul,
+            "topik_id": topik_id,
+            "punya_kuis": kuis_id is not None,
+            "sebelumnya": sebelumnya,
+            "selanjutnya": None,
+        }
+        if sebelumnya is not None:
+            subtopik[sebelumnya]["selanjutnya"] = subtopik_id
+        topik_per_id[topik_id]["subtopik_ids"].append(subtopik_id)
+        sebelumnya = subtopik_id
+
+    for topik in topik_list:
+        topik["jumlah_subtopik"] = len(topik["subtopik_ids"])
+    return {"topik": topik_list, "topik_per_id": topik_per_id, "subtopik": subtopik}
+
+
+class IndeksKurikulum:
+    """
+    Indeks kurikulum di memori proses. Dibangun ulang hanya jika stempel
+    VERSI_KURIKULUM berubah (sinyal pada Topik/SubTopik/Kuis), sehingga navigasi
+    sebelumnya/selanjutnya cukup berupa lookup dict tanpa query database.
+    """
+
+    def __init__(self):
+        self._data = (None, None)
+
+    def _muat(self):
+        versi = ambil_versi(VERSI_KURIKULUM)
+        data = self._data
+        if data[0] != versi:
+            data = (versi, bangun_indeks_kurikulum())
+            self._data = data
+        return data[1]
+
+    def subtopik(self, subtopik_id):
+        return self._muat()["subtopik"].get(subtopik_id)
+
+    def navigasi(self, subtopik_id):
+        """(subtopik sebelumnya, subtopik selanjutnya) sebagai dict, atau None."""
+        indeks = self._muat()["subtopik"]
+        entri = indeks.get(subtopik_id)
+        if entri is None:
+            return None, None
+        return indeks.get(entri["sebelumnya"]), indeks.get(entri["selanjutnya"])
+
+    def topik(self, topik_id):
+        return self._muat()["topik_per_id"].get(topik_id)
+
+    def semua_topik(self):
+        return self._muat()["topik"]
+
+    def fragmen_sidebar(self):
+        """
+        (nonce, HTML) sidebar materi yang sudah dirender, di-cache per versi
+        kurikulum. Penanda aktif/selesai masih berupa placeholder yang memuat
+        nonce acak milik fragmen ini, jadi teks judul yang kebetulan mirip
+        placeholder tidak ikut diganti.
+        """
+        kunci_cache = f"ekosphere:sidebar_materi_nonce:{ambil_versi(VERSI_KURIKULUM)}"
+        fragmen = cache.get(kunci_cache)
+        if fragmen is None:
+            indeks = self._muat()
+            semua_topik = [
+                {
+                    "judul": topik["judul"],
+                    "subtopik": [indeks["subtopik"][i] for i in topik["subtopik_ids"]],
+                }
+                for topik in indeks["topik"]
+            ]
+            nonce = secrets.token_hex(8)
+            fragmen = (
+                nonce,
+                render_to_string(
+                    "core/sidebar_materi.html", {"semua_topik": semua_topik, "nonce": nonce}
+                ),
+            )
+            cache.set(kunci_cache, fragmen, timeout=60 * 60 * 24)
+        return fragmen
+
+
+indeks_kurikulum = IndeksKurikulum()
+
+
+def render_sidebar_materi(subtopik_aktif_id, completed_materi_ids):
+    """Menggabungkan penanda per pengguna ke fragmen sidebar yang di-cache."""
+
+    def isi_penanda(cocok):
+        aktif_id, selesai_id = cocok.groups()
+        if aktif_id is not None:
+            return "active" if int(aktif_id) == subtopik_aktif_id else ""
+        return IKON_SELESAI if int(selesai_id) in completed_materi_ids else ""
+
+    nonce, fragmen = indeks_kurikulum.fragmen_sidebar()
+    return mark_safe(_pola_penanda_sidebar(nonce).sub(isi_penanda, fragmen))
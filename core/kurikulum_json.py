@@ -0,0 +1,359 @@
+# core/kurikulum_json.py
+
+import json
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import (
+    InfoEkosistem,
+    Kuis,
+    Pertanyaan,
+    PertanyaanArena,
+    PilihanJawaban,
+    SubTopik,
+    Topik,
+)
+from .versi import VERSI_ARENA, VERSI_INFO, VERSI_KUIS, VERSI_KURIKULUM, naikkan_versi
+
+VERSI_FORMAT = 1
+
+
+class FormatKurikulumTidakValid(ValueError):
+    pass
+
+
+class KunciAlamiGanda(FormatKurikulumTidakValid):
+    """Database sudah berisi beberapa baris dengan kunci alami yang sama."""
+
+
+def _kunci_json(konten):
+    # Bentuk kanonik konten_json, dipakai sebagai kunci alami PertanyaanArena
+    return json.dumps(konten, sort_keys=True, ensure_ascii=False)
+
+
+def ekspor_kurikulum():
+    """
+    Seluruh pohon konten (Topik -> SubTopik -> Kuis -> Pertanyaan ->
+    PilihanJawaban) plus PertanyaanArena dan InfoEkosistem sebagai dict yang
+    siap di-dump ke JSON. Satu query per tabel, dirangkai di Python.
+    """
+    pilihan_per_pertanyaan = defaultdict(list)
+    for pertanyaan_id, teks, is_benar in PilihanJawaban.objects.order_by("id").values_list(
+        "pertanyaan_id", "teks_jawaban", "is_benar"
+    ):
+        pilihan_per_pertanyaan[pertanyaan_id].append({"teks_jawaban": teks, "is_benar": is_benar})
+
+    pertanyaan_per_kuis = defaultdict(list)
+    for pertanyaan_id, kuis_id, teks in Pertanyaan.objects.order_by("id").values_list(
+        "id", "kuis_id", "teks_pertanyaan"
+    ):
+        pertanyaan_per_kuis[kuis_id].append(
+            {"teks_pertanyaan": teks, "pilihan": pilihan_per_pertanyaan[pertanyaan_id]}
+        )
+
+    kuis_per_subtopik = {
+        subtopik_id: {"judul": judul, "pertanyaan": pertanyaan_per_kuis[kuis_id]}
+        for kuis_id, subtopik_id, judul in Kuis.objects.values_list("id", "subtopik_id", "judul")
+    }
+
+    subtopik_per_topik = defaultdict(list)
+    for subtopik_id, topik_id, judul, konten, urutan in SubTopik.objects.order_by(
+        "urutan", "id"
+    ).values_list("id", "topik_id", "judul", "konten", "urutan"):
+        subtopik_per_topik[topik_id].append(
+            {
+                "judul": judul,
+                "konten": konten,
+                "urutan": urutan,
+                "kuis": kuis_per_subtopik.get(subtopik_id),
+            }
+        )
+
+    return {
+        "versi_format": VERSI_FORMAT,
+        "topik": [
+            {"judul": judul, "urutan": urutan, "subtopik": subtopik_per_topik[topik_id]}
+            for topik_id, judul, urutan in Topik.objects.order_by("urutan", "id").values_list(
+                "id", "judul", "urutan"
+            )
+        ],
+        "pertanyaan_arena": [
+            {"tipe": tipe, "konten_json": konten}
+            for tipe, konten in PertanyaanArena.objects.order_by("id").values_list(
+                "tipe", "konten_json"
+            )
+        ],
+        "info_ekosistem": list(
+            InfoEkosistem.objects.order_by("id").values(
+                "nama", "deskripsi_singkat", "gambar_url", "kategori"
+            )
+        ),
+    }
+
+
+class _Pengimpor:
+    """
+    Upsert idempoten per tingkat pohon dengan kunci alami:
+    Topik(judul), SubTopik(topik, judul), Kuis(subtopik),
+    Pertanyaan(kuis, teks), PilihanJawaban(pertanyaan, teks),
+    PertanyaanArena(tipe, konten_json), InfoEkosistem(nama).
+    Baris yang tidak ada di berkas dibiarkan (tidak dihapus). Baris yang
+    sudah ada hanya dimuat untuk induk/kunci yang muncul di berkas.
+    """
+
+    UKURAN_SARING = 500
+
+    def __init__(self, pembuat, ukuran_batch):
+        self.pembuat = pembuat
+        self.ukuran_batch = ukuran_batch
+        self.ringkasan = {}
+        self.perubahan = []
+
+    def _muat(self, model, kunci, kolom, label, saring):
+        """
+        {kunci alami: objek} untuk baris `model` yang relevan dengan berkas.
+        `saring` = (lookup, nilai): hanya baris dengan lookup__in nilai yang
+        dimuat, dalam potongan UKURAN_SARING agar tidak melewati batas
+        parameter SQLite. Kunci alami yang sudah ganda di database tidak bisa
+        dicocokkan dengan aman, jadi impor dihentikan dengan KunciAlamiGanda.
+        """
+        lookup, nilai = saring
+        nilai = sorted(set(nilai))
+        ada, ganda = {}, []
+        for i in range(0, len(nilai), self.UKURAN_SARING):
+            queryset = model.objects.filter(**{f"{lookup}__in": nilai[i:i + self.UKURAN_SARING]})
+            for obj in queryset.order_by("id").only("id", *kolom):
+                k = kunci(obj)
+                if k in ada:
+                    ganda.append(label(k))
+                ada[k] = obj
+        if ganda:
+            raise KunciAlamiGanda(
+                f"{model.__name__} dengan kunci alami ganda di database: "
+                f"{', '.join(map(repr, ganda[:5]))}{' ...' if len(ganda) > 5 else ''}. "
+                "Gabungkan atau ganti nama baris tersebut sebelum mengimpor."
+            )
+        return ada
+
+    def _upsert(self, model, ada, entri, kolom_ubah, label):
+        """
+        `entri`: list (kunci, nilai untuk objek baru). Kolom di `kolom_ubah`
+        dibandingkan dengan baris yang sudah ada dan hanya yang berbeda ditulis.
+        """
+        baru, diubah = [], []
+        dilihat = set()
+        for kunci, nilai in entri:
+            if kunci in dilihat:
+                raise FormatKurikulumTidakValid(f"{model.__name__} ganda di berkas: {label(kunci)}")
+            dilihat.add(kunci)
+            obj = ada.get(kunci)
+            if obj is None:
+                baru.append(model(**nilai))
+                self.perubahan.append(f"+ {model.__name__} {label(kunci)}")
+                continue
+            kolom_berbeda = [kolom for kolom in kolom_ubah if getattr(obj, kolom) != nilai[kolom]]
+            if kolom_berbeda:
+                for kolom in kolom_berbeda:
+                    setattr(obj, kolom, nilai[kolom])
+                diubah.append(obj)
+                self.perubahan.append(
+                    f"~ {model.__name__} {label(kunci)} ({', '.join(kolom_berbeda)})"
+                )
+        model.objects.bulk_create(baru, batch_size=self.ukuran_batch)
+        if diubah:
+            model.objects.bulk_update(diubah, kolom_ubah, batch_size=self.ukuran_batch)
+        self.ringkasan[model.__name__] = {
+            "baru": len(baru),
+            "diubah": len(diubah),
+            "sama": len(entri) - len(baru) - len(diubah),
+        }
+
+    def impor(self, data):
+        try:
+            self._impor(data)
+        except (KeyError, TypeError) as exc:
+            raise FormatKurikulumTidakValid(f"Struktur berkas tidak sesuai: {exc!r}")
+
+    def _impor(self, data):
+        if data.get("versi_format") != VERSI_FORMAT:
+            raise FormatKurikulumTidakValid(f"versi_format harus {VERSI_FORMAT}")
+        daftar_topik = data.get("topik", [])
+
+        # Topik
+        judul_topik = ("judul", [t["judul"] for t in daftar_topik])
+        ada = self._muat(Topik, lambda o: o.judul, ["judul", "urutan"], str, judul_topik)
+        self._upsert(
+            Topik,
+            ada,
+            [
+                (t["judul"], {"judul": t["judul"], "urutan": t.get("urutan", 0)})
+                for t in daftar_topik
+            ],
+            ["urutan"],
+            str,
+        )
+        topik_id = {
+            k: o.id for k, o in self._muat(Topik, lambda o: o.judul, ["judul"], str, judul_topik).items()
+        }
+
+        # SubTopik
+        kunci_subtopik = lambda o: (o.topik_id, o.judul)  # noqa: E731
+        label_subtopik = lambda k: k[1]  # noqa: E731
+        induk_subtopik = ("topik_id", topik_id.values())
+        ada = self._muat(
+            SubTopik,
+            kunci_subtopik,
+            ["topik_id", "judul", "konten", "urutan"],
+            label_subtopik,
+            induk_subtopik,
+        )
+        entri = []
+        for t in daftar_topik:
+            for s in t.get("subtopik", []):
+                nilai = {
+                    "topik_id": topik_id[t["judul"]],
+                    "judul": s["judul"],
+                    "konten": s["konten"],
+                    "urutan": s.get("urutan", 0),
+                    "pembuat": self.pembuat,
+                }
+                entri.append(((nilai["topik_id"], s["judul"]), nilai))
+        self._upsert(SubTopik, ada, entri, ["konten", "urutan"], label_subtopik)
+        subtopik_id = {
+            k: o.id
+            for k, o in self._muat(
+                SubTopik, kunci_subtopik, ["topik_id", "judul"], label_subtopik, induk_subtopik
+            ).items()
+        }
+
+        # Kuis (satu per SubTopik)
+        label_kuis = lambda k: f"subtopik #{k}"  # noqa: E731
+        induk_kuis = ("subtopik_id", subtopik_id.values())
+        ada = self._muat(Kuis, lambda o: o.subtopik_id, ["subtopik_id", "judul"], label_kuis, induk_kuis)
+        entri = []
+        for t in daftar_topik:
+            for s in t.get("subtopik", []):
+                if s.get("kuis"):
+                    id_ = subtopik_id[(topik_id[t["judul"]], s["judul"])]
+                    entri.append((id_, {"subtopik_id": id_, "judul": s["kuis"]["judul"]}))
+        self._upsert(Kuis, ada, entri, ["judul"], label_kuis)
+        kuis_id = {
+            k: o.id
+            for k, o in self._muat(
+                Kuis, lambda o: o.subtopik_id, ["subtopik_id"], label_kuis, induk_kuis
+            ).items()
+        }
+
+        # Pertanyaan
+        kunci_pertanyaan = lambda o: (o.kuis_id, o.teks_pertanyaan)  # noqa: E731
+        label_teks = lambda k: k[1][:40]  # noqa: E731
+        induk_pertanyaan = ("kuis_id", kuis_id.values())
+        ada = self._muat(
+            Pertanyaan, kunci_pertanyaan, ["kuis_id", "teks_pertanyaan"], label_teks, induk_pertanyaan
+        )
+        entri, pilihan_per_pertanyaan = [], []
+        for t in daftar_topik:
+            for s in t.get("subtopik", []):
+                if not s.get("kuis"):
+                    continue
+                id_kuis = kuis_id[subtopik_id[(topik_id[t["judul"]], s["judul"])]]
+                for p in s["kuis"].get("pertanyaan", []):
+                    kunci = (id_kuis, p["teks_pertanyaan"])
+                    nilai = {"kuis_id": id_kuis, "teks_pertanyaan": p["teks_pertanyaan"]}
+                    entri.append((kunci, nilai))
+                    pilihan_per_pertanyaan.append((kunci, p.get("pilihan", [])))
+        self._upsert(Pertanyaan, ada, entri, [], label_teks)
+        ada = self._muat(
+            Pertanyaan, kunci_pertanyaan, ["kuis_id", "teks_pertanyaan"], label_teks, induk_pertanyaan
+        )
+        pertanyaan_id = {k: o.id for k, o in ada.items()}
+
+        # PilihanJawaban
+        kunci_pilihan = lambda o: (o.pertanyaan_id, o.teks_jawaban)  # noqa: E731
+        ada = self._muat(
+            PilihanJawaban,
+            kunci_pilihan,
+            ["pertanyaan_id", "teks_jawaban", "is_benar"],
+            label_teks,
+            ("pertanyaan_id", [pertanyaan_id[kunci] for kunci, _ in pilihan_per_pertanyaan]),
+        )
+        entri = []
+        for kunci, daftar_pilihan in pilihan_per_pertanyaan:
+            id_pertanyaan = pertanyaan_id[kunci]
+            for pilihan in daftar_pilihan:
+                entri.append(
+                    (
+                        (id_pertanyaan, pilihan["teks_jawaban"]),
+                        {
+                            "pertanyaan_id": id_pertanyaan,
+                            "teks_jawaban": pilihan["teks_jawaban"],
+                            "is_benar": bool(pilihan.get("is_benar", False)),
+                        },
+                    )
+                )
+        self._upsert(PilihanJawaban, ada, entri, ["is_benar"], label_teks)
+
+        # PertanyaanArena (konten tidak punya kunci lain, jadi hanya ditambah)
+        daftar_arena = data.get("pertanyaan_arena", [])
+        label_arena = lambda k: f"{k[0]} {k[1][:40]}"  # noqa: E731
+        ada = self._muat(
+            PertanyaanArena,
+            lambda o: (o.tipe, _kunci_json(o.konten_json)),
+            ["tipe", "konten_json"],
+            label_arena,
+            ("tipe", [a["tipe"] for a in daftar_arena]),
+        )
+        self._upsert(
+            PertanyaanArena,
+            ada,
+            [
+                (
+                    (a["tipe"], _kunci_json(a["konten_json"])),
+                    {"tipe": a["tipe"], "konten_json": a["konten_json"]},
+                )
+                for a in daftar_arena
+            ],
+            [],
+            label_arena,
+        )
+
+        # InfoEkosistem
+        kolom_info = ["deskripsi_singkat", "gambar_url", "kategori"]
+        daftar_info = data.get("info_ekosistem", [])
+        ada = self._muat(
+            InfoEkosistem,
+            lambda o: o.nama,
+            ["nama", *kolom_info],
+            str,
+            ("nama", [i["nama"] for i in daftar_info]),
+        )
+        self._upsert(
+            InfoEkosistem,
+            ada,
+            [
+                (i["nama"], {"nama": i["nama"], **{k: i[k] for k in kolom_info}})
+                for i in daftar_info
+            ],
+            kolom_info,
+            str,
+        )
+
+
+def impor_kurikulum(data, pembuat, ukuran_batch=1000, dry_run=False):
+    """
+    Mengimpor dict hasil ekspor_kurikulum() dalam satu transaksi. Pada
+    dry_run, semua perubahan dijalankan lalu di-rollback sehingga ringkasan
+    dan daftar perubahan persis sama dengan impor sungguhan.
+    Bulk insert/update tidak memicu sinyal, jadi stempel versi konten
+    dinaikkan setelah commit. Mengembalikan (ringkasan, daftar perubahan).
+    """
+    pengimpor = _Pengimpor(pembuat, ukuran_batch)
+    with transaction.atomic():
+        pengimpor.impor(data)
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            for nama in (VERSI_KURIKULUM, VERSI_KUIS, VERSI_ARENA, VERSI_INFO):
+                transaction.on_commit(lambda nama=nama: naikkan_versi(nama))
+    return pengimpor.ringkasan, pengimpor.perubahan
@@ -0,0 +1,118 @@
+# core/lencana.py
+
+from bisect import bisect_right
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Lencana, ProfilSiswa
+from .versi import VERSI_LENCANA, ambil_versi, naikkan_versi_siswa
+
+
+class IndeksLencana:
+    """
+    Daftar lencana yang diurutkan berdasarkan syarat_poin, disimpan di memori
+    proses dan dimuat ulang hanya jika stempel versi lencana berubah.
+    """
+
+    def __init__(self):
+        self._data = (None, [], [])
+
+    def _muat(self):
+        versi = ambil_versi(VERSI_LENCANA)
+        data = self._data
+        if data[0] != versi:
+            daftar = list(Lencana.objects.order_by("syarat_poin", "id"))
+            data = (versi, [lencana.syarat_poin for lencana in daftar], daftar)
+            self._data = data
+        return data
+
+    def terlewati(self, poin_lama, poin_baru):
+        """
+        Lencana dengan poin_lama < syarat_poin <= poin_baru, dicari dengan
+        bisect (O(log B)) alih-alih memindai seluruh tabel Lencana.
+        """
+        if poin_baru <= poin_lama:
+            return []
+        _, syarat, daftar = self._muat()
+        return daftar[bisect_right(syarat, poin_lama):bisect_right(syarat, poin_baru)]
+
+    def semua(self):
+        """Semua lencana, terurut berdasarkan syarat_poin."""
+        return self._muat()[2]
+
+    def tercapai(self, poin):
+        """Semua lencana dengan syarat_poin <= poin."""
+        _, syarat, daftar = self._muat()
+        return daftar[:bisect_right(syarat, poin)]
+
+
+indeks_lencana = IndeksLencana()
+
+
+def berikan_lencana(profil_id, user_id, poin_lama, poin_baru):
+    """
+    Memberikan lencana yang ambangnya terlewati saat poin siswa naik dari
+    poin_lama ke poin_baru: satu bulk insert ke tabel M2M dan satu UPDATE
+    penghitung. Ambang yang baru terlewati belum dimiliki siswa (kecuali
+    diberikan manual lewat admin; baris itu diabaikan oleh ignore_conflicts),
+    jadi tidak perlu membaca lencana yang sudah ada lebih dulu.
+    Mengembalikan daftar lencana yang baru didapat.
+    """
+    kandidat = indeks_lencana.terlewati(poin_lama, poin_baru)
+    if not kandidat:
+        return []
+    return _simpan_lencana(profil_id, user_id, kandidat)
+
+
+def _simpan_lencana(profil_id, user_id, lencana_baru):
+    Relasi = ProfilSiswa.lencana.through
+    Relasi.objects.bulk_create(
+        [Relasi(profilsiswa_id=profil_id, lencana_id=lencana.id) for lencana in lencana_baru],
+        ignore_conflicts=True,
+    )
+    # bulk_create tidak memicu m2m_changed, jadi jumlah dan stempel data
+    # siswa disinkronkan di sini. Jumlah dihitung ulang (bukan ditambah
+    # len(lencana_baru)) agar baris yang bentrok tidak membuatnya melenceng.
+    hitung_ulang_jumlah_lencana([profil_id])
+    naikkan_versi_siswa(user_id)
+    return lencana_baru
+
+
+def hitung_ulang_jumlah_lencana(profil_ids=None):
+    """
+    Menyalin jumlah baris M2M lencana ke ProfilSiswa.jumlah_lencana dengan
+    satu UPDATE. Tanpa argumen, semua profil dihitung ulang.
+    """
+    Relasi = ProfilSiswa.lencana.through
+    jumlah = (
+        Relasi.objects.filter(profilsiswa_id=OuterRef("pk"))
+        .values("profilsiswa_id")
+        .annotate(jumlah=Count("id"))
+        .values("jumlah")
+    )
+    profil = ProfilSiswa.objects.all()
+    if profil_ids is not None:
+        profil = profil.filter(id__in=profil_ids)
+    return profil.update(jumlah_lencana=Coalesce(Subquery(jumlah), 0))
+
+
+def sinkronkan_lencana(profil_siswa):
+    """
+    Memberikan semua lencana yang syaratnya sudah terpenuhi oleh total poin
+    saat ini, termasuk lencana yang ditambahkan setelah siswa melewati
+    ambangnya.
+    """
+    kandidat = indeks_lencana.tercapai(profil_siswa.total_poin)
+    if not kandidat:
+        return []
+    # Di sini sebagian besar kandidat biasanya sudah dimiliki
+    sudah_dimiliki = set(
+        ProfilSiswa.lencana.through.objects.filter(
+            profilsiswa_id=profil_siswa.id, lencana_id__in=[lencana.id for lencana in kandidat]
+        ).values_list("lencana_id", flat=True)
+    )
+    lencana_baru = [lencana for lencana in kandidat if lencana.id not in sudah_dimiliki]
+    if not lencana_baru:
+        return []
+    return _simpan_lencana(profil_siswa.id, profil_siswa.user_id, lencana_baru)
@@ -0,0 +1,132 @@
+# core/management/commands/benchmark_asgi.py
+
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.management.commands.benchmark_views import ambil_user_benchmark
+from core.models import PertanyaanArena
+
+ENDPOINT = ("api_klasifikasi", "api_simpan_jawaban")
+
+
+def _ringkas(latensi, status, durasi):
+    latensi = sorted(latensi)
+    return {
+        "request": len(latensi),
+        "status": sorted(status),
+        "req_per_detik": round(len(latensi) / durasi, 1),
+        "p50_ms": round(statistics.median(latensi), 3),
+        "p95_ms": round(latensi[int(0.95 * (len(latensi) - 1))], 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Membandingkan request per detik endpoint JSON arena di bawah handler "
+        "WSGI (thread pool) dan ASGI (event loop) dengan konkurensi yang sama, "
+        "in-process lewat Client/AsyncClient Django."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--request", type=int, default=500, help="Request per endpoint per mode.")
+        parser.add_argument("--konkurensi", type=int, default=50, help="Request yang berjalan bersamaan.")
+        parser.add_argument("--siswa", help="Username siswa yang dipakai (default: siswa pertama).")
+        parser.add_argument("--endpoint", nargs="*", choices=ENDPOINT, default=list(ENDPOINT))
+
+    def handle(self, *args, **options):
+        siswa = ambil_user_benchmark(options["siswa"], "Siswa")
+        arena = PertanyaanArena.objects.order_by("id").first()
+        self.permintaan = {
+            "api_klasifikasi": ("get", reverse("api_klasifikasi"), None),
+            "api_simpan_jawaban": (
+                "post",
+                reverse("api_simpan_jawaban"),
+                json.dumps({"pertanyaan_id": arena.pk if arena else 0, "jawaban_benar": True}),
+            ),
+        }
+
+        hasil = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for nama in options["endpoint"]:
+                hasil[nama] = {
+                    "wsgi": self._wsgi(nama, siswa, options),
+                    "asgi": asyncio.run(self._asgi(nama, siswa, options)),
+                }
+        self.stdout.write(
+            json.dumps(
+                {
+                    "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "konkurensi": options["konkurensi"],
+                    "endpoint": hasil,
+                },
+                indent=2,
+            )
+        )
+
+    def _wsgi(self, nama, siswa, options):
+        metode, url, badan = self.permintaan[nama]
+        lokal = threading.local()
+        latensi, status = [], set()
+
+        def kirim(_):
+            client = getattr(lokal, "client", None)
+            if client is None:
+                client = lokal.client = Client()
+                client.force_login(siswa)
+            mulai = time.perf_counter()
+            if metode == "post":
+                response = client.post(url, badan, content_type="application/json")
+            else:
+                response = client.get(url)
+            status.add(response.status_code)
+            latensi.append((time.perf_counter() - mulai) * 1000)
+
+        def tutup_koneksi(_):
+            connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=options["konkurensi"]) as pool:
+            # Pemanasan: setiap thread membuat client dan sesi login sendiri
+            list(pool.map(kirim, range(options["konkurensi"])))
+            latensi.clear()
+            status.clear()
+            mulai = time.perf_counter()
+            list(pool.map(kirim, range(options["request"])))
+            durasi = time.perf_counter() - mulai
+            list(pool.map(tutup_koneksi, range(options["konkurensi"])))
+        return _ringkas(latensi, status, durasi)
+
+    async def _asgi(self, nama, siswa, options):
+        metode, url, badan = self.permintaan[nama]
+        client = AsyncClient()
+        await client.aforce_login(siswa)
+        latensi, status = [], set()
+        semafor = asyncio.Semaphore(options["konkurensi"])
+
+        async def kirim():
+            async with semafor:
+                mulai = time.perf_counter()
+                if metode == "post":
+                    response = await client.post(url, badan, content_type="application/json")
+                else:
+                    response = await client.get(url)
+                status.add(response.status_code)
+                latensi.append((time.perf_counter() - mulai) * 1000)
+
+        await asyncio.gather(*(kirim() for _ in range(options["konkurensi"])))
+        latensi.clear()
+        status.clear()
+        mulai = time.perf_counter()
+        await asyncio.gather(*(kirim() for _ in range(options["request"])))
+        durasi = time.perf_counter() - mulai
+        return _ringkas(latensi, status, durasi)
@@ -0,0 +1,73 @@
+# core/management/commands/benchmark_penilaian.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Kuis, Pertanyaan, PilihanJawaban, SubTopik, Topik, User
+from core.penilaian import nilai_kuis
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mengukur jumlah query dan waktu penilaian satu pengiriman kuis untuk "
+        "berbagai panjang kuis. Semua data uji dibuat di dalam transaksi yang "
+        "di-rollback, sehingga database tidak berubah."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ukuran",
+            type=int,
+            nargs="+",
+            default=[5, 20, 50, 100, 200],
+            help="Daftar jumlah pertanyaan per kuis yang diuji.",
+        )
+        parser.add_argument(
+            "--ulang", type=int, default=5, help="Jumlah pengiriman per ukuran kuis."
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'pertanyaan':>10} {'query/kirim':>12} {'ms/kirim':>10}")
+        try:
+            with transaction.atomic():
+                for ukuran in options["ukuran"]:
+                    self._ukur(ukuran, options["ulang"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _ukur(self, ukuran, ulang):
+        guru = User.objects.create(username=f"_bench_guru_{ukuran}", role="Guru")
+        siswa = User.objects.create(username=f"_bench_siswa_{ukuran}", role="Siswa")
+        topik = Topik.objects.create(judul=f"_bench_{ukuran}")
+        subtopik = SubTopik.objects.create(
+            topik=topik, judul=f"_bench_{ukuran}", konten="-", pembuat=guru
+        )
+        kuis = Kuis.objects.create(subtopik=subtopik, judul=f"_bench_{ukuran}")
+        pertanyaan_list = Pertanyaan.objects.bulk_create(
+            [Pertanyaan(kuis=kuis, teks_pertanyaan=f"Soal {i}") for i in range(ukuran)]
+        )
+        pilihan_list = PilihanJawaban.objects.bulk_create(
+            [
+                PilihanJawaban(pertanyaan=p, teks_jawaban=f"Pilihan {j}", is_benar=(j == 0))
+                for p in pertanyaan_list
+                for j in range(4)
+            ]
+        )
+        jawaban = {p.pertanyaan_id: p.id for p in pilihan_list[::4]}
+
+        total_query = 0
+        mulai = time.perf_counter()
+        for _ in range(ulang):
+            with CaptureQueriesContext(connection) as konteks:
+                nilai_kuis(siswa, kuis, jawaban)
+            total_query += len(konteks.captured_queries)
+        durasi_ms = (time.perf_counter() - mulai) * 1000 / ulang
+        self.stdout.write(f"{ukuran:>10} {total_query / ulang:>12.1f} {durasi_ms:>10.2f}")
@@ -0,0 +1,216 @@
+# core/management/commands/benchmark_views.py
+
+import json
+import statistics
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from core import urls as core_urls
+from core.kunci_jawaban import ambil_kunci_jawaban
+from core.models import PertanyaanArena, SubTopik, User
+
+# Satu permintaan benchmark. metode: "get" (data = query string), "post"
+# (data = form) atau "post-json". Skenario yang `mengubah` data dijalankan di
+# dalam transaksi yang di-rollback, jadi database tidak berubah.
+Skenario = namedtuple("Skenario", "peran metode data mengubah", defaults=(None, False))
+
+# Skenario per nama URL di core/urls.py. Peran None berarti anonim; `data`
+# dibuat dari dict sampel. URL yang tidak ada di sini dilaporkan sebagai "dilewati".
+SKENARIO = {
+    "dashboard": [Skenario("Siswa", "get")],
+    "register": [Skenario(None, "get")],
+    "login": [Skenario(None, "get")],
+    "subtopik_detail": [Skenario("Siswa", "get")],
+    "kuis": [
+        Skenario("Siswa", "get"),
+        Skenario("Siswa", "post", lambda sampel: sampel["jawaban_kuis"], mengubah=True),
+    ],
+    "api_klasifikasi": [Skenario(None, "get")],
+    "api_rantai_makanan": [Skenario(None, "get")],
+    "api_papan_peringkat": [Skenario("Siswa", "get")],
+    "duel_simbiosis": [Skenario("Siswa", "get")],
+    "api_simpan_jawaban": [
+        Skenario(
+            "Siswa",
+            "post-json",
+            lambda sampel: {"pertanyaan_id": sampel["arena_id"], "jawaban_benar": True},
+            mengubah=True,
+        )
+    ],
+    "jejak_predator": [Skenario("Siswa", "get")],
+    "progres": [Skenario("Siswa", "get")],
+    "riwayat_progres": [Skenario("Siswa", "get")],
+    "teacher_dashboard": [Skenario("Guru", "get")],
+    "perbarui_snapshot_kelas": [Skenario("Guru", "post", mengubah=True)],
+    "ekspor": [
+        Skenario("Guru", "get", lambda sampel: {"format": "csv", "siswa": sampel["user_id"]}),
+        Skenario("Guru", "get", lambda sampel: {"format": "ndjson", "siswa": sampel["user_id"]}),
+    ],
+    "detail_siswa": [Skenario("Guru", "get")],
+    "riwayat_detail_siswa": [Skenario("Guru", "get")],
+    "tandai_materi_selesai": [Skenario("Siswa", "get", mengubah=True)],
+    "batalkan_materi_selesai": [Skenario("Siswa", "get", mengubah=True)],
+}
+
+
+def ambil_user_benchmark(username, role):
+    users = User.objects.filter(role=role).order_by("id")
+    user = users.filter(username=username).first() if username else users.first()
+    if user is None:
+        raise CommandError(f"Tidak ada pengguna dengan role {role}. Jalankan isi_data_sintetis dulu.")
+    return user
+
+
+def daftar_skenario(siswa, guru, route=None):
+    """
+    Menghasilkan (nama, client, skenario, url, data) untuk setiap skenario
+    route di core/urls.py; route tanpa skenario menghasilkan client None.
+    Route dengan lebih dari satu skenario diberi nama "route #n". Query
+    string skenario GET sudah digabung ke url. Dipakai juga oleh `cek_query_plan`.
+    """
+    subtopik = (
+        SubTopik.objects.filter(kuis__isnull=False).select_related("kuis").order_by("id").first()
+    )
+    arena = PertanyaanArena.objects.order_by("id").first()
+    if subtopik is None or arena is None:
+        raise CommandError("Butuh minimal satu SubTopik berkuis dan satu PertanyaanArena.")
+    sampel = {
+        "pk": subtopik.pk,
+        "user_id": siswa.pk,
+        "arena_id": arena.pk,
+        "jenis": "log-kuis",
+        "jawaban_kuis": {
+            f"pertanyaan_{pertanyaan_id}": pilihan_id
+            for pertanyaan_id, pilihan_id in ambil_kunci_jawaban(subtopik.kuis.id).items()
+            if pilihan_id is not None
+        },
+    }
+
+    # Error 500 dicatat sebagai status, bukan menghentikan benchmark
+    klien = {peran: Client(raise_request_exception=False) for peran in (None, "Siswa", "Guru")}
+    klien["Siswa"].force_login(siswa)
+    klien["Guru"].force_login(guru)
+
+    for pola in core_urls.urlpatterns:
+        nama = pola.name
+        if route and nama not in route:
+            continue
+        if nama not in SKENARIO:
+            yield nama, None, None, None, None
+            continue
+        url = reverse(nama, kwargs={k: sampel[k] for k in pola.pattern.converters})
+        daftar = SKENARIO[nama]
+        for i, skenario in enumerate(daftar):
+            label = f"{nama} #{i + 1}" if len(daftar) > 1 else nama
+            data = skenario.data(sampel) if skenario.data else None
+            if skenario.metode == "get" and data:
+                url_skenario, data = f"{url}?{urlencode(data)}", None
+            else:
+                url_skenario = url
+            yield label, klien[skenario.peran], skenario, url_skenario, data
+
+
+def _kirim(client, metode, url, data):
+    if metode == "post-json":
+        response = client.post(url, json.dumps(data), content_type="application/json")
+    elif metode == "post":
+        response = client.post(url, data or {})
+    else:
+        response = client.get(url)
+    if response.streaming:
+        # Test client tidak membaca StreamingHttpResponse; query ekspor baru
+        # berjalan saat isinya dibaca
+        b"".join(response.streaming_content)
+    return response
+
+
+def kirim_skenario(client, skenario, url, data):
+    if not skenario.mengubah:
+        return _kirim(client, skenario.metode, url, data)
+    with transaction.atomic():
+        response = _kirim(client, skenario.metode, url, data)
+        transaction.set_rollback(True)
+    return response
+
+
+def _persentil(nilai, p):
+    nilai = sorted(nilai)
+    return nilai[min(len(nilai) - 1, int(round(p / 100 * (len(nilai) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Menjalankan setiap route di core/urls.py lewat Django test client dan "
+        "melaporkan latensi p50/p95/p99 serta jumlah query dalam format JSON. "
+        "Skenario yang mengubah data dijalankan dalam transaksi yang di-rollback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterasi", type=int, default=20, help="Request per route.")
+        parser.add_argument("--pemanasan", type=int, default=2, help="Request awal yang tidak diukur.")
+        parser.add_argument("--siswa", help="Username siswa yang dipakai (default: siswa pertama).")
+        parser.add_argument("--guru", help="Username guru yang dipakai (default: guru pertama).")
+        parser.add_argument("--route", nargs="*", help="Batasi ke nama route tertentu.")
+        parser.add_argument("--keluaran", help="Tulis hasil JSON ke berkas ini (default: stdout).")
+
+    def handle(self, *args, **options):
+        siswa = ambil_user_benchmark(options["siswa"], "Siswa")
+        guru = ambil_user_benchmark(options["guru"], "Guru")
+
+        hasil = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for nama, client, skenario, url, data in daftar_skenario(
+                siswa, guru, options["route"]
+            ):
+                if client is None:
+                    hasil[nama] = {"dilewati": True}
+                    continue
+                hasil[nama] = self._ukur(client, skenario, url, data, options)
+
+        laporan = json.dumps(
+            {
+                "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "iterasi": options["iterasi"],
+                "database": connection.vendor,
+                "route": hasil,
+            },
+            indent=2,
+        )
+        if options["keluaran"]:
+            with open(options["keluaran"], "w", encoding="utf-8") as berkas:
+                berkas.write(laporan + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Hasil ditulis ke {options['keluaran']}"))
+        else:
+            self.stdout.write(laporan)
+
+    def _ukur(self, client, skenario, url, data, options):
+        for _ in range(options["pemanasan"]):
+            kirim_skenario(client, skenario, url, data)
+        latensi, jumlah_query, status = [], [], set()
+        for _ in range(options["iterasi"]):
+            with CaptureQueriesContext(connection) as konteks:
+                mulai = time.perf_counter()
+                response = kirim_skenario(client, skenario, url, data)
+                latensi.append((time.perf_counter() - mulai) * 1000)
+            jumlah_query.append(len(konteks.captured_queries))
+            status.add(response.status_code)
+        return {
+            "url": url,
+            "metode": skenario.metode.upper(),
+            "di_rollback": skenario.mengubah,
+            "status": sorted(status),
+            "p50_ms": round(_persentil(latensi, 50), 3),
+            "p95_ms": round(_persentil(latensi, 95), 3),
+            "p99_ms": round(_persentil(latensi, 99), 3),
+            "rata_rata_ms": round(statistics.fmean(latensi), 3),
+            "query_rata_rata": round(statistics.fmean(jumlah_query), 2),
+            "query_maks": max(jumlah_query),
+        }
@@ -0,0 +1,42 @@
+# core/management/commands/buat_snapshot_kelas.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.analitik_kelas import buat_snapshot_kelas
+
+
+class Command(BaseCommand):
+    help = (
+        "Menghitung KPI dashboard guru dan menyimpannya sebagai SnapshotKelas. "
+        "Jalankan dari cron, atau dengan --ulangi sebagai proses latar berkala."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ulangi",
+            type=int,
+            metavar="DETIK",
+            help="Buat snapshot setiap DETIK detik sampai dihentikan (Ctrl+C).",
+        )
+        parser.add_argument(
+            "--simpan",
+            type=int,
+            default=getattr(settings, "EKOSPHERE_SNAPSHOT_KELAS_SIMPAN", None),
+            help="Jumlah snapshot terbaru yang dipertahankan; sisanya dihapus.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            snapshot = buat_snapshot_kelas(simpan=options["simpan"])
+            self.stdout.write(
+                f"Snapshot {snapshot.pk} dibuat pada {snapshot.dibuat_pada:%Y-%m-%d %H:%M:%S} "
+                f"({snapshot.durasi_ms:.1f} ms)"
+            )
+            if not options["ulangi"]:
+                break
+            close_old_connections()
+            time.sleep(options["ulangi"])
@@ -0,0 +1,149 @@
+# core/management/commands/cek_query_plan.py
+
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core.management.commands.benchmark_views import (
+    ambil_user_benchmark,
+    daftar_skenario,
+    kirim_skenario,
+)
+from core.middleware import sidik_jari_sql
+
+# Hanya query baca/ubah yang punya rencana eksekusi bermakna
+_POLA_DIPERIKSA = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+_POLA_SCAN = re.compile(r"^SCAN (\S+)")
+# Alias tabel yang dibuat ORM, mis. `"core_user" T4`
+_POLA_ALIAS = re.compile(r'"(\w+)" (T\d+)\b')
+
+
+def _ukuran_tabel():
+    with connection.cursor() as cursor:
+        ukuran = {}
+        for tabel in connection.introspection.table_names(cursor):
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(tabel)}")
+            ukuran[tabel] = cursor.fetchone()[0]
+    return ukuran
+
+
+def periksa_rencana(sql, tabel_besar):
+    """
+    Menjalankan EXPLAIN QUERY PLAN untuk `sql` dan mengembalikan daftar
+    pelanggaran: SCAN penuh atas tabel besar, atau sort/grup dengan temp
+    B-tree pada query yang menyentuh tabel besar.
+    """
+    alias = {nama_alias: tabel for tabel, nama_alias in _POLA_ALIAS.findall(sql)}
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        detail = [baris[-1] for baris in cursor.fetchall()]
+
+    disentuh = set()
+    for langkah in detail:
+        for kata in re.findall(r"\b\w+\b", langkah):
+            tabel = alias.get(kata, kata)
+            if tabel in tabel_besar:
+                disentuh.add(tabel)
+
+    pelanggaran = []
+    for langkah in detail:
+        cocok = _POLA_SCAN.match(langkah)
+        if cocok and alias.get(cocok[1], cocok[1]) in tabel_besar:
+            pelanggaran.append(langkah)
+        elif "USE TEMP B-TREE" in langkah and disentuh:
+            pelanggaran.append(f"{langkah} ({', '.join(sorted(disentuh))})")
+    return detail, pelanggaran
+
+
+def periksa_query(captured_queries, tabel_besar, diizinkan=()):
+    """
+    Memeriksa rencana setiap query unik (per sidik jari) dari
+    CaptureQueriesContext. Mengembalikan [(sidik_jari, detail, pelanggaran)];
+    pelanggaran dikosongkan untuk sidik jari yang cocok dengan `diizinkan`.
+    """
+    diperiksa = {}
+    for query in captured_queries:
+        if _POLA_DIPERIKSA.match(query["sql"]):
+            diperiksa.setdefault(sidik_jari_sql(query["sql"]), query["sql"])
+    hasil = []
+    for sidik_jari, sql in diperiksa.items():
+        detail, pelanggaran = periksa_rencana(sql, tabel_besar)
+        if any(pola.search(sidik_jari) for pola in diizinkan):
+            pelanggaran = []
+        hasil.append((sidik_jari, detail, pelanggaran))
+    return hasil
+
+
+class Command(BaseCommand):
+    help = (
+        "Menangkap SQL setiap view di core/views.py, menjalankan EXPLAIN QUERY PLAN, "
+        "dan gagal (exit code bukan 0) jika ada full table scan atau temp B-tree "
+        "pada tabel besar. Jalankan pada data berskala produksi (isi_data_sintetis)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ambang-baris",
+            type=int,
+            default=1000,
+            help="Tabel dengan jumlah baris sebanyak ini atau lebih dianggap besar.",
+        )
+        parser.add_argument("--siswa", help="Username siswa yang dipakai (default: siswa pertama).")
+        parser.add_argument("--guru", help="Username guru yang dipakai (default: guru pertama).")
+        parser.add_argument("--route", nargs="*", help="Batasi ke nama route tertentu.")
+        parser.add_argument(
+            "--rencana", action="store_true", help="Tampilkan rencana eksekusi setiap query."
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("cek_query_plan hanya mendukung SQLite (EXPLAIN QUERY PLAN).")
+
+        tabel_besar = {
+            tabel for tabel, jumlah in _ukuran_tabel().items() if jumlah >= options["ambang_baris"]
+        }
+        if not tabel_besar:
+            raise CommandError(
+                f"Tidak ada tabel dengan {options['ambang_baris']} baris atau lebih. "
+                "Jalankan isi_data_sintetis dulu atau turunkan --ambang-baris."
+            )
+        self.stdout.write(f"Tabel besar: {', '.join(sorted(tabel_besar))}")
+        diizinkan = [re.compile(pola) for pola in getattr(settings, "EKOSPHERE_QUERY_PLAN_DIIZINKAN", [])]
+
+        siswa = ambil_user_benchmark(options["siswa"], "Siswa")
+        guru = ambil_user_benchmark(options["guru"], "Guru")
+        jumlah_gagal = 0
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for nama, client, skenario, url, data in daftar_skenario(
+                siswa, guru, options["route"]
+            ):
+                if client is None:
+                    self.stdout.write(f"- {nama}: dilewati (tidak ada skenario)")
+                    continue
+                with CaptureQueriesContext(connection) as konteks:
+                    kirim_skenario(client, skenario, url, data)
+
+                diperiksa = periksa_query(konteks.captured_queries, tabel_besar, diizinkan)
+                gagal_route = []
+                for sidik_jari, detail, pelanggaran in diperiksa:
+                    if options["rencana"]:
+                        self.stdout.write(f"  {sidik_jari}\n    " + "\n    ".join(detail))
+                    if pelanggaran:
+                        gagal_route.append((sidik_jari, pelanggaran))
+
+                if gagal_route:
+                    jumlah_gagal += len(gagal_route)
+                    self.stdout.write(self.style.ERROR(f"- {nama}: {len(gagal_route)} query bermasalah"))
+                    for sidik_jari, pelanggaran in gagal_route:
+                        self.stdout.write(f"    {sidik_jari}")
+                        for langkah in pelanggaran:
+                            self.stdout.write(f"      -> {langkah}")
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"- {nama}: {len(diperiksa)} query OK"))
+
+        if jumlah_gagal:
+            raise CommandError(f"{jumlah_gagal} query jatuh ke full scan / temp B-tree pada tabel besar.")
+        self.stdout.write(self.style.SUCCESS("Semua rencana query lolos."))
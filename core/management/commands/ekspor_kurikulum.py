@@ -0,0 +1,45 @@
+# core/management/commands/ekspor_kurikulum.py
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.kurikulum_json import ekspor_kurikulum
+
+
+class Command(BaseCommand):
+    help = (
+        "Mengekspor kurikulum (Topik, SubTopik, Kuis, Pertanyaan, PilihanJawaban), "
+        "PertanyaanArena dan InfoEkosistem ke satu berkas JSON yang bisa diimpor "
+        "kembali dengan impor_kurikulum."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "berkas",
+            nargs="?",
+            default="-",
+            help="Berkas tujuan; '-' (bawaan) untuk stdout.",
+        )
+
+    def handle(self, *args, **options):
+        data = ekspor_kurikulum()
+        if options["berkas"] == "-":
+            # Lewat self.stdout agar bisa ditangkap call_command(stdout=...)
+            self.stdout.write(json.dumps(data, ensure_ascii=False, indent=2))
+            return
+        with open(options["berkas"], "w", encoding="utf-8") as berkas:
+            json.dump(data, berkas, ensure_ascii=False, indent=2)
+        jumlah_pertanyaan = sum(
+            len(subtopik["kuis"]["pertanyaan"])
+            for topik in data["topik"]
+            for subtopik in topik["subtopik"]
+            if subtopik["kuis"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(data['topik'])} topik, {jumlah_pertanyaan} pertanyaan, "
+                f"{len(data['pertanyaan_arena'])} soal arena dan "
+                f"{len(data['info_ekosistem'])} info ekosistem ditulis ke {options['berkas']}"
+            )
+        )
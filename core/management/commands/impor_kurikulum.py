@@ -0,0 +1,88 @@
+# core/management/commands/impor_kurikulum.py
+
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.kurikulum_json import FormatKurikulumTidakValid, impor_kurikulum
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Mengimpor berkas JSON hasil ekspor_kurikulum dalam satu transaksi dengan "
+        "bulk insert/update. Baris dicocokkan dengan kunci alami (mis. judul topik, "
+        "teks pertanyaan) sehingga impor ulang berkas yang sama tidak mengubah apa pun. "
+        "Gunakan --dry-run untuk melihat perubahan tanpa menyimpannya."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("berkas", help="Berkas JSON sumber; '-' untuk stdin.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Tampilkan ringkasan perubahan lalu batalkan transaksi.",
+        )
+        parser.add_argument(
+            "--pembuat",
+            help="Username guru untuk SubTopik baru (bawaan: guru pertama).",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=1000,
+            help="Ukuran batch bulk_create/bulk_update (bawaan 1000).",
+        )
+
+    def _pembuat(self, username):
+        guru = User.objects.filter(role="Guru")
+        if username:
+            pembuat = guru.filter(username=username).first()
+            if pembuat is None:
+                raise CommandError(f"Guru dengan username {username!r} tidak ditemukan.")
+            return pembuat
+        pembuat = guru.order_by("id").first()
+        if pembuat is None:
+            raise CommandError("Belum ada akun guru untuk dijadikan pembuat SubTopik.")
+        return pembuat
+
+    def handle(self, *args, **options):
+        try:
+            if options["berkas"] == "-":
+                data = json.load(sys.stdin)
+            else:
+                with open(options["berkas"], encoding="utf-8") as berkas:
+                    data = json.load(berkas)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Berkas tidak bisa dibaca: {exc}")
+
+        mulai = time.perf_counter()
+        try:
+            ringkasan, perubahan = impor_kurikulum(
+                data,
+                pembuat=self._pembuat(options["pembuat"]),
+                ukuran_batch=options["batch"],
+                dry_run=options["dry_run"],
+            )
+        except FormatKurikulumTidakValid as exc:
+            raise CommandError(str(exc))
+        durasi = time.perf_counter() - mulai
+
+        if options["verbosity"] >= 2:
+            for baris in perubahan:
+                self.stdout.write(baris)
+        self.stdout.write(f"{'Model':<16} {'baru':>8} {'diubah':>8} {'sama':>8}")
+        for model, jumlah in ringkasan.items():
+            self.stdout.write(
+                f"{model:<16} {jumlah['baru']:>8} {jumlah['diubah']:>8} {jumlah['sama']:>8}"
+            )
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(f"Dry run: {len(perubahan)} perubahan tidak disimpan.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(perubahan)} perubahan disimpan dalam {durasi:.2f} detik.")
+            )
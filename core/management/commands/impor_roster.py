@@ -0,0 +1,108 @@
+# core/management/commands/impor_roster.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.roster import (
+    RosterTidakValid,
+    baca_roster,
+    hash_paralel,
+    pisahkan_yang_sudah_ada,
+    simpan_roster,
+    tulis_kredensial_sementara,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Membuat akun siswa (User role Siswa + ProfilSiswa) secara massal dari CSV "
+        "roster dengan kolom username, password, first_name, last_name, email. "
+        "Password di-hash paralel di beberapa proses lalu disimpan dengan bulk insert."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("berkas", help="Berkas CSV roster (UTF-8, dengan header).")
+        parser.add_argument(
+            "--proses",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Jumlah proses untuk hashing password (bawaan: jumlah CPU).",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=500,
+            help="Ukuran batch bulk insert (bawaan 500).",
+        )
+        parser.add_argument(
+            "--kredensial",
+            help="Tulis username dan password acak (untuk baris tanpa password) ke CSV ini.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Hanya validasi roster; tidak ada hashing maupun penyimpanan.",
+        )
+
+    def _tahap(self, nama, jumlah, durasi):
+        laju = jumlah / durasi if durasi else 0
+        self.stdout.write(f"{nama:<10} {jumlah:>7} baris {durasi:>8.2f} s {laju:>10.0f} baris/s")
+
+    def handle(self, *args, **options):
+        mulai = time.perf_counter()
+        try:
+            with open(options["berkas"], encoding="utf-8-sig", newline="") as berkas:
+                baris_roster = baca_roster(berkas)
+        except OSError as exc:
+            raise CommandError(f"Berkas tidak bisa dibaca: {exc}")
+        except RosterTidakValid as exc:
+            for pesan in exc.kesalahan:
+                self.stderr.write(pesan)
+            raise CommandError(str(exc))
+        baru, sudah_ada = pisahkan_yang_sudah_ada(baris_roster)
+        self._tahap("baca", len(baris_roster), time.perf_counter() - mulai)
+        if sudah_ada:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(sudah_ada)} username sudah terdaftar dan dilewati: "
+                    + ", ".join(sudah_ada[:10])
+                    + (" ..." if len(sudah_ada) > 10 else "")
+                )
+            )
+
+        dibuat = [data for data in baru if data["password_dibuat"]]
+        if dibuat and not options["kredensial"]:
+            raise CommandError(
+                f"{len(dibuat)} baris tanpa password; berikan --kredensial agar "
+                "password acaknya bisa dibagikan."
+            )
+        if options["dry_run"] or not baru:
+            self.stdout.write(f"{len(baru)} akun siswa akan dibuat; tidak ada yang disimpan.")
+            return
+
+        mulai = time.perf_counter()
+        hashes = hash_paralel([data["password"] for data in baru], proses=options["proses"])
+        self._tahap("hash", len(hashes), time.perf_counter() - mulai)
+
+        kredensial_sementara = None
+        if dibuat:
+            try:
+                kredensial_sementara = tulis_kredensial_sementara(options["kredensial"], dibuat)
+            except OSError as exc:
+                raise CommandError(f"Berkas kredensial tidak bisa ditulis: {exc}")
+
+        mulai = time.perf_counter()
+        try:
+            jumlah = simpan_roster(baru, hashes, ukuran_batch=options["batch"])
+        except BaseException:
+            if kredensial_sementara:
+                os.unlink(kredensial_sementara)
+            raise
+        self._tahap("simpan", jumlah, time.perf_counter() - mulai)
+
+        if kredensial_sementara:
+            os.replace(kredensial_sementara, options["kredensial"])
+            self.stdout.write(f"Password acak {len(dibuat)} siswa ditulis ke {options['kredensial']}")
+        self.stdout.write(self.style.SUCCESS(f"{jumlah} akun siswa dibuat."))
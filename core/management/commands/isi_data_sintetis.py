@@ -0,0 +1,343 @@
+# core/management/commands/isi_data_sintetis.py
+
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.lencana import hitung_ulang_jumlah_lencana
+from core.models import (
+    HasilKuis,
+    InfoEkosistem,
+    JawabanSiswa,
+    Kuis,
+    Lencana,
+    Pertanyaan,
+    PertanyaanArena,
+    PilihanJawaban,
+    ProfilSiswa,
+    QuizAttemptLog,
+    SubTopik,
+    Topik,
+    User,
+    UserMateriProgress,
+)
+from core.statistik import rebuild_statistik_modul, rebuild_statistik_pertanyaan
+from core.versi import (
+    VERSI_ARENA,
+    VERSI_INFO,
+    VERSI_KUIS,
+    VERSI_KURIKULUM,
+    VERSI_LENCANA,
+    VERSI_PERINGKAT,
+    naikkan_versi,
+)
+
+PREFIKS = "sintetis"
+
+
+def _per_batch(iterable, ukuran):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, ukuran))
+        if not batch:
+            return
+        yield batch
+
+
+def _sisipkan_mentah(model, fields, baris, ukuran_batch):
+    """
+    INSERT massal lewat executemany untuk tabel log berukuran jutaan baris.
+    Berbeda dengan bulk_create, nilai auto_now_add (waktu) bisa diisi sendiri
+    sehingga data tersebar realistis di masa lalu.
+    """
+    qn = connection.ops.quote_name
+    kolom = [qn(model._meta.get_field(field).column) for field in fields]
+    sql = (
+        f"INSERT INTO {qn(model._meta.db_table)} ({', '.join(kolom)}) "
+        f"VALUES ({', '.join(['%s'] * len(kolom))})"
+    )
+    jumlah = 0
+    with connection.cursor() as cursor:
+        for batch in _per_batch(baris, ukuran_batch):
+            cursor.executemany(sql, batch)
+            jumlah += len(batch)
+    return jumlah
+
+
+class Command(BaseCommand):
+    help = (
+        "Mengisi database dengan data sintetis berskala produksi (siswa, kurikulum, "
+        "kuis, log jawaban) memakai insert massal. Gunakan database kosong/terpisah."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skala",
+            type=float,
+            default=1.0,
+            help="Pengali untuk semua ukuran di bawah (mis. 0.01 untuk uji cepat).",
+        )
+        parser.add_argument("--siswa", type=int, default=50_000)
+        parser.add_argument("--topik", type=int, default=20)
+        parser.add_argument("--subtopik-per-topik", type=int, default=15)
+        parser.add_argument("--pertanyaan-per-kuis", type=int, default=10)
+        parser.add_argument("--log-kuis", type=int, default=2_000_000)
+        parser.add_argument("--jawaban-arena", type=int, default=1_000_000)
+        parser.add_argument(
+            "--progres-per-siswa",
+            type=int,
+            default=30,
+            help="Rata-rata modul yang ditandai selesai per siswa.",
+        )
+        parser.add_argument(
+            "--hasil-per-siswa",
+            type=int,
+            default=20,
+            help="Rata-rata kuis yang sudah dikerjakan per siswa.",
+        )
+        parser.add_argument(
+            "--hari", type=int, default=180, help="Rentang waktu data historis (hari)."
+        )
+        parser.add_argument("--batch", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{PREFIKS}_").exists():
+            raise CommandError(
+                "Data sintetis sudah ada di database ini. Gunakan database kosong."
+            )
+        self.acak = random.Random(options["seed"])
+        self.batch = options["batch"]
+        self.sekarang = timezone.now()
+        self.rentang_detik = options["hari"] * 24 * 60 * 60
+        skala = options["skala"]
+
+        def ukuran(nama, minimum=1):
+            return max(minimum, int(options[nama] * skala))
+
+        with transaction.atomic():
+            self._tahap("kurikulum", self._isi_kurikulum,
+                        ukuran("topik"), ukuran("subtopik_per_topik"),
+                        options["pertanyaan_per_kuis"])
+            self._tahap("konten pendukung", self._isi_konten_pendukung)
+            self._tahap("siswa", self._isi_siswa, ukuran("siswa"))
+            self._tahap("progres materi", self._isi_progres, options["progres_per_siswa"])
+            self._tahap("hasil kuis", self._isi_hasil_kuis, options["hasil_per_siswa"])
+            self._tahap("log kuis", self._isi_log_kuis, ukuran("log_kuis", 0))
+            self._tahap("jawaban arena", self._isi_jawaban_arena, ukuran("jawaban_arena", 0))
+            self._tahap("tabel turunan", self._bangun_turunan)
+
+        # Insert massal tidak memicu sinyal, jadi semua cache turunan dibatalkan manual
+        for nama in (
+            VERSI_ARENA,
+            VERSI_INFO,
+            VERSI_KUIS,
+            VERSI_KURIKULUM,
+            VERSI_LENCANA,
+            VERSI_PERINGKAT,
+        ):
+            naikkan_versi(nama)
+        self.stdout.write(self.style.SUCCESS("Data sintetis selesai dibuat."))
+
+    def _tahap(self, nama, fungsi, *args):
+        mulai = time.perf_counter()
+        jumlah = fungsi(*args)
+        durasi = time.perf_counter() - mulai
+        laju = f" ({jumlah / durasi:,.0f} baris/detik)" if jumlah and durasi else ""
+        self.stdout.write(f"{nama:<18} {jumlah or 0:>12,} baris  {durasi:7.2f} s{laju}")
+
+    def _waktu_acak(self):
+        return self.sekarang - timedelta(seconds=self.acak.randrange(self.rentang_detik))
+
+    def _isi_kurikulum(self, jumlah_topik, subtopik_per_topik, pertanyaan_per_kuis):
+        self.guru = User.objects.create(
+            username=f"{PREFIKS}_guru", role="Guru", password=make_password(None)
+        )
+        topik_list = Topik.objects.bulk_create(
+            [Topik(judul=f"Bab {i + 1}", urutan=i) for i in range(jumlah_topik)]
+        )
+        subtopik_list = SubTopik.objects.bulk_create(
+            [
+                SubTopik(
+                    topik=topik,
+                    judul=f"{t + 1}.{s + 1}: Materi Sintetis",
+                    konten="<p>" + "Lorem ipsum ekosistem lahan basah. " * 40 + "</p>",
+                    urutan=s,
+                    pembuat=self.guru,
+                )
+                for t, topik in enumerate(topik_list)
+                for s in range(subtopik_per_topik)
+            ],
+            batch_size=self.batch,
+        )
+        kuis_list = Kuis.objects.bulk_create(
+            [Kuis(subtopik=subtopik, judul=f"Kuis {subtopik.judul}") for subtopik in subtopik_list],
+            batch_size=self.batch,
+        )
+        pertanyaan_list = Pertanyaan.objects.bulk_create(
+            [
+                Pertanyaan(kuis=kuis, teks_pertanyaan=f"Pertanyaan {p + 1} untuk {kuis.judul}"[:255])
+                for kuis in kuis_list
+                for p in range(pertanyaan_per_kuis)
+            ],
+            batch_size=self.batch,
+        )
+        pilihan_list = PilihanJawaban.objects.bulk_create(
+            [
+                PilihanJawaban(pertanyaan=pertanyaan, teks_jawaban=f"Pilihan {j + 1}", is_benar=(j == 0))
+                for pertanyaan in pertanyaan_list
+                for j in range(4)
+            ],
+            batch_size=self.batch,
+        )
+        self.subtopik_ids = [subtopik.id for subtopik in subtopik_list]
+        self.kuis_ids = [kuis.id for kuis in kuis_list]
+        self.pertanyaan_ids = [pertanyaan.id for pertanyaan in pertanyaan_list]
+        return len(topik_list) + len(subtopik_list) + len(kuis_list) + len(pertanyaan_list) + len(pilihan_list)
+
+    def _isi_konten_pendukung(self):
+        lencana = Lencana.objects.bulk_create(
+            [
+                Lencana(nama=f"Lencana {poin}", deskripsi=f"Raih {poin} poin", syarat_poin=poin)
+                for poin in (50, 100, 250, 500, 1000, 2500, 5000)
+            ]
+        )
+        arena = PertanyaanArena.objects.bulk_create(
+            [
+                PertanyaanArena(
+                    tipe="kartu_simbiosis",
+                    konten_json={
+                        "soal": f"Organisme {i} dan Organisme {i + 1}",
+                        "jawaban_benar": self.acak.choice(["Mutualisme", "Komensalisme", "Parasitisme"]),
+                        "pilihan": ["Mutualisme", "Komensalisme", "Parasitisme"],
+                    },
+                )
+                for i in range(50)
+            ]
+            + [
+                PertanyaanArena(
+                    tipe="klasifikasi",
+                    konten_json={
+                        "items": [
+                            {"nama": f"Komponen {i}", "tipe": "biotik" if i % 2 else "abiotik"}
+                            for i in range(12)
+                        ]
+                    },
+                ),
+                PertanyaanArena(tipe="cerita_predator", konten_json={"judul": "Jejak Predator Sintetis"}),
+            ]
+        )
+        self.arena_ids = [pertanyaan.id for pertanyaan in arena]
+        info = InfoEkosistem.objects.bulk_create(
+            [
+                InfoEkosistem(
+                    nama=f"Penghuni {i}",
+                    deskripsi_singkat="Penghuni lahan basah sintetis.",
+                    gambar_url=f"https://example.com/penghuni/{i}.jpg",
+                    kategori="Fauna" if i % 2 else "Flora",
+                )
+                for i in range(200)
+            ]
+        )
+        return len(lencana) + len(arena) + len(info)
+
+    def _isi_siswa(self, jumlah):
+        # Satu hash dipakai bersama: yang diuji adalah performa query, bukan hashing
+        password = make_password(f"{PREFIKS}-password")
+        self.siswa_ids = []
+        for batch in _per_batch(range(jumlah), self.batch):
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{PREFIKS}_siswa_{i}",
+                        role="Siswa",
+                        password=password,
+                        date_joined=self._waktu_acak(),
+                        last_login=self._waktu_acak(),
+                    )
+                    for i in batch
+                ]
+            )
+            ProfilSiswa.objects.bulk_create(
+                [ProfilSiswa(user=user, total_poin=self.acak.randrange(0, 3000, 10)) for user in users]
+            )
+            self.siswa_ids.extend(user.id for user in users)
+        return jumlah * 2
+
+    def _sampel_per_siswa(self, populasi, rata_rata):
+        for siswa_id in self.siswa_ids:
+            k = min(len(populasi), self.acak.randint(0, rata_rata * 2))
+            for item_id in self.acak.sample(populasi, k):
+                yield siswa_id, item_id
+
+    def _isi_progres(self, rata_rata):
+        ubah = connection.ops.adapt_datetimefield_value
+        return _sisipkan_mentah(
+            UserMateriProgress,
+            ["user", "materi", "completed_at"],
+            (
+                (siswa_id, materi_id, ubah(self._waktu_acak()))
+                for siswa_id, materi_id in self._sampel_per_siswa(self.subtopik_ids, rata_rata)
+            ),
+            self.batch,
+        )
+
+    def _isi_hasil_kuis(self, rata_rata):
+        ubah = connection.ops.adapt_datetimefield_value
+        return _sisipkan_mentah(
+            HasilKuis,
+            ["siswa", "kuis", "skor", "waktu_selesai"],
+            (
+                (siswa_id, kuis_id, self.acak.choice(range(0, 101, 10)), ubah(self._waktu_acak()))
+                for siswa_id, kuis_id in self._sampel_per_siswa(self.kuis_ids, rata_rata)
+            ),
+            self.batch,
+        )
+
+    def _isi_log_kuis(self, jumlah):
+        ubah = connection.ops.adapt_datetimefield_value
+        acak = self.acak
+        return _sisipkan_mentah(
+            QuizAttemptLog,
+            ["user", "question", "is_correct", "answered_at"],
+            (
+                (
+                    acak.choice(self.siswa_ids),
+                    acak.choice(self.pertanyaan_ids),
+                    acak.random() < 0.7,
+                    ubah(self._waktu_acak()),
+                )
+                for _ in range(jumlah)
+            ),
+            self.batch,
+        )
+
+    def _isi_jawaban_arena(self, jumlah):
+        ubah = connection.ops.adapt_datetimefield_value
+        acak = self.acak
+        return _sisipkan_mentah(
+            JawabanSiswa,
+            ["siswa", "pertanyaan", "jawaban_benar", "waktu_jawab"],
+            (
+                (
+                    acak.choice(self.siswa_ids),
+                    acak.choice(self.arena_ids),
+                    acak.random() < 0.6,
+                    ubah(self._waktu_acak()),
+                )
+                for _ in range(jumlah)
+            ),
+            self.batch,
+        )
+
+    def _bangun_turunan(self):
+        jumlah = rebuild_statistik_modul()
+        rebuild_statistik_pertanyaan()
+        hitung_ulang_jumlah_lencana()
+        return jumlah
@@ -0,0 +1,65 @@
+# core/management/commands/kompaksi_log.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.kompaksi import SPESIFIKASI, batas_retensi, kompaksi
+
+
+class Command(BaseCommand):
+    help = (
+        "Memadatkan QuizAttemptLog dan JawabanSiswa yang lebih tua dari jendela "
+        "retensi ke rekap harian per siswa/pertanyaan, lalu menghapus (dan "
+        "opsional mengarsipkan) baris mentahnya secara bertahap."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hari",
+            type=int,
+            default=getattr(settings, "EKOSPHERE_RETENSI_LOG_HARI", 90),
+            help="Jendela retensi log mentah (hari).",
+        )
+        parser.add_argument(
+            "--tabel",
+            nargs="+",
+            choices=sorted(SPESIFIKASI),
+            default=sorted(SPESIFIKASI),
+            help="Log yang dipadatkan.",
+        )
+        parser.add_argument("--batch", type=int, default=5000, help="Baris per transaksi.")
+        parser.add_argument(
+            "--jeda",
+            type=float,
+            default=0.05,
+            help="Jeda antar batch (detik) agar penulis lain tidak menunggu lama.",
+        )
+        parser.add_argument(
+            "--arsip",
+            help="Tambahkan baris mentah ke berkas NDJSON ini setelah batch-nya di-commit.",
+        )
+
+    def handle(self, *args, **options):
+        batas = batas_retensi(options["hari"])
+        self.stdout.write(f"Memadatkan log sebelum {batas:%Y-%m-%d %H:%M %Z}.")
+        berkas_arsip = open(options["arsip"], "a", encoding="utf-8") if options["arsip"] else None
+        try:
+            for nama in options["tabel"]:
+                mulai = time.perf_counter()
+                jumlah = kompaksi(
+                    nama,
+                    batas,
+                    ukuran_batch=options["batch"],
+                    berkas_arsip=berkas_arsip,
+                    jeda=options["jeda"],
+                )
+                self.stdout.write(
+                    f"  {nama:<6} {jumlah:>10,} baris dipadatkan "
+                    f"({time.perf_counter() - mulai:.1f} s)"
+                )
+        finally:
+            if berkas_arsip is not None:
+                berkas_arsip.close()
+        self.stdout.write(self.style.SUCCESS("Kompaksi selesai."))
@@ -0,0 +1,63 @@
+# core/management/commands/laporan_query.py
+
+import json
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _persentil(nilai, p):
+    if not nilai:
+        return 0
+    nilai = sorted(nilai)
+    return nilai[min(len(nilai) - 1, int(round(p / 100 * (len(nilai) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Meringkas log InstrumentasiQueryMiddleware per nama URL: jumlah query, "
+        "waktu SQL, waktu render template, pelanggaran budget dan query duplikat."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--berkas",
+            default=getattr(settings, "EKOSPHERE_INSTRUMENTASI_LOG", None),
+            help="Path log JSON-lines (default: settings.EKOSPHERE_INSTRUMENTASI_LOG).",
+        )
+        parser.add_argument(
+            "--duplikat", type=int, default=3, help="Jumlah query duplikat teratas per view."
+        )
+
+    def handle(self, *args, **options):
+        if not options["berkas"]:
+            raise CommandError("Path log belum diatur (EKOSPHERE_INSTRUMENTASI_LOG).")
+        per_view = defaultdict(list)
+        try:
+            with open(options["berkas"], encoding="utf-8") as berkas:
+                for baris in berkas:
+                    if baris.strip():
+                        catatan = json.loads(baris)
+                        per_view[catatan["url"]].append(catatan)
+        except FileNotFoundError:
+            raise CommandError(f"Berkas log {options['berkas']} tidak ditemukan.")
+
+        self.stdout.write(
+            f"{'view':<28} {'n':>6} {'q p50':>6} {'q p95':>6} {'q max':>6} "
+            f"{'db ms':>8} {'render':>8} {'budget':>7}"
+        )
+        for nama_url, daftar in sorted(per_view.items(), key=lambda item: -len(item[1])):
+            query = [c["query"] for c in daftar]
+            self.stdout.write(
+                f"{nama_url:<28} {len(daftar):>6} {_persentil(query, 50):>6} "
+                f"{_persentil(query, 95):>6} {max(query):>6} "
+                f"{sum(c['db_ms'] for c in daftar) / len(daftar):>8.2f} "
+                f"{sum(c['render_ms'] for c in daftar) / len(daftar):>8.2f} "
+                f"{sum(1 for c in daftar if c['melewati_budget']):>7}"
+            )
+            duplikat = Counter()
+            for catatan in daftar:
+                duplikat.update(catatan["duplikat"])
+            for sql, jumlah in duplikat.most_common(options["duplikat"]):
+                self.stdout.write(f"    {jumlah:>6}x  {sql[:110]}")
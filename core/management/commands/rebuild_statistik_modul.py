@@ -0,0 +1,15 @@
+# core/management/commands/rebuild_statistik_modul.py
+
+from django.core.management.base import BaseCommand
+
+from core.statistik import rebuild_statistik_modul
+
+
+class Command(BaseCommand):
+    help = "Membangun ulang penghitung penyelesaian per modul (StatistikModul)."
+
+    def handle(self, *args, **options):
+        jumlah_modul = rebuild_statistik_modul()
+        self.stdout.write(
+            self.style.SUCCESS(f"Penghitung {jumlah_modul} modul berhasil dibangun ulang.")
+        )
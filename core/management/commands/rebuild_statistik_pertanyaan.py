@@ -0,0 +1,18 @@
+# core/management/commands/rebuild_statistik_pertanyaan.py
+
+from django.core.management.base import BaseCommand
+
+from core.statistik import rebuild_statistik_pertanyaan
+
+
+class Command(BaseCommand):
+    help = (
+        "Mengisi ulang StatistikPertanyaan (percobaan, jawaban salah, waktu "
+        "terakhir) dari QuizAttemptLog."
+    )
+
+    def handle(self, *args, **options):
+        jumlah = rebuild_statistik_pertanyaan()
+        self.stdout.write(
+            self.style.SUCCESS(f"Statistik {jumlah} pertanyaan berhasil dibangun ulang.")
+        )
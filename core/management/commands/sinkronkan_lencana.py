@@ -0,0 +1,19 @@
+# core/management/commands/sinkronkan_lencana.py
+
+from django.core.management.base import BaseCommand
+
+from core.lencana import sinkronkan_lencana
+from core.models import ProfilSiswa
+
+
+class Command(BaseCommand):
+    help = (
+        "Memberikan semua lencana yang syarat poinnya sudah terpenuhi. Berguna "
+        "setelah menambah lencana baru dengan syarat di bawah poin siswa."
+    )
+
+    def handle(self, *args, **options):
+        total_lencana = 0
+        for profil_siswa in ProfilSiswa.objects.only("id", "user_id", "total_poin").iterator():
+            total_lencana += len(sinkronkan_lencana(profil_siswa))
+        self.stdout.write(self.style.SUCCESS(f"{total_lencana} lencana baru diberikan."))
@@ -0,0 +1,154 @@
+# core/management/commands/stress_penulisan.py
+
+import random
+import statistics
+import threading
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.kunci_jawaban import ambil_kunci_jawaban
+from core.models import PertanyaanArena, SubTopik, User
+from core.penilaian import PREFIKS_FIELD_PERTANYAAN
+
+
+class Command(BaseCommand):
+    help = (
+        "Uji beban penulisan serentak: N siswa (thread, masing-masing dengan "
+        "koneksi database sendiri) mengirim kuis, jawaban arena dan toggle "
+        "progres secara bersamaan. Gagal jika ada error, termasuk 'database is locked'. "
+        "Jalankan dengan EKOSPHERE_SQLITE_PRODUKSI=1 untuk menguji mode produksi. "
+        "PERHATIAN: semua tulisan di-commit ke database yang dikonfigurasi (HasilKuis, "
+        "QuizAttemptLog, JawabanSiswa, progres materi, serta poin, lencana dan papan "
+        "peringkat siswa) dan tidak dibatalkan; jalankan pada salinan database dan "
+        "konfirmasi dengan --ubah-data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--penulis", type=int, default=200, help="Jumlah siswa serentak.")
+        parser.add_argument("--putaran", type=int, default=3, help="Siklus tulis per siswa.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--ubah-data",
+            action="store_true",
+            help="Wajib: menyetujui bahwa hasil kuis, poin dan papan peringkat siswa ditulis ulang.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["ubah_data"]:
+            raise CommandError(
+                "stress_penulisan meng-commit ribuan hasil kuis, jawaban arena, poin dan "
+                f"progres ke {connection.settings_dict['NAME']} tanpa rollback. Jalankan pada "
+                "salinan database lalu ulangi dengan --ubah-data."
+            )
+        if connection.vendor == "sqlite" and not getattr(settings, "EKOSPHERE_SQLITE_PRODUKSI", False):
+            self.stdout.write(
+                self.style.WARNING("EKOSPHERE_SQLITE_PRODUKSI tidak aktif; menguji konfigurasi default.")
+            )
+        jumlah_penulis = options["penulis"]
+        siswa = list(User.objects.filter(role="Siswa").order_by("id")[:jumlah_penulis])
+        if len(siswa) < jumlah_penulis:
+            raise CommandError(
+                f"Butuh {jumlah_penulis} siswa, hanya ada {len(siswa)}. Jalankan isi_data_sintetis dulu."
+            )
+        subtopik = list(SubTopik.objects.filter(kuis__isnull=False).select_related("kuis")[:20])
+        arena_ids = list(PertanyaanArena.objects.values_list("id", flat=True)[:50])
+        if not subtopik or not arena_ids:
+            raise CommandError("Butuh SubTopik berkuis dan PertanyaanArena.")
+        kunci = {s.pk: ambil_kunci_jawaban(s.kuis.id) for s in subtopik}
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            klien = []
+            for user in siswa:
+                client = Client()
+                client.force_login(user)
+                klien.append(client)
+            # Koneksi thread utama ditutup agar tidak ikut memegang kunci
+            connections.close_all()
+
+            gerbang = threading.Barrier(jumlah_penulis)
+            latensi, status, galat = [], Counter(), []
+            lock = threading.Lock()
+
+            def kerja(nomor, client):
+                acak = random.Random(options["seed"] + nomor)
+                try:
+                    gerbang.wait()
+                    for _ in range(options["putaran"]):
+                        materi = acak.choice(subtopik)
+                        jawaban = {
+                            f"{PREFIKS_FIELD_PERTANYAAN}{pertanyaan_id}": (
+                                pilihan_id if acak.random() < 0.7 else 0
+                            )
+                            for pertanyaan_id, pilihan_id in kunci[materi.pk].items()
+                        }
+                        permintaan = [
+                            ("kuis", lambda: client.post(reverse("kuis", args=[materi.pk]), jawaban)),
+                            (
+                                "api_simpan_jawaban",
+                                lambda: client.post(
+                                    reverse("api_simpan_jawaban"),
+                                    {
+                                        "pertanyaan_id": acak.choice(arena_ids),
+                                        "jawaban_benar": acak.random() < 0.5,
+                                    },
+                                    content_type="application/json",
+                                ),
+                            ),
+                            ("tandai", lambda: client.get(reverse("tandai_materi_selesai", args=[materi.pk]))),
+                            ("batalkan", lambda: client.get(reverse("batalkan_materi_selesai", args=[materi.pk]))),
+                        ]
+                        for nama, kirim in permintaan:
+                            mulai = time.perf_counter()
+                            try:
+                                response = kirim()
+                                kode = response.status_code
+                            except Exception as exc:
+                                kode = type(exc).__name__
+                                with lock:
+                                    galat.append((nama, "".join(traceback.format_exception_only(exc)).strip()))
+                            with lock:
+                                latensi.append((time.perf_counter() - mulai) * 1000)
+                                status[(nama, kode)] += 1
+                finally:
+                    connections.close_all()
+
+            thread = [
+                threading.Thread(target=kerja, args=(nomor, client))
+                for nomor, client in enumerate(klien)
+            ]
+            mulai = time.perf_counter()
+            for t in thread:
+                t.start()
+            for t in thread:
+                t.join()
+            durasi = time.perf_counter() - mulai
+
+        latensi.sort()
+        self.stdout.write(
+            f"{len(latensi)} request dari {jumlah_penulis} penulis dalam {durasi:.2f} s "
+            f"({len(latensi) / durasi:.1f} req/s)"
+        )
+        self.stdout.write(
+            f"Latensi p50 {statistics.median(latensi):.1f} ms, "
+            f"p95 {latensi[int(0.95 * (len(latensi) - 1))]:.1f} ms, maks {latensi[-1]:.1f} ms"
+        )
+        for (nama, kode), jumlah in sorted(status.items(), key=str):
+            self.stdout.write(f"  {nama:<20} {kode!s:<20} {jumlah}")
+
+        gagal = sum(
+            jumlah for (_, kode), jumlah in status.items() if not (isinstance(kode, int) and kode < 400)
+        )
+        if gagal:
+            terkunci = sum(1 for _, pesan in galat if "locked" in pesan)
+            for nama, pesan in galat[:10]:
+                self.stdout.write(self.style.ERROR(f"  {nama}: {pesan}"))
+            raise CommandError(f"{gagal} request gagal ({terkunci} karena database terkunci).")
+        self.stdout.write(self.style.SUCCESS("Tidak ada error penulisan."))
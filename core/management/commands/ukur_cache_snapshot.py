@@ -0,0 +1,108 @@
+# core/management/commands/ukur_cache_snapshot.py
+
+import pickle
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from core.info_ekosistem import sampler_info
+from core.models import User
+from core.snapshot_siswa import snapshot_siswa, statistik_cache
+from core.versi import naikkan_versi, versi_siswa
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mengukur hit rate cache snapshot dashboard siswa pada skala kelas besar: "
+        "N siswa sintetis (dibuat di dalam transaksi yang di-rollback) masing-masing "
+        "membuka dashboard beberapa kali dalam urutan acak, dengan sebagian kunjungan "
+        "didahului perubahan data siswa. Memakai backend cache yang sedang dikonfigurasi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--siswa", type=int, default=50_000)
+        parser.add_argument("--kunjungan", type=int, default=4, help="Kunjungan dashboard per siswa.")
+        parser.add_argument(
+            "--rasio-tulis",
+            type=float,
+            default=0.25,
+            help="Peluang sebuah kunjungan didahului perubahan data siswa (kuis, poin).",
+        )
+        parser.add_argument(
+            "--versi-ttl",
+            help=(
+                "Umur stempel versi (detik) selama pengukuran, atau 'none' untuk tanpa "
+                "kedaluwarsa seperti pada cache bersama (bawaan: EKOSPHERE_VERSI_TTL)."
+            ),
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        acak = random.Random(options["seed"])
+        versi_ttl = settings.EKOSPHERE_VERSI_TTL
+        if options["versi_ttl"] is not None:
+            if options["versi_ttl"].lower() == "none":
+                versi_ttl = None
+            elif options["versi_ttl"].isdigit():
+                versi_ttl = int(options["versi_ttl"])
+            else:
+                raise CommandError("--versi-ttl harus berupa angka detik atau 'none'")
+        konfigurasi = settings.CACHES["default"]
+        self.stdout.write(
+            f"Cache: {konfigurasi['BACKEND'].rsplit('.', 1)[-1]}, "
+            f"MAX_ENTRIES {konfigurasi.get('OPTIONS', {}).get('MAX_ENTRIES', '-')}, "
+            f"umur stempel versi {versi_ttl if versi_ttl is not None else 'tanpa batas'}"
+        )
+        try:
+            with override_settings(EKOSPHERE_VERSI_TTL=versi_ttl), transaction.atomic():
+                self._ukur(acak, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _ukur(self, acak, options):
+        siswa = User.objects.bulk_create(
+            [User(username=f"_ukur_cache_{i}", role="Siswa") for i in range(options["siswa"])],
+            batch_size=2000,
+        )
+        urutan = [user for user in siswa for _ in range(options["kunjungan"])]
+        acak.shuffle(urutan)
+        cache.clear()
+        statistik_cache.update(hit=0, miss=0)
+        ukuran = []
+        # Kunjungan pertama dan kunjungan setelah perubahan data pasti miss
+        sudah_berkunjung, miss_wajib = set(), 0
+
+        mulai = time.perf_counter()
+        for user in urutan:
+            if user.id not in sudah_berkunjung:
+                sudah_berkunjung.add(user.id)
+                miss_wajib += 1
+            elif acak.random() < options["rasio_tulis"]:
+                naikkan_versi(versi_siswa(user.id))
+                miss_wajib += 1
+            snapshot = snapshot_siswa(user)
+            sampler_info.sampel(3, user_id=user.id)
+            if len(ukuran) < 1000:
+                ukuran.append(len(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)))
+        durasi = time.perf_counter() - mulai
+
+        hit, miss = statistik_cache["hit"], statistik_cache["miss"]
+        rata_rata = statistics.fmean(ukuran)
+        self.stdout.write(
+            f"{len(urutan):,} kunjungan dari {len(siswa):,} siswa dalam {durasi:.1f} s\n"
+            f"  hit {hit:,}  miss {miss:,}  hit rate {hit / (hit + miss):.1%} "
+            f"(batas atas {1 - miss_wajib / len(urutan):.1%})\n"
+            f"  ukuran snapshot rata-rata {rata_rata:,.0f} byte; "
+            f"semua snapshot hidup ~{rata_rata * len(siswa) / 2**20:,.1f} MiB per proses (LocMem)"
+        )
@@ -0,0 +1,307 @@
+# core/middleware.py
+
+import atexit
+import contextvars
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, reraise
+from django.template.backends.django import Template as DjangoTemplate
+
+logger = logging.getLogger(__name__)
+
+# Menyamarkan literal agar query yang sama dengan parameter berbeda
+# menghasilkan sidik jari yang sama (dasar deteksi N+1)
+_POLA_LITERAL = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+# Pengukur request yang sedang berjalan. ContextVar ikut terbawa ke thread
+# sync_to_async, jadi query dan render dari view async tetap tercatat.
+_waktu_render = contextvars.ContextVar("ekosphere_waktu_render", default=None)
+_pencatat_aktif = contextvars.ContextVar("ekosphere_pencatat_query", default=None)
+
+
+def sidik_jari_sql(sql):
+    for pola, pengganti in _POLA_LITERAL:
+        sql = pola.sub(pengganti, sql)
+    return sql.strip()
+
+
+class TemplateTerukur(DjangoTemplate):
+    """Template backend Django yang mencatat waktu render ke pengukur request."""
+
+    def render(self, context=None, request=None):
+        pengukur = _waktu_render.get()
+        if pengukur is None or pengukur["kedalaman"]:
+            # Tidak sedang diukur, atau render bersarang (sudah terhitung induknya)
+            return super().render(context, request)
+        pengukur["kedalaman"] += 1
+        mulai = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            pengukur["kedalaman"] -= 1
+            pengukur["detik"] += time.perf_counter() - mulai
+
+
+class DjangoTemplatesTerukur(DjangoTemplates):
+    """
+    Backend TEMPLATES yang dipakai hanya saat EKOSPHERE_INSTRUMENTASI aktif
+    (lihat settings), sehingga tanpa instrumentasi tidak ada kelas Django
+    yang dibungkus atau diganti.
+    """
+
+    def from_string(self, template_code):
+        return TemplateTerukur(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TemplateTerukur(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class _PencatatQuery:
+    def __init__(self):
+        self.jumlah = 0
+        self.detik = 0.0
+        self.sidik_jari = Counter()
+
+    def catat(self, sql, detik):
+        self.detik += detik
+        self.jumlah += 1
+        self.sidik_jari[sidik_jari_sql(sql)] += 1
+
+
+def _catat_query(execute, sql, params, many, context):
+    pencatat = _pencatat_aktif.get()
+    if pencatat is None:
+        return execute(sql, params, many, context)
+    mulai = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        pencatat.catat(sql, time.perf_counter() - mulai)
+
+
+def _pasang_pencatat_query(**kwargs):
+    # Koneksi bersifat per thread. Sinyal request_started dikirim di thread
+    # yang juga menjalankan ORM request tersebut (termasuk thread
+    # sync_to_async di bawah ASGI), jadi wrapper dipasang pada koneksi thread
+    # itu; wrapper hanya mencatat selama ada pencatat aktif
+    for koneksi in connections.all():
+        if _catat_query not in koneksi.execute_wrappers:
+            koneksi.execute_wrappers.append(_catat_query)
+
+
+class _PenulisLog:
+    """
+    Menampung baris JSON dan menuliskannya sekaligus ke berkas setiap
+    `ukuran_buffer` baris atau `interval` detik, agar request tidak membuka
+    dan menulis berkas satu per satu. Sisa buffer ditulis saat proses keluar.
+    """
+
+    def __init__(self, path, ukuran_buffer=100, interval=5.0):
+        self.path = path
+        self.ukuran_buffer = ukuran_buffer
+        self.interval = interval
+        self._buffer = []
+        self._terakhir = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def tulis(self, catatan):
+        baris = json.dumps(catatan, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(baris)
+            if (
+                len(self._buffer) < self.ukuran_buffer
+                and time.monotonic() - self._terakhir < self.interval
+            ):
+                return
+            self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._terakhir = time.monotonic()
+        if not self._buffer:
+            return
+        baris, self._buffer = self._buffer, []
+        try:
+            with open(self.path, "a", encoding="utf-8") as berkas:
+                berkas.writelines(baris)
+        except OSError:
+            logger.warning("Gagal menulis %d catatan instrumentasi ke %s", len(baris), self.path)
+
+
+class InstrumentasiQueryMiddleware:
+    """
+    Middleware opsional (aktif jika EKOSPHERE_INSTRUMENTASI = True) yang
+    mencatat per nama URL: jumlah query, total waktu SQL, query duplikat
+    (indikasi N+1) dan waktu render template. Request yang melewati budget
+    di EKOSPHERE_BUDGET_QUERY dicatat sebagai warning dan diberi header
+    X-Query-Budget. Setiap request menjadi satu baris JSON di
+    EKOSPHERE_INSTRUMENTASI_LOG (ditulis per buffer) untuk diringkas oleh
+    `manage.py laporan_query`. Bisa dipakai di bawah WSGI maupun ASGI.
+    Response streaming diukur sampai isinya habis dialirkan.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "EKOSPHERE_INSTRUMENTASI", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.budget = getattr(settings, "EKOSPHERE_BUDGET_QUERY", {})
+        path_log = getattr(settings, "EKOSPHERE_INSTRUMENTASI_LOG", None)
+        self.log = (
+            _PenulisLog(path_log, getattr(settings, "EKOSPHERE_INSTRUMENTASI_BUFFER", 100))
+            if path_log
+            else None
+        )
+        request_started.connect(_pasang_pencatat_query, dispatch_uid="ekosphere_instrumentasi")
+
+    def _budget_untuk(self, nama_url):
+        # Budget per view menimpa kunci "*" satu per satu, bukan seluruhnya
+        return {**self.budget.get("*", {}), **self.budget.get(nama_url, {})}
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pengukur = self._mulai()
+        try:
+            response = self.get_response(request)
+        finally:
+            self._berhenti(pengukur)
+        return self._selesai(request, response, pengukur)
+
+    async def __acall__(self, request):
+        pengukur = self._mulai()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._berhenti(pengukur)
+        return self._selesai(request, response, pengukur)
+
+    def _mulai(self):
+        pengukur = {
+            "pencatat": _PencatatQuery(),
+            "render": {"detik": 0.0, "kedalaman": 0},
+            "mulai": time.perf_counter(),
+        }
+        self._aktifkan(pengukur)
+        return pengukur
+
+    def _aktifkan(self, pengukur):
+        pengukur["token"] = (
+            _pencatat_aktif.set(pengukur["pencatat"]),
+            _waktu_render.set(pengukur["render"]),
+        )
+
+    def _berhenti(self, pengukur):
+        pengukur["durasi"] = time.perf_counter() - pengukur["mulai"]
+        token_query, token_render = pengukur["token"]
+        _pencatat_aktif.reset(token_query)
+        _waktu_render.reset(token_render)
+
+    def _selesai(self, request, response, pengukur):
+        if response.streaming:
+            # Isi StreamingHttpResponse (dan query-nya, mis. ekspor) baru dibaca
+            # server setelah middleware kembali. Pencatat diaktifkan lagi selama
+            # setiap potongan dibuat dan catatan ditulis saat iterator habis
+            # atau ditutup; header sudah terkirim, jadi tanpa X-Query-Count.
+            isi = response.streaming_content
+            if response.is_async:
+                response.streaming_content = self._alirkan_async(isi, request, response, pengukur)
+            else:
+                response.streaming_content = self._alirkan(isi, request, response, pengukur)
+            return response
+
+        catatan = self._catat(request, response, pengukur)
+        if catatan["melewati_budget"]:
+            response["X-Query-Budget"] = "terlampaui"
+        response["X-Query-Count"] = str(catatan["query"])
+        response["X-DB-Time-Ms"] = str(catatan["db_ms"])
+        return response
+
+    def _alirkan(self, isi, request, response, pengukur):
+        iterator = iter(isi)
+        try:
+            while True:
+                self._aktifkan(pengukur)
+                try:
+                    potongan = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._berhenti(pengukur)
+                yield potongan
+        finally:
+            self._catat(request, response, pengukur)
+
+    async def _alirkan_async(self, isi, request, response, pengukur):
+        try:
+            while True:
+                self._aktifkan(pengukur)
+                try:
+                    potongan = await anext(isi)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    self._berhenti(pengukur)
+                yield potongan
+        finally:
+            self._catat(request, response, pengukur)
+
+    def _catat(self, request, response, pengukur):
+        pencatat = pengukur["pencatat"]
+        resolver_match = getattr(request, "resolver_match", None)
+        nama_url = resolver_match.view_name if resolver_match else request.path
+        duplikat = {sql: n for sql, n in pencatat.sidik_jari.items() if n > 1}
+        catatan = {
+            "waktu": time.time(),
+            "url": nama_url,
+            "metode": request.method,
+            "status": response.status_code,
+            "streaming": response.streaming,
+            "query": pencatat.jumlah,
+            "db_ms": round(pencatat.detik * 1000, 3),
+            "render_ms": round(pengukur["render"]["detik"] * 1000, 3),
+            "total_ms": round(pengukur["durasi"] * 1000, 3),
+            "duplikat": duplikat,
+        }
+
+        budget = self._budget_untuk(nama_url)
+        pelanggaran = []
+        if "query" in budget and catatan["query"] > budget["query"]:
+            pelanggaran.append(f"query {catatan['query']} > {budget['query']}")
+        if "db_ms" in budget and catatan["db_ms"] > budget["db_ms"]:
+            pelanggaran.append(f"db_ms {catatan['db_ms']} > {budget['db_ms']}")
+        if "duplikat" in budget and len(duplikat) > budget["duplikat"]:
+            pelanggaran.append(f"duplikat {len(duplikat)} > {budget['duplikat']}")
+        catatan["melewati_budget"] = pelanggaran
+        if pelanggaran:
+            logger.warning("View %s melewati budget: %s", nama_url, "; ".join(pelanggaran))
+        if self.log:
+            self.log.tulis(catatan)
+        return catatan
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def isi_statistik_modul(apps, schema_editor):
+    SubTopik = apps.get_model('core', 'SubTopik')
+    StatistikModul = apps.get_model('core', 'StatistikModul')
+    UserMateriProgress = apps.get_model('core', 'UserMateriProgress')
+    jumlah_per_materi = dict(
+        UserMateriProgress.objects.values('materi')
+        .annotate(jumlah=Count('id'))
+        .values_list('materi', 'jumlah')
+    )
+    StatistikModul.objects.bulk_create(
+        [
+            StatistikModul(materi_id=materi_id, jumlah_selesai=jumlah_per_materi.get(materi_id, 0))
+            for materi_id in SubTopik.objects.values_list('id', flat=True)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_quizattemptlog_usermateriprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistikModul',
+            fields=[
+                ('materi', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistik', serialize=False, to='core.subtopik')),
+                ('jumlah_selesai', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(isi_statistik_modul, migrations.RunPython.noop),
+    ]
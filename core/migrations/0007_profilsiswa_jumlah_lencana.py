@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def isi_jumlah_lencana(apps, schema_editor):
+    ProfilSiswa = apps.get_model('core', 'ProfilSiswa')
+    Relasi = ProfilSiswa.lencana.through
+    jumlah = (
+        Relasi.objects.filter(profilsiswa_id=OuterRef('pk'))
+        .values('profilsiswa_id')
+        .annotate(jumlah=Count('id'))
+        .values('jumlah')
+    )
+    ProfilSiswa.objects.update(jumlah_lencana=Coalesce(Subquery(jumlah), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_statistikmodul'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profilsiswa',
+            name='jumlah_lencana',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(isi_jumlah_lencana, migrations.RunPython.noop),
+    ]
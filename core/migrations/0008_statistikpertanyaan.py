@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_profilsiswa_jumlah_lencana'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistikPertanyaan',
+            fields=[
+                ('pertanyaan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistik', serialize=False, to='core.pertanyaan')),
+                ('jumlah_percobaan', models.PositiveIntegerField(default=0)),
+                ('jumlah_salah', models.PositiveIntegerField(default=0)),
+                ('tingkat_kesalahan', models.FloatField(default=0)),
+                ('percobaan_terakhir', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-tingkat_kesalahan', '-jumlah_salah'], name='statistik_pertanyaan_sulit')],
+            },
+        ),
+    ]
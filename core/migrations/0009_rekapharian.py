@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_statistikpertanyaan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RekapHarianArena',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('jumlah', models.PositiveIntegerField(default=0)),
+                ('jumlah_benar', models.PositiveIntegerField(default=0)),
+                ('pertanyaan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.pertanyaanarena')),
+                ('siswa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('siswa', 'pertanyaan', 'tanggal')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RekapHarianKuis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('jumlah', models.PositiveIntegerField(default=0)),
+                ('jumlah_benar', models.PositiveIntegerField(default=0)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.pertanyaan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'question', 'tanggal')},
+            },
+        ),
+    ]
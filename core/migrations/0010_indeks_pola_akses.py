@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0009_rekapharian'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hasilkuis',
+            index=models.Index(fields=['siswa', '-waktu_selesai'], name='hasilkuis_siswa_waktu'),
+        ),
+        migrations.AddIndex(
+            model_name='jawabansiswa',
+            index=models.Index(fields=['siswa', '-waktu_jawab'], name='jawabansiswa_siswa_waktu'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattemptlog',
+            index=models.Index(fields=['is_correct', 'question'], name='attemptlog_benar_soal'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'last_login'], name='user_role_login'),
+        ),
+    ]
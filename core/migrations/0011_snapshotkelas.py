@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_indeks_pola_akses'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotKelas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dibuat_pada', models.DateTimeField(db_index=True)),
+                ('durasi_ms', models.FloatField(default=0)),
+                ('data', models.JSONField()),
+            ],
+            options={
+                'verbose_name': 'Snapshot Kelas',
+                'verbose_name_plural': 'Snapshot Kelas',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_snapshotkelas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizattemptlog',
+            index=models.Index(fields=['user', '-answered_at'], name='attemptlog_user_waktu'),
+        ),
+    ]
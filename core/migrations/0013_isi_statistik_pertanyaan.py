@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:05
+
+from datetime import datetime, time
+
+from django.db import migrations
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+
+def isi_statistik_pertanyaan(apps, schema_editor):
+    # Sama dengan core.statistik.rebuild_statistik_pertanyaan, dengan model historis:
+    # 0008 hanya membuat tabelnya, jadi jawaban sebelum itu belum terhitung
+    QuizAttemptLog = apps.get_model('core', 'QuizAttemptLog')
+    RekapHarianKuis = apps.get_model('core', 'RekapHarianKuis')
+    StatistikPertanyaan = apps.get_model('core', 'StatistikPertanyaan')
+    rekap = {}
+    log_mentah = (
+        QuizAttemptLog.objects.filter(user__role='Siswa')
+        .values('question')
+        .annotate(
+            percobaan=Count('id'),
+            salah=Count('id', filter=Q(is_correct=False)),
+            terakhir=Max('answered_at'),
+        )
+        .values_list('question', 'percobaan', 'salah', 'terakhir')
+    )
+    for pertanyaan_id, percobaan, salah, terakhir in log_mentah.iterator():
+        rekap[pertanyaan_id] = [percobaan, salah, terakhir]
+    log_dipadatkan = (
+        RekapHarianKuis.objects.filter(user__role='Siswa')
+        .values('question')
+        .annotate(percobaan=Sum('jumlah'), benar=Sum('jumlah_benar'), terakhir=Max('tanggal'))
+        .values_list('question', 'percobaan', 'benar', 'terakhir')
+    )
+    for pertanyaan_id, percobaan, benar, tanggal in log_dipadatkan.iterator():
+        data = rekap.setdefault(pertanyaan_id, [0, 0, None])
+        data[0] += percobaan
+        data[1] += percobaan - benar
+        if data[2] is None:
+            data[2] = timezone.make_aware(datetime.combine(tanggal, time.min))
+
+    StatistikPertanyaan.objects.all().delete()
+    StatistikPertanyaan.objects.bulk_create(
+        [
+            StatistikPertanyaan(
+                pertanyaan_id=pertanyaan_id,
+                jumlah_percobaan=percobaan,
+                jumlah_salah=salah,
+                tingkat_kesalahan=salah / percobaan,
+                percobaan_terakhir=terakhir,
+            )
+            for pertanyaan_id, (percobaan, salah, terakhir) in rekap.items()
+            if percobaan
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_indeks_linimasa_log_kuis'),
+    ]
+
+    operations = [
+        migrations.RunPython(isi_statistik_pertanyaan, migrations.RunPython.noop),
+    ]
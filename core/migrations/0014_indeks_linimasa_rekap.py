@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_isi_statistik_pertanyaan'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rekapharianarena',
+            index=models.Index(fields=['siswa', '-tanggal'], name='rekaparena_siswa_tanggal'),
+        ),
+        migrations.AddIndex(
+            model_name='rekaphariankuis',
+            index=models.Index(fields=['user', '-tanggal'], name='rekapkuis_user_tanggal'),
+        ),
+    ]
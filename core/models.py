@@ -13,6 +13,12 @@ class User(AbstractUser):
     )
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, blank=True, null=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Hitungan siswa / siswa aktif di dashboard guru
+            models.Index(fields=["role", "last_login"], name="user_role_login"),
+        ]
+
 
 # Model untuk Topik Utama (Bab)
 class Topik(models.Model):
@@ -89,6 +95,9 @@ class ProfilSiswa(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     total_poin = models.IntegerField(default=0)
     lencana = models.ManyToManyField(Lencana, blank=True)
+    # Salinan jumlah lencana agar navbar tidak perlu COUNT tiap halaman;
+    # dijaga oleh sinyal m2m_changed dan core.lencana
+    jumlah_lencana = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"Profil {self.user.username}"
@@ -117,6 +126,11 @@ class JawabanSiswa(models.Model):
     jawaban_benar = models.BooleanField()
     waktu_jawab = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["siswa", "-waktu_jawab"], name="jawabansiswa_siswa_waktu"),
+        ]
+
     def __str__(self):
         return f"Jawaban {self.siswa.username} untuk {self.pertanyaan.id}"
 
@@ -130,6 +144,10 @@ class HasilKuis(models.Model):
     class Meta:
         # Pastikan setiap siswa hanya punya satu entri hasil per kuis
         unique_together = ("siswa", "kuis")
+        indexes = [
+            # Riwayat kuis per siswa, terbaru dulu (progres & detail siswa)
+            models.Index(fields=["siswa", "-waktu_selesai"], name="hasilkuis_siswa_waktu"),
+        ]
 
     def __str__(self):
         return f"{self.siswa.username} - {self.kuis.judul}: {self.skor}%"
@@ -172,5 +190,112 @@ class QuizAttemptLog(models.Model):
     is_correct = models.BooleanField()
     answered_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Agregasi salah/benar per pertanyaan (rebuild_statistik_pertanyaan)
+            models.Index(fields=["is_correct", "question"], name="attemptlog_benar_soal"),
+            # Linimasa jawaban kuis per siswa, terbaru dulu (core.riwayat)
+            models.Index(fields=["user", "-answered_at"], name="attemptlog_user_waktu"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.question.teks_pertanyaan[:30]} - {self.is_correct}"
+
+
+# Penghitung penyelesaian per modul, dijaga secara inkremental saat siswa
+# menandai/membatalkan materi. Bisa dibangun ulang dengan
+# `python manage.py rebuild_statistik_modul`.
+class StatistikModul(models.Model):
+    materi = models.OneToOneField(
+        SubTopik,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="statistik",
+    )
+    jumlah_selesai = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.materi.judul}: {self.jumlah_selesai} selesai"
+
+
+# Rekap jawaban kuis per pertanyaan untuk "Peta Kesulitan Konsep". Diperbarui
+# dalam transaksi yang sama dengan penilaian kuis; bisa dibangun ulang dengan
+# `python manage.py rebuild_statistik_pertanyaan`.
+class StatistikPertanyaan(models.Model):
+    pertanyaan = models.OneToOneField(
+        Pertanyaan,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="statistik",
+    )
+    jumlah_percobaan = models.PositiveIntegerField(default=0)
+    jumlah_salah = models.PositiveIntegerField(default=0)
+    # jumlah_salah / jumlah_percobaan, disimpan agar bisa diurutkan lewat indeks
+    tingkat_kesalahan = models.FloatField(default=0)
+    percobaan_terakhir = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-tingkat_kesalahan", "-jumlah_salah"],
+                name="statistik_pertanyaan_sulit",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.pertanyaan}: {self.jumlah_salah}/{self.jumlah_percobaan} salah"
+
+
+# Rekap harian per siswa per pertanyaan untuk log lama yang sudah dipadatkan
+# dari QuizAttemptLog/JawabanSiswa (`python manage.py kompaksi_log`).
+class RekapHarianKuis(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    question = models.ForeignKey(Pertanyaan, on_delete=models.CASCADE)
+    tanggal = models.DateField()
+    jumlah = models.PositiveIntegerField(default=0)
+    jumlah_benar = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "question", "tanggal")
+        indexes = [
+            # Lanjutan linimasa log kuis setelah log mentah dipadatkan
+            models.Index(fields=["user", "-tanggal"], name="rekapkuis_user_tanggal"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.question_id} ({self.tanggal}): {self.jumlah_benar}/{self.jumlah}"
+
+
+class RekapHarianArena(models.Model):
+    siswa = models.ForeignKey(User, on_delete=models.CASCADE)
+    pertanyaan = models.ForeignKey(PertanyaanArena, on_delete=models.CASCADE)
+    tanggal = models.DateField()
+    jumlah = models.PositiveIntegerField(default=0)
+    jumlah_benar = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("siswa", "pertanyaan", "tanggal")
+        indexes = [
+            # Lanjutan linimasa arena setelah jawaban mentah dipadatkan
+            models.Index(fields=["siswa", "-tanggal"], name="rekaparena_siswa_tanggal"),
+        ]
+
+    def __str__(self):
+        return f"{self.siswa_id} - {self.pertanyaan_id} ({self.tanggal}): {self.jumlah_benar}/{self.jumlah}"
+
+
+# Snapshot KPI kelas untuk dashboard guru, dibuat berkala oleh
+# `python manage.py buat_snapshot_kelas` atau tombol "Perbarui" di dashboard.
+class SnapshotKelas(models.Model):
+    dibuat_pada = models.DateTimeField(db_index=True)
+    # Lama perhitungan (milidetik), untuk memantau biaya pipeline
+    durasi_ms = models.FloatField(default=0)
+    # KPI yang sudah dihitung (lihat core.analitik_kelas.hitung_kpi_kelas)
+    data = models.JSONField()
+
+    class Meta:
+        verbose_name = "Snapshot Kelas"
+        verbose_name_plural = "Snapshot Kelas"
+
     def __str__(self):
-        return f"{self.user.username} - {self.question.teks_pertanyaan[:30]} - {self.is_correct}"
\ No newline at end of file
+        return f"Snapshot kelas {self.dibuat_pada:%Y-%m-%d %H:%M}"
@@ -0,0 +1,136 @@
+# core/papan_peringkat.py
+
+import threading
+import time
+
+from django.conf import settings
+from sortedcontainers import SortedList
+
+from .models import ProfilSiswa
+from .versi import VERSI_PERINGKAT, ambil_versi
+
+
+class PapanPeringkat:
+    """
+    Papan peringkat siswa yang disimpan di memori proses sebagai SortedList
+    berisi kunci (-total_poin, user_id).
+
+    - teratas/terbawah/halaman: potongan langsung dari SortedList.
+    - peringkat(user_id): bisect, O(log n).
+    - perbarui(): dipanggil setiap kali poin berubah; kunci lama dibuang dan
+      kunci baru disisipkan dalam O(log n), tanpa menggeser seluruh daftar
+      seperti insort/del pada list biasa.
+
+    Perubahan dari proses lain masuk lewat pembangunan ulang berkala (TTL)
+    atau saat stempel VERSI_PERINGKAT naik (siswa baru/dihapus, ganti role).
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._versi = None
+        self._dimuat_pada = 0.0
+        self._kunci = SortedList()
+        self._poin = {}
+        self._nama = {}
+
+    def _pastikan_segar(self):
+        versi = ambil_versi(VERSI_PERINGKAT)
+        if versi == self._versi and time.monotonic() - self._dimuat_pada < self.ttl:
+            return
+        baris = ProfilSiswa.objects.filter(user__role="Siswa").values_list(
+            "user_id", "user__username", "total_poin"
+        )
+        poin, nama = {}, {}
+        for user_id, username, total_poin in baris:
+            poin[user_id] = total_poin
+            nama[user_id] = username
+        self._kunci = SortedList((-total_poin, user_id) for user_id, total_poin in poin.items())
+        self._poin = poin
+        self._nama = nama
+        self._versi = versi
+        self._dimuat_pada = time.monotonic()
+
+    def _entri(self, kunci):
+        poin_negatif, user_id = kunci
+        return {
+            "peringkat": self._kunci.bisect_left((poin_negatif,)) + 1,
+            "id": user_id,
+            "username": self._nama[user_id],
+            "total_poin": -poin_negatif,
+        }
+
+    def perbarui(self, user, total_poin=None):
+        """
+        Memindahkan posisi satu siswa. Tanpa `total_poin`, nilainya dibaca
+        ulang dari database di dalam lock: callback on_commit dari transaksi
+        serentak bisa berjalan tidak berurutan, dan dengan membaca ulang yang
+        terakhir memegang lock selalu memasang nilai yang paling baru.
+        """
+        if user.role != "Siswa":
+            return
+        with self._lock:
+            if self._versi is None:
+                # Belum pernah dimuat; pemuatan pertama akan membaca nilai terbaru
+                return
+            if total_poin is None:
+                total_poin = (
+                    ProfilSiswa.objects.filter(user_id=user.id)
+                    .values_list("total_poin", flat=True)
+                    .first()
+                )
+                if total_poin is None:
+                    return
+            poin_lama = self._poin.get(user.id)
+            if poin_lama is not None:
+                self._kunci.remove((-poin_lama, user.id))
+            self._kunci.add((-total_poin, user.id))
+            self._poin[user.id] = total_poin
+            self._nama[user.id] = user.username
+
+    def total(self):
+        with self._lock:
+            self._pastikan_segar()
+            return len(self._kunci)
+
+    def teratas(self, n):
+        with self._lock:
+            self._pastikan_segar()
+            return [self._entri(kunci) for kunci in self._kunci[:n]]
+
+    def terbawah(self, n, kurang_dari=None):
+        """n siswa dengan poin terendah (urut naik), opsional hanya yang poinnya < kurang_dari."""
+        with self._lock:
+            self._pastikan_segar()
+            hasil = []
+            for kunci in reversed(self._kunci[-n:] if n > 0 else []):
+                if kurang_dari is not None and -kunci[0] >= kurang_dari:
+                    break
+                hasil.append(self._entri(kunci))
+            return hasil
+
+    def halaman(self, nomor, ukuran):
+        with self._lock:
+            self._pastikan_segar()
+            awal = (nomor - 1) * ukuran
+            return [self._entri(kunci) for kunci in self._kunci[awal:awal + ukuran]]
+
+    def peringkat(self, user_id):
+        with self._lock:
+            self._pastikan_segar()
+            poin = self._poin.get(user_id)
+            if poin is None:
+                return None
+            return self._entri((-poin, user_id))
+
+
+papan_peringkat = PapanPeringkat(ttl=getattr(settings, "EKOSPHERE_PAPAN_PERINGKAT_TTL", 60))
+
+
+def konteks_papan_peringkat(user, n=5):
+    """Data papan peringkat untuk template: n teratas dan peringkat user sendiri."""
+    return {
+        "papan_peringkat": papan_peringkat.teratas(n),
+        "peringkat_saya": papan_peringkat.peringkat(user.id),
+        "total_peserta_peringkat": papan_peringkat.total(),
+    }
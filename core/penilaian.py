@@ -0,0 +1,104 @@
+# core/penilaian.py
+
+from .basisdata import transaksi_tulis
+from .kunci_jawaban import cache_kunci_jawaban
+from .lencana import berikan_lencana
+from .models import HasilKuis, ProfilSiswa, QuizAttemptLog
+from .poin import tambah_poin
+from .statistik import catat_statistik_pertanyaan
+from .versi import naikkan_versi_siswa
+
+POIN_PER_JAWABAN_BENAR = 10
+PREFIKS_FIELD_PERTANYAAN = "pertanyaan_"
+
+
+def _ke_int(nilai):
+    try:
+        return int(nilai)
+    except (TypeError, ValueError):
+        return None
+
+
+def jawaban_dari_form(data):
+    """
+    Mengubah data POST kuis (`pertanyaan_<id>=<id pilihan>`) menjadi
+    dict {id pertanyaan: id pilihan}. Field yang tidak valid diabaikan.
+    """
+    jawaban = {}
+    for nama_field, nilai in data.items():
+        if not nama_field.startswith(PREFIKS_FIELD_PERTANYAAN):
+            continue
+        pertanyaan_id = _ke_int(nama_field[len(PREFIKS_FIELD_PERTANYAAN):])
+        if pertanyaan_id is not None:
+            jawaban[pertanyaan_id] = _ke_int(nilai)
+    return jawaban
+
+
+@transaksi_tulis
+def _simpan_penilaian(user, kuis, hasil_per_pertanyaan, skor, jawaban_benar, total_pertanyaan):
+    """Seluruh penulisan satu pengiriman kuis, diulang utuh jika database terkunci."""
+    # Objek log dibuat di sini agar percobaan ulang tidak membawa pk lama
+    QuizAttemptLog.objects.bulk_create(
+        QuizAttemptLog(user=user, question_id=pertanyaan_id, is_correct=is_correct)
+        for pertanyaan_id, is_correct in hasil_per_pertanyaan.items()
+    )
+    catat_statistik_pertanyaan(hasil_per_pertanyaan)
+    profil_siswa, created = ProfilSiswa.objects.get_or_create(user=user)
+    hasil_sebelumnya = HasilKuis.objects.filter(siswa=user, kuis=kuis).first()
+    skor_sebelumnya = hasil_sebelumnya.skor if hasil_sebelumnya else 0.0
+    if hasil_sebelumnya:
+        HasilKuis.objects.filter(pk=hasil_sebelumnya.pk).update(skor=skor)
+        naikkan_versi_siswa(user.id)
+    else:
+        HasilKuis.objects.create(siswa=user, kuis=kuis, skor=skor)
+
+    tambahan_poin = 0
+    lencana_baru = []
+    if skor > skor_sebelumnya:
+        jawaban_benar_sebelumnya = round((skor_sebelumnya / 100) * total_pertanyaan)
+        tambahan_poin = (jawaban_benar - jawaban_benar_sebelumnya) * POIN_PER_JAWABAN_BENAR
+        if tambahan_poin > 0:
+            profil_id, poin_lama, poin_baru = tambah_poin(user, tambahan_poin)
+            profil_siswa.total_poin = poin_baru
+            lencana_baru = berikan_lencana(profil_id, user.id, poin_lama, poin_baru)
+    return profil_siswa, tambahan_poin, lencana_baru
+
+
+def nilai_kuis(user, kuis, jawaban, kunci=None):
+    """
+    Menilai satu pengiriman kuis secara set-based.
+
+    `jawaban` adalah dict {id pertanyaan: id pilihan}. Semua jawaban dinilai
+    di memori, seluruh QuizAttemptLog ditulis dengan satu bulk insert, dan
+    HasilKuis/ProfilSiswa (termasuk lencana baru) serta StatistikPertanyaan
+    diperbarui dalam satu transaksi tulis (core.basisdata.transaksi_tulis).
+    Jumlah query tetap (tidak bergantung pada banyaknya pertanyaan). Kunci
+    jawaban diambil dari cache_kunci_jawaban, jadi saat cache hangat tidak
+    ada query konten.
+    """
+    if kunci is None:
+        kunci = cache_kunci_jawaban.get(kuis.id)
+    total_pertanyaan = len(kunci)
+
+    hasil_per_pertanyaan = {}
+    jawaban_benar = 0
+    for pertanyaan_id, pilihan_benar_id in kunci.items():
+        pilihan_id = jawaban.get(pertanyaan_id)
+        is_correct = pilihan_id is not None and pilihan_id == pilihan_benar_id
+        hasil_per_pertanyaan[pertanyaan_id] = is_correct
+        if is_correct:
+            jawaban_benar += 1
+    skor = (jawaban_benar / total_pertanyaan) * 100 if total_pertanyaan > 0 else 0
+
+    profil_siswa, tambahan_poin, lencana_baru = _simpan_penilaian(
+        user, kuis, hasil_per_pertanyaan, skor, jawaban_benar, total_pertanyaan
+    )
+
+    return {
+        "skor": skor,
+        "jawaban_benar": jawaban_benar,
+        "total_pertanyaan": total_pertanyaan,
+        "tambahan_poin": max(tambahan_poin, 0),
+        "profil_siswa": profil_siswa,
+        "lencana_baru": lencana_baru,
+    }
@@ -0,0 +1,33 @@
+# core/poin.py
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import ProfilSiswa
+from .papan_peringkat import papan_peringkat
+from .versi import naikkan_versi_siswa
+
+POIN_JAWABAN_ARENA = 10
+
+
+def tambah_poin(user, jumlah):
+    """
+    Menambah total_poin siswa dengan increment atomik di sisi database
+    (UPDATE ... SET total_poin = total_poin + jumlah) yang hanya menyentuh
+    kolom poin, tanpa read-modify-write di Python.
+
+    Mengembalikan (id profil, poin lama, poin baru). UPDATE dan pembacaan
+    ulang berada dalam satu transaksi, jadi tidak ada penulis lain yang
+    bisa menyisip di antaranya dan selisihnya selalu tepat `jumlah`.
+    """
+    profil = ProfilSiswa.objects.filter(user=user)
+    with transaction.atomic():
+        if not profil.update(total_poin=F("total_poin") + jumlah):
+            ProfilSiswa.objects.get_or_create(user=user)
+            profil.update(total_poin=F("total_poin") + jumlah)
+        profil_id, poin_baru = profil.values_list("id", "total_poin").get()
+        # Poin dibaca ulang saat callback berjalan, bukan poin_baru: callback
+        # dari transaksi lain bisa dijalankan lebih dulu atau lebih lambat
+        transaction.on_commit(lambda: papan_peringkat.perbarui(user))
+        naikkan_versi_siswa(user.id)
+    return profil_id, poin_baru - jumlah, poin_baru
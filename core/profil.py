@@ -0,0 +1,27 @@
+# core/profil.py
+
+from django.utils.functional import SimpleLazyObject
+
+from .models import ProfilSiswa
+
+
+def ambil_profil_siswa(request):
+    """
+    Profil siswa untuk request ini, diambil paling banyak sekali per request
+    (hasilnya disimpan di request). Mengembalikan None untuk non-siswa.
+    """
+    if not hasattr(request, "_profil_siswa_cache"):
+        profil = None
+        if request.user.is_authenticated and request.user.role == "Siswa":
+            profil, created = ProfilSiswa.objects.get_or_create(user=request.user)
+        request._profil_siswa_cache = profil
+    return request._profil_siswa_cache
+
+
+def profil_siswa_lazy(request):
+    """
+    Versi lazy dari ambil_profil_siswa: query baru dijalankan saat atribut
+    profil benar-benar dipakai (mis. oleh template HTML), sehingga response
+    yang tidak menyentuhnya (JSON, redirect) tidak membayar query apa pun.
+    """
+    return SimpleLazyObject(lambda: ambil_profil_siswa(request))
@@ -0,0 +1,201 @@
+# core/riwayat.py
+
+import base64
+from datetime import date, datetime
+
+from django.db.models import Q
+from django.utils import dateformat, timezone
+
+from .models import HasilKuis, JawabanSiswa, QuizAttemptLog, RekapHarianArena, RekapHarianKuis
+
+UKURAN_HALAMAN = 20
+UKURAN_HALAMAN_MAKS = 100
+
+
+def _waktu(nilai):
+    return {
+        "waktu": nilai.isoformat(),
+        "waktu_teks": dateformat.format(timezone.localtime(nilai), "d M Y, H:i"),
+    }
+
+
+def _ringkasan(rekap):
+    # Baris rekap harian (log yang sudah dipadatkan oleh core.kompaksi)
+    return {
+        "ringkasan": True,
+        "jumlah": rekap.jumlah,
+        "jumlah_benar": rekap.jumlah_benar,
+        "waktu": rekap.tanggal.isoformat(),
+        "waktu_teks": f"{dateformat.format(rekap.tanggal, 'd M Y')} (rekap harian)",
+    }
+
+
+# Jenis riwayat per siswa: model, kolom pemilik dan waktu (urutan keyset),
+# relasi yang di-select_related dan pengubah baris ke dict untuk template/JSON.
+# Log yang dipadatkan kompaksi_log hanya tersisa sebagai rekap harian; "rekap"
+# menyambung linimasa ke tabel itu setelah log mentah habis.
+SPESIFIKASI_RIWAYAT = {
+    "kuis": {
+        "model": HasilKuis,
+        "siswa": "siswa_id",
+        "waktu": "waktu_selesai",
+        "relasi": ("kuis",),
+        "baris": lambda hasil: {
+            "id": hasil.id,
+            "kuis": hasil.kuis.judul,
+            "skor": hasil.skor,
+            **_waktu(hasil.waktu_selesai),
+        },
+    },
+    "log-kuis": {
+        "model": QuizAttemptLog,
+        "siswa": "user_id",
+        "waktu": "answered_at",
+        "relasi": ("question__kuis",),
+        "baris": lambda log: {
+            "id": log.id,
+            "kuis": log.question.kuis.judul,
+            "pertanyaan": log.question.teks_pertanyaan,
+            "benar": log.is_correct,
+            **_waktu(log.answered_at),
+        },
+        "rekap": {
+            "model": RekapHarianKuis,
+            "siswa": "user_id",
+            "relasi": ("question__kuis",),
+            "baris": lambda rekap: {
+                "id": rekap.id,
+                "kuis": rekap.question.kuis.judul,
+                "pertanyaan": rekap.question.teks_pertanyaan,
+                **_ringkasan(rekap),
+            },
+        },
+    },
+    "arena": {
+        "model": JawabanSiswa,
+        "siswa": "siswa_id",
+        "waktu": "waktu_jawab",
+        "relasi": ("pertanyaan",),
+        "baris": lambda jawaban: {
+            "id": jawaban.id,
+            "tipe": jawaban.pertanyaan.get_tipe_display(),
+            "benar": jawaban.jawaban_benar,
+            **_waktu(jawaban.waktu_jawab),
+        },
+        "rekap": {
+            "model": RekapHarianArena,
+            "siswa": "siswa_id",
+            "relasi": ("pertanyaan",),
+            "baris": lambda rekap: {
+                "id": rekap.id,
+                "tipe": rekap.pertanyaan.get_tipe_display(),
+                **_ringkasan(rekap),
+            },
+        },
+    },
+}
+
+
+class KursorTidakValid(ValueError):
+    pass
+
+
+def _kode(teks):
+    return base64.urlsafe_b64encode(teks.encode()).decode().rstrip("=")
+
+
+def buat_kursor(waktu, id_):
+    return _kode(f"{waktu.isoformat()}|{id_}")
+
+
+def buat_kursor_rekap(tanggal=None, id_=0):
+    """Kursor di dalam rekap harian; tanpa tanggal berarti awal rekap."""
+    return _kode(f"rekap|{tanggal.isoformat() if tanggal else ''}|{id_}")
+
+
+def baca_kursor(kursor):
+    """("log", (waktu, id)) atau ("rekap", (tanggal, id) atau None)."""
+    try:
+        teks = base64.urlsafe_b64decode(kursor + "=" * (-len(kursor) % 4)).decode()
+        bagian = teks.split("|")
+        if bagian[0] == "rekap":
+            _, tanggal, id_ = bagian
+            if not tanggal:
+                return "rekap", None
+            return "rekap", (date.fromisoformat(tanggal), int(id_))
+        waktu, id_ = bagian
+        waktu = datetime.fromisoformat(waktu)
+        if timezone.is_naive(waktu):
+            raise ValueError
+        return "log", (waktu, int(id_))
+    except ValueError:
+        raise KursorTidakValid("Kursor halaman tidak valid")
+
+
+def _potong(queryset, kolom_waktu, posisi, ukuran):
+    """
+    `ukuran` baris setelah `posisi` (waktu, id), terbaru dulu, plus penanda
+    apakah masih ada baris berikutnya (diambil satu baris ekstra).
+    """
+    if posisi:
+        waktu, id_ = posisi
+        queryset = queryset.filter(
+            Q(**{f"{kolom_waktu}__lt": waktu}) | Q(**{kolom_waktu: waktu, "id__gt": id_})
+        )
+    objek = list(queryset.order_by(f"-{kolom_waktu}", "id")[: ukuran + 1])
+    return objek[:ukuran], len(objek) > ukuran
+
+
+def halaman_riwayat(jenis, siswa_id, kursor=None, ukuran=UKURAN_HALAMAN):
+    """
+    Satu halaman riwayat `jenis` milik siswa, terbaru dulu, dengan keyset
+    pagination pada (waktu, id): halaman berikutnya dimulai tepat setelah
+    baris terakhir halaman ini, bukan dengan OFFSET, sehingga biayanya tetap
+    (satu query lewat indeks (siswa, -waktu)) sejauh apa pun siswa menggulir.
+    Waktu yang sama diurutkan dengan id naik, yaitu urutan rowid di dalam
+    indeks SQLite, jadi ORDER BY tidak butuh sort tambahan.
+    Setelah log mentah habis, jenis yang punya "rekap" dilanjutkan dengan
+    rekap harian (baris bertanda "ringkasan") dengan cara yang sama.
+    Mengembalikan {"baris": [dict], "kursor_berikutnya": str atau None}.
+    """
+    spek = SPESIFIKASI_RIWAYAT[jenis]
+    ukuran = max(1, min(ukuran, UKURAN_HALAMAN_MAKS))
+    fase, posisi = baca_kursor(kursor) if kursor else ("log", None)
+    rekap = spek.get("rekap")
+    if fase == "rekap" and rekap is None:
+        raise KursorTidakValid("Kursor halaman tidak valid")
+
+    baris = []
+    if fase == "log":
+        kolom_waktu = spek["waktu"]
+        objek, ada_lagi = _potong(
+            spek["model"].objects.filter(**{spek["siswa"]: siswa_id}).select_related(*spek["relasi"]),
+            kolom_waktu,
+            posisi,
+            ukuran,
+        )
+        baris = [spek["baris"](obj) for obj in objek]
+        if ada_lagi:
+            terakhir = objek[-1]
+            return {
+                "baris": baris,
+                "kursor_berikutnya": buat_kursor(getattr(terakhir, kolom_waktu), terakhir.id),
+            }
+        if rekap is None:
+            return {"baris": baris, "kursor_berikutnya": None}
+        posisi = None
+
+    objek, ada_lagi = _potong(
+        rekap["model"].objects.filter(**{rekap["siswa"]: siswa_id}).select_related(*rekap["relasi"]),
+        "tanggal",
+        posisi,
+        ukuran - len(baris),
+    )
+    baris += [rekap["baris"](obj) for obj in objek]
+    kursor_berikutnya = None
+    if ada_lagi:
+        # Halaman penuh oleh log mentah: rekap dimulai di halaman berikutnya
+        kursor_berikutnya = (
+            buat_kursor_rekap(objek[-1].tanggal, objek[-1].id) if objek else buat_kursor_rekap()
+        )
+    return {"baris": baris, "kursor_berikutnya": kursor_berikutnya}
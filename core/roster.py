@@ -0,0 +1,212 @@
+# core/roster.py
+
+import csv
+import os
+import secrets
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import get_password_validators, validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connections, transaction
+
+from .models import ProfilSiswa, User
+from .versi import VERSI_PERINGKAT, naikkan_versi
+
+KOLOM_ROSTER = ("username", "password", "first_name", "last_name", "email")
+UKURAN_TUGAS_HASH = 32
+
+
+class RosterTidakValid(ValueError):
+    def __init__(self, kesalahan):
+        self.kesalahan = kesalahan
+        super().__init__(f"{len(kesalahan)} baris roster tidak valid")
+
+
+def _kesalahan_baris(data, validator_password):
+    """Daftar pesan kesalahan satu baris roster (kosong jika valid)."""
+    kesalahan = []
+    username = data["username"]
+    try:
+        User.username_validator(username)
+    except ValidationError:
+        kesalahan.append(f"username {username!r} tidak valid")
+    for kolom in ("username", "first_name", "last_name", "email"):
+        panjang_maks = User._meta.get_field(kolom).max_length
+        if len(data[kolom]) > panjang_maks:
+            kesalahan.append(f"{kolom} lebih dari {panjang_maks} karakter")
+    if data["email"]:
+        try:
+            validate_email(data["email"])
+        except ValidationError:
+            kesalahan.append(f"email {data['email']!r} tidak valid")
+    if data["password"]:
+        # Pesan validator tidak memuat password, aman untuk ditampilkan
+        try:
+            validate_password(
+                data["password"],
+                user=User(
+                    username=username,
+                    first_name=data["first_name"],
+                    last_name=data["last_name"],
+                    email=data["email"],
+                ),
+                password_validators=validator_password,
+            )
+        except ValidationError as exc:
+            kesalahan.append(f"password ditolak: {' '.join(exc.messages)}")
+    return kesalahan
+
+
+def baca_roster(berkas):
+    """
+    Membaca CSV roster (header wajib memuat `username`; kolom lain opsional)
+    menjadi list dict. Setiap baris divalidasi seperti formulir pendaftaran:
+    username (format dan panjang), email, dan password lewat validator
+    EKOSPHERE_ROSTER_VALIDATOR_PASSWORD. Password kosong diganti password
+    acak dan ditandai `password_dibuat` agar bisa dibagikan ke siswa. Semua
+    kesalahan dikumpulkan dulu lalu dilempar sekaligus sebagai RosterTidakValid.
+    """
+    pembaca = csv.DictReader(berkas)
+    if not pembaca.fieldnames or "username" not in pembaca.fieldnames:
+        raise RosterTidakValid(["Header CSV harus memuat kolom username"])
+    validator_password = get_password_validators(
+        getattr(settings, "EKOSPHERE_ROSTER_VALIDATOR_PASSWORD", settings.AUTH_PASSWORD_VALIDATORS)
+    )
+    baris_roster, kesalahan, dilihat = [], [], set()
+    for nomor, baris in enumerate(pembaca, start=2):
+        data = {kolom: (baris.get(kolom) or "").strip() for kolom in KOLOM_ROSTER}
+        username = data["username"]
+        kesalahan_baris = _kesalahan_baris(data, validator_password)
+        if kesalahan_baris:
+            kesalahan.extend(f"Baris {nomor}: {pesan}" for pesan in kesalahan_baris)
+            continue
+        if username in dilihat:
+            kesalahan.append(f"Baris {nomor}: username {username!r} ganda di berkas")
+            continue
+        dilihat.add(username)
+        data["password_dibuat"] = not data["password"]
+        if data["password_dibuat"]:
+            data["password"] = secrets.token_urlsafe(9)
+        baris_roster.append(data)
+    if kesalahan:
+        raise RosterTidakValid(kesalahan)
+    return baris_roster
+
+
+def pisahkan_yang_sudah_ada(baris_roster):
+    """(baris baru, username yang sudah terdaftar), dicek per 500 username."""
+    ada = set()
+    usernames = [data["username"] for data in baris_roster]
+    for i in range(0, len(usernames), 500):
+        ada.update(
+            User.objects.filter(username__in=usernames[i : i + 500]).values_list(
+                "username", flat=True
+            )
+        )
+    return [data for data in baris_roster if data["username"] not in ada], sorted(ada)
+
+
+def _inisialisasi_pekerja(modul_settings):
+    # Pada start method "spawn" proses anak belum memuat Django
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", modul_settings)
+        django.setup()
+
+
+def _hash_potongan(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _potongan(daftar, ukuran):
+    iterator = iter(daftar)
+    while potongan := list(islice(iterator, ukuran)):
+        yield potongan
+
+
+def hash_paralel(passwords, proses=None):
+    """
+    Hash password dengan PASSWORD_HASHERS proyek, dibagi ke beberapa proses
+    (bawaan: jumlah CPU). Hasher sengaja lambat dan terikat CPU, jadi thread
+    tidak membantu karena GIL; dengan satu proses hashing dilakukan langsung.
+    Urutan hasil sama dengan urutan masukan.
+    """
+    proses = proses or os.cpu_count() or 1
+    if proses == 1 or len(passwords) <= UKURAN_TUGAS_HASH:
+        return _hash_potongan(passwords)
+    # Proses anak tidak memakai database; jangan wariskan koneksi yang terbuka
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=proses,
+        initializer=_inisialisasi_pekerja,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", ""),),
+    ) as pool:
+        hasil = []
+        for potongan in pool.map(_hash_potongan, _potongan(passwords, UKURAN_TUGAS_HASH)):
+            hasil.extend(potongan)
+        return hasil
+
+
+def tulis_kredensial_sementara(path, baris_roster):
+    """
+    Menulis username dan password acak ke berkas sementara (mode 0600) di
+    direktori `path`. Dipanggil sebelum akun disimpan agar kegagalan menulis
+    (izin, disk penuh) terjadi sebelum ada akun yang tidak bisa dibagikan
+    passwordnya. Setelah commit, pindahkan dengan os.replace(sementara, path).
+    """
+    fd, sementara = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".kredensial-", suffix=".csv"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as berkas:
+            penulis = csv.writer(berkas)
+            penulis.writerow(["username", "password"])
+            penulis.writerows((data["username"], data["password"]) for data in baris_roster)
+    except BaseException:
+        os.unlink(sementara)
+        raise
+    return sementara
+
+
+def simpan_roster(baris_roster, hashes, ukuran_batch=500):
+    """
+    Bulk insert User (role Siswa) dan ProfilSiswa per batch dalam satu
+    transaksi. bulk_create tidak memicu sinyal, jadi stempel papan peringkat
+    dinaikkan sekali setelah commit.
+    """
+    jumlah = 0
+    with transaction.atomic():
+        for awal in range(0, len(baris_roster), ukuran_batch):
+            batch = baris_roster[awal : awal + ukuran_batch]
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        username=data["username"],
+                        password=hash_,
+                        first_name=data["first_name"],
+                        last_name=data["last_name"],
+                        email=data["email"],
+                        role="Siswa",
+                    )
+                    for data, hash_ in zip(batch, hashes[awal : awal + ukuran_batch])
+                ]
+            )
+            if any(user.pk is None for user in users):
+                # Backend tanpa RETURNING pada bulk insert: ambil id lewat username
+                id_per_username = dict(
+                    User.objects.filter(
+                        username__in=[user.username for user in users]
+                    ).values_list("username", "id")
+                )
+                for user in users:
+                    user.pk = id_per_username[user.username]
+            ProfilSiswa.objects.bulk_create([ProfilSiswa(user_id=user.pk) for user in users])
+            jumlah += len(users)
+        transaction.on_commit(lambda: naikkan_versi(VERSI_PERINGKAT))
+    return jumlah
@@ -0,0 +1,150 @@
+# core/signals.py
+
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import (
+    HasilKuis,
+    InfoEkosistem,
+    Kuis,
+    Lencana,
+    Pertanyaan,
+    PertanyaanArena,
+    PilihanJawaban,
+    ProfilSiswa,
+    SubTopik,
+    Topik,
+    User,
+    UserMateriProgress,
+)
+from .basisdata import terapkan_pragma_sqlite
+from .lencana import hitung_ulang_jumlah_lencana
+from .statistik import kurangi_statistik_pertanyaan_user, ubah_jumlah_selesai
+from .versi import (
+    VERSI_ARENA,
+    VERSI_INFO,
+    VERSI_KUIS,
+    VERSI_KURIKULUM,
+    VERSI_LENCANA,
+    VERSI_PERINGKAT,
+    naikkan_versi_setelah_commit,
+    naikkan_versi_siswa,
+)
+
+
+@receiver(post_save, sender=Kuis)
+@receiver(post_delete, sender=Kuis)
+@receiver(post_save, sender=Pertanyaan)
+@receiver(post_delete, sender=Pertanyaan)
+@receiver(post_save, sender=PilihanJawaban)
+@receiver(post_delete, sender=PilihanJawaban)
+def konten_kuis_berubah(sender, **kwargs):
+    naikkan_versi_setelah_commit(VERSI_KUIS)
+
+
+@receiver(post_save, sender=Lencana)
+@receiver(post_delete, sender=Lencana)
+def lencana_berubah(sender, **kwargs):
+    naikkan_versi_setelah_commit(VERSI_LENCANA)
+
+
+@receiver(post_save, sender=User)
+def user_disimpan(sender, update_fields=None, **kwargs):
+    # Login hanya memperbarui last_login; tidak memengaruhi papan peringkat
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    naikkan_versi_setelah_commit(VERSI_PERINGKAT)
+
+
+@receiver(post_save, sender=ProfilSiswa)
+def profil_siswa_disimpan(sender, instance, created=False, **kwargs):
+    naikkan_versi_siswa(instance.user_id)
+    if created:
+        naikkan_versi_setelah_commit(VERSI_PERINGKAT)
+
+
+# Data per siswa yang ditampilkan di halamannya (lihat versi_siswa). Jalur
+# yang memakai queryset.update() menaikkan stempelnya sendiri.
+@receiver(post_save, sender=UserMateriProgress)
+@receiver(post_delete, sender=UserMateriProgress)
+def progres_materi_berubah(sender, instance, **kwargs):
+    naikkan_versi_siswa(instance.user_id)
+
+
+# Penghitung penyelesaian per modul. Dijaga lewat sinyal (bukan di view) agar
+# progres yang ikut terhapus berantai saat user dihapus juga mengurangi
+# penghitungnya. Insert massal tanpa sinyal: rebuild_statistik_modul.
+@receiver(post_save, sender=UserMateriProgress)
+def progres_materi_dibuat(sender, instance, created=False, **kwargs):
+    if created:
+        ubah_jumlah_selesai(instance.materi_id, 1)
+
+
+@receiver(post_delete, sender=UserMateriProgress)
+def progres_materi_dihapus(sender, instance, **kwargs):
+    ubah_jumlah_selesai(instance.materi_id, -1)
+
+
+@receiver(post_save, sender=HasilKuis)
+@receiver(post_delete, sender=HasilKuis)
+def hasil_kuis_berubah(sender, instance, **kwargs):
+    naikkan_versi_siswa(instance.siswa_id)
+
+
+# StatistikPertanyaan hanya menghitung jawaban siswa. Log ikut terhapus
+# berantai bersama user, jadi kontribusinya dikurangi sebelum penghapusan.
+@receiver(pre_delete, sender=User)
+def user_akan_dihapus(sender, instance, **kwargs):
+    if instance.role == "Siswa":
+        kurangi_statistik_pertanyaan_user(instance.id)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=ProfilSiswa)
+def peserta_peringkat_dihapus(sender, **kwargs):
+    naikkan_versi_setelah_commit(VERSI_PERINGKAT)
+
+
+@receiver(post_save, sender=Topik)
+@receiver(post_delete, sender=Topik)
+@receiver(post_save, sender=SubTopik)
+@receiver(post_delete, sender=SubTopik)
+@receiver(post_save, sender=Kuis)
+@receiver(post_delete, sender=Kuis)
+def kurikulum_berubah(sender, **kwargs):
+    naikkan_versi_setelah_commit(VERSI_KURIKULUM)
+
+
+@receiver(m2m_changed, sender=ProfilSiswa.lencana.through)
+def lencana_siswa_berubah(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        hitung_ulang_jumlah_lencana([instance.pk])
+        naikkan_versi_siswa(instance.user_id)
+    elif pk_set:
+        hitung_ulang_jumlah_lencana(pk_set)
+        for user_id in ProfilSiswa.objects.filter(pk__in=pk_set).values_list("user_id", flat=True):
+            naikkan_versi_siswa(user_id)
+    else:
+        # lencana.profilsiswa_set.clear(): profil yang terdampak tidak diketahui
+        hitung_ulang_jumlah_lencana()
+        naikkan_versi_setelah_commit(VERSI_LENCANA)
+
+
+@receiver(post_save, sender=PertanyaanArena)
+@receiver(post_delete, sender=PertanyaanArena)
+def arena_berubah(sender, **kwargs):
+    naikkan_versi_setelah_commit(VERSI_ARENA)
+
+
+@receiver(post_save, sender=InfoEkosistem)
+@receiver(post_delete, sender=InfoEkosistem)
+def info_ekosistem_berubah(sender, **kwargs):
+    naikkan_versi_setelah_commit(VERSI_INFO)
+
+
+@receiver(connection_created)
+def koneksi_dibuat(sender, connection, **kwargs):
+    terapkan_pragma_sqlite(connection)
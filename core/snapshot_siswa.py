@@ -0,0 +1,106 @@
+# core/snapshot_siswa.py
+
+from django.core.cache import cache
+
+from .kurikulum import indeks_kurikulum
+from .lencana import indeks_lencana
+from .models import HasilKuis, Lencana, ProfilSiswa
+from .versi import VERSI_KURIKULUM, VERSI_LENCANA, ambil_versi, versi_siswa
+
+SNAPSHOT_TTL = 60 * 60
+
+# Penghitung hit/miss cache snapshot di proses ini (perkiraan, tanpa lock);
+# dibaca oleh `python manage.py ukur_cache_snapshot`
+statistik_cache = {"hit": 0, "miss": 0}
+
+
+def _data_lencana(lencana):
+    return {
+        "nama": lencana.nama,
+        "deskripsi": lencana.deskripsi,
+        "gambar_url": lencana.gambar_url,
+        "syarat_poin": lencana.syarat_poin,
+    }
+
+
+def bangun_snapshot_siswa(user):
+    """
+    Semua data dashboard siswa dalam tiga query (profil, hasil kuis, lencana
+    dimiliki); daftar materi diambil dari indeks kurikulum di memori.
+    Hasilnya berupa dict/list biasa sehingga bisa disimpan di cache.
+    """
+    profil, created = ProfilSiswa.objects.get_or_create(user=user)
+    hasil_kuis = list(
+        HasilKuis.objects.filter(siswa=user)
+        .order_by("-waktu_selesai")
+        .values("kuis__judul", "kuis__subtopik_id", "skor")
+    )
+    subtopik_selesai_kuis = {hasil["kuis__subtopik_id"] for hasil in hasil_kuis}
+    lencana_dimiliki = list(
+        Lencana.objects.filter(profilsiswa=profil)
+        .order_by("syarat_poin", "id")
+        .values("id", "nama", "deskripsi", "gambar_url", "syarat_poin")
+    )
+
+    id_dimiliki = {lencana["id"] for lencana in lencana_dimiliki}
+    lencana_selanjutnya = next(
+        (
+            _data_lencana(lencana)
+            for lencana in indeks_lencana.semua()
+            if lencana.id not in id_dimiliki
+        ),
+        None,
+    )
+    progres_persen = 0
+    if lencana_selanjutnya and lencana_selanjutnya["syarat_poin"] > 0:
+        progres_persen = min(profil.total_poin / lencana_selanjutnya["syarat_poin"] * 100, 100)
+
+    daftar_materi = []
+    for topik in indeks_kurikulum.semua_topik():
+        for subtopik_id in topik["subtopik_ids"]:
+            subtopik = indeks_kurikulum.subtopik(subtopik_id)
+            daftar_materi.append(
+                {
+                    "id": subtopik_id,
+                    "judul": subtopik["judul"],
+                    "topik_judul": topik["judul"],
+                    "kuis_selesai": subtopik["punya_kuis"] and subtopik_id in subtopik_selesai_kuis,
+                }
+            )
+
+    return {
+        "profil_siswa": {
+            "id": profil.id,
+            "total_poin": profil.total_poin,
+            "jumlah_lencana": profil.jumlah_lencana,
+        },
+        "daftar_materi": daftar_materi,
+        "hasil_kuis_list": [
+            {"kuis_judul": hasil["kuis__judul"], "skor": hasil["skor"]} for hasil in hasil_kuis
+        ],
+        "lencana_dimiliki": lencana_dimiliki,
+        "lencana_selanjutnya": lencana_selanjutnya,
+        "progres_persen": progres_persen,
+    }
+
+
+def snapshot_siswa(user):
+    """
+    Snapshot dashboard dari cache per pengguna. Kunci cache memuat stempel
+    data siswa (naik saat kuis, progres, poin atau lencana berubah) serta
+    stempel kurikulum dan lencana, jadi entri lama otomatis tidak terpakai.
+    """
+    kunci_cache = "ekosphere:snapshot_siswa:{}:{}:{}:{}".format(
+        user.id,
+        ambil_versi(versi_siswa(user.id)),
+        ambil_versi(VERSI_KURIKULUM),
+        ambil_versi(VERSI_LENCANA),
+    )
+    snapshot = cache.get(kunci_cache)
+    if snapshot is None:
+        statistik_cache["miss"] += 1
+        snapshot = bangun_snapshot_siswa(user)
+        cache.set(kunci_cache, snapshot, timeout=SNAPSHOT_TTL)
+    else:
+        statistik_cache["hit"] += 1
+    return snapshot
@@ -0,0 +1,206 @@
+# core/statistik.py
+
+from datetime import datetime, time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, FloatField, Max, Q, Sum, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import (
+    QuizAttemptLog,
+    RekapHarianKuis,
+    StatistikModul,
+    StatistikPertanyaan,
+    SubTopik,
+    UserMateriProgress,
+)
+
+
+def ubah_jumlah_selesai(materi_id, delta):
+    """
+    Menambah/mengurangi penghitung penyelesaian sebuah modul secara atomik
+    di sisi database (UPDATE ... SET jumlah_selesai = jumlah_selesai + delta).
+    Baris penghitung dibuat otomatis saat penyelesaian pertama.
+    """
+    penghitung = StatistikModul.objects.filter(materi_id=materi_id)
+    if delta < 0:
+        # Jangan sampai penghitung bernilai negatif
+        penghitung = penghitung.filter(jumlah_selesai__gte=-delta)
+    diubah = penghitung.update(jumlah_selesai=F("jumlah_selesai") + delta)
+    if diubah or delta <= 0:
+        return
+    try:
+        with transaction.atomic():
+            StatistikModul.objects.create(materi_id=materi_id, jumlah_selesai=delta)
+    except IntegrityError:
+        # Baris sudah dibuat oleh request lain di antara UPDATE dan INSERT
+        StatistikModul.objects.filter(materi_id=materi_id).update(
+            jumlah_selesai=F("jumlah_selesai") + delta
+        )
+
+
+def rebuild_statistik_modul():
+    """
+    Menghitung ulang seluruh penghitung dari tabel UserMateriProgress.
+    Mengembalikan jumlah modul yang penghitungnya ditulis.
+    """
+    jumlah_per_materi = dict(
+        UserMateriProgress.objects.values("materi")
+        .annotate(jumlah=Count("id"))
+        .values_list("materi", "jumlah")
+    )
+    materi_ids = list(SubTopik.objects.values_list("id", flat=True))
+    with transaction.atomic():
+        StatistikModul.objects.all().delete()
+        StatistikModul.objects.bulk_create(
+            [
+                StatistikModul(
+                    materi_id=materi_id,
+                    jumlah_selesai=jumlah_per_materi.get(materi_id, 0),
+                )
+                for materi_id in materi_ids
+            ],
+            batch_size=500,
+        )
+    return len(materi_ids)
+
+
+def catat_statistik_pertanyaan(hasil_per_pertanyaan, waktu=None):
+    """
+    Menambahkan hasil satu pengiriman kuis ({id pertanyaan: benar?}) ke
+    StatistikPertanyaan dengan jumlah query tetap: satu INSERT ... ON CONFLICT
+    DO NOTHING untuk baris yang belum ada, lalu satu UPDATE untuk jawaban
+    salah dan satu untuk jawaban benar. Panggil di dalam transaksi penilaian.
+    """
+    if not hasil_per_pertanyaan:
+        return
+    waktu = waktu or timezone.now()
+    StatistikPertanyaan.objects.bulk_create(
+        [StatistikPertanyaan(pertanyaan_id=pertanyaan_id) for pertanyaan_id in hasil_per_pertanyaan],
+        ignore_conflicts=True,
+    )
+    salah = [pid for pid, benar in hasil_per_pertanyaan.items() if not benar]
+    benar = [pid for pid, benar in hasil_per_pertanyaan.items() if benar]
+    for pertanyaan_ids, tambahan_salah in ((salah, 1), (benar, 0)):
+        if not pertanyaan_ids:
+            continue
+        # Ruas kanan SET memakai nilai lama baris, jadi rasio dihitung dari nilai baru secara eksplisit
+        StatistikPertanyaan.objects.filter(pertanyaan_id__in=pertanyaan_ids).update(
+            jumlah_percobaan=F("jumlah_percobaan") + 1,
+            jumlah_salah=F("jumlah_salah") + tambahan_salah,
+            tingkat_kesalahan=Cast(F("jumlah_salah") + tambahan_salah, FloatField())
+            / (F("jumlah_percobaan") + 1),
+            percobaan_terakhir=waktu,
+        )
+
+
+def kurangi_statistik_pertanyaan_user(user_id):
+    """
+    Mengeluarkan jawaban seorang siswa (log mentah dan rekap harian) dari
+    StatistikPertanyaan, dipanggil sebelum user dihapus beserta log-nya agar
+    penghitung tetap sama dengan hasil rebuild_statistik_pertanyaan().
+    Pertanyaan dengan selisih yang sama diperbarui dengan satu UPDATE.
+    percobaan_terakhir dibiarkan; nilainya hanya dipulihkan oleh rebuild.
+    """
+    selisih = {}
+    log_mentah = (
+        QuizAttemptLog.objects.filter(user_id=user_id)
+        .values("question")
+        .annotate(percobaan=Count("id"), benar=Count("id", filter=Q(is_correct=True)))
+        .values_list("question", "percobaan", "benar")
+    )
+    log_dipadatkan = (
+        RekapHarianKuis.objects.filter(user_id=user_id)
+        .values("question")
+        .annotate(percobaan=Sum("jumlah"), benar=Sum("jumlah_benar"))
+        .values_list("question", "percobaan", "benar")
+    )
+    for baris in (log_mentah, log_dipadatkan):
+        for pertanyaan_id, percobaan, benar in baris:
+            data = selisih.setdefault(pertanyaan_id, [0, 0])
+            data[0] += percobaan
+            data[1] += percobaan - benar
+
+    per_selisih = {}
+    for pertanyaan_id, (percobaan, salah) in selisih.items():
+        per_selisih.setdefault((percobaan, salah), []).append(pertanyaan_id)
+    for (percobaan, salah), pertanyaan_ids in per_selisih.items():
+        StatistikPertanyaan.objects.filter(
+            pertanyaan_id__in=pertanyaan_ids,
+            jumlah_percobaan__gte=percobaan,
+            jumlah_salah__gte=salah,
+        ).update(
+            jumlah_percobaan=F("jumlah_percobaan") - percobaan,
+            jumlah_salah=F("jumlah_salah") - salah,
+            tingkat_kesalahan=Case(
+                When(jumlah_percobaan=percobaan, then=Value(0.0)),
+                default=Cast(F("jumlah_salah") - salah, FloatField())
+                / (F("jumlah_percobaan") - percobaan),
+                output_field=FloatField(),
+            ),
+        )
+
+
+def pertanyaan_tersulit(n=5):
+    """n pertanyaan dengan tingkat kesalahan tertinggi, dibaca lewat indeks."""
+    return (
+        StatistikPertanyaan.objects.filter(jumlah_salah__gt=0)
+        .select_related("pertanyaan")
+        .order_by("-tingkat_kesalahan", "-jumlah_salah")[:n]
+    )
+
+
+def rebuild_statistik_pertanyaan():
+    """
+    Menghitung ulang StatistikPertanyaan dari jawaban siswa di QuizAttemptLog
+    ditambah rekap harian log yang sudah dipadatkan (RekapHarianKuis).
+    Mengembalikan jumlah pertanyaan yang punya statistik.
+    """
+    rekap = {}
+    log_mentah = (
+        QuizAttemptLog.objects.filter(user__role="Siswa")
+        .values("question")
+        .annotate(
+            percobaan=Count("id"),
+            salah=Count("id", filter=Q(is_correct=False)),
+            terakhir=Max("answered_at"),
+        )
+        .values_list("question", "percobaan", "salah", "terakhir")
+    )
+    for pertanyaan_id, percobaan, salah, terakhir in log_mentah.iterator():
+        rekap[pertanyaan_id] = [percobaan, salah, terakhir]
+
+    log_dipadatkan = (
+        RekapHarianKuis.objects.filter(user__role="Siswa")
+        .values("question")
+        .annotate(
+            percobaan=Sum("jumlah"),
+            benar=Sum("jumlah_benar"),
+            terakhir=Max("tanggal"),
+        )
+        .values_list("question", "percobaan", "benar", "terakhir")
+    )
+    for pertanyaan_id, percobaan, benar, tanggal in log_dipadatkan.iterator():
+        data = rekap.setdefault(pertanyaan_id, [0, 0, None])
+        data[0] += percobaan
+        data[1] += percobaan - benar
+        if data[2] is None:
+            # Waktu pasti sudah hilang; pakai awal hari dari rekap harian
+            data[2] = timezone.make_aware(datetime.combine(tanggal, time.min))
+
+    statistik = [
+        StatistikPertanyaan(
+            pertanyaan_id=pertanyaan_id,
+            jumlah_percobaan=percobaan,
+            jumlah_salah=salah,
+            tingkat_kesalahan=salah / percobaan,
+            percobaan_terakhir=terakhir,
+        )
+        for pertanyaan_id, (percobaan, salah, terakhir) in rekap.items()
+        if percobaan
+    ]
+    with transaction.atomic():
+        StatistikPertanyaan.objects.all().delete()
+        StatistikPertanyaan.objects.bulk_create(statistik, batch_size=500)
+    return len(statistik)
@@ -1,3 +1,1374 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import re
+import tempfile
+import threading
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .analitik_kelas import buat_snapshot_kelas
+from .arena import pool_arena
+from .basisdata import transaksi_tulis
+from .ekspor import alirkan_ekspor, queryset_ekspor
+from .info_ekosistem import sampler_info
+from . import kompaksi as kompaksi_modul
+from .kompaksi import kompaksi
+from .management.commands.benchmark_views import daftar_skenario, kirim_skenario
+from .management.commands.cek_query_plan import periksa_query
+from .middleware import InstrumentasiQueryMiddleware, _pasang_pencatat_query
+from .models import (
+    HasilKuis,
+    InfoEkosistem,
+    JawabanSiswa,
+    Kuis,
+    Lencana,
+    Pertanyaan,
+    PilihanJawaban,
+    PertanyaanArena,
+    ProfilSiswa,
+    QuizAttemptLog,
+    RekapHarianKuis,
+    SnapshotKelas,
+    StatistikModul,
+    StatistikPertanyaan,
+    SubTopik,
+    Topik,
+    User,
+    UserMateriProgress,
+)
+from .kunci_jawaban import CacheKunciJawaban, cache_kunci_jawaban
+from .kurikulum_json import KunciAlamiGanda, ekspor_kurikulum, impor_kurikulum
+from .kurikulum import IKON_SELESAI, indeks_kurikulum, render_sidebar_materi
+from .lencana import berikan_lencana, indeks_lencana, sinkronkan_lencana
+from .papan_peringkat import PapanPeringkat, papan_peringkat
+from .penilaian import nilai_kuis
+from .poin import tambah_poin
+from .riwayat import halaman_riwayat
+from .roster import RosterTidakValid, baca_roster
+from .snapshot_siswa import snapshot_siswa
+from .statistik import rebuild_statistik_pertanyaan, ubah_jumlah_selesai
+from .versi import (
+    VERSI_ARENA,
+    VERSI_INFO,
+    VERSI_KUIS,
+    VERSI_KURIKULUM,
+    VERSI_LENCANA,
+    VERSI_PERINGKAT,
+    ambil_versi,
+    versi_siswa,
+)
+
+
+def buat_kurikulum(jumlah_subtopik=1, pertanyaan_per_kuis=3, pilihan_per_pertanyaan=3):
+    """
+    Kurikulum kecil untuk pengujian: satu topik, `jumlah_subtopik` subtopik
+    masing-masing dengan kuis. Pilihan pertama setiap pertanyaan benar.
+    """
+    guru = User.objects.create(username="guru_uji", role="Guru")
+    topik = Topik.objects.create(judul="Ekosistem", urutan=1)
+    daftar_subtopik = []
+    for i in range(jumlah_subtopik):
+        subtopik = SubTopik.objects.create(
+            topik=topik, judul=f"Materi {i + 1}", konten="Isi", urutan=i, pembuat=guru
+        )
+        kuis = Kuis.objects.create(subtopik=subtopik, judul=f"Kuis {i + 1}")
+        for j in range(pertanyaan_per_kuis):
+            pertanyaan = Pertanyaan.objects.create(kuis=kuis, teks_pertanyaan=f"Soal {i}-{j}")
+            for k in range(pilihan_per_pertanyaan):
+                PilihanJawaban.objects.create(
+                    pertanyaan=pertanyaan, teks_jawaban=f"Pilihan {k}", is_benar=k == 0
+                )
+        daftar_subtopik.append(subtopik)
+    return guru, daftar_subtopik
+
+
+def buat_siswa(username="siswa_uji"):
+    return User.objects.create(username=username, role="Siswa")
+
+
+def tumbuhkan_kurikulum(guru, siswa, jumlah_topik, subtopik_per_topik=3):
+    """
+    Menambah `jumlah_topik` topik berisi subtopik berkuis, lalu progres dan
+    hasil kuis `siswa` untuk semuanya; dipakai uji jumlah query yang tidak
+    boleh ikut tumbuh bersama kurikulum.
+    """
+    awal = Topik.objects.count()
+    for t in range(awal, awal + jumlah_topik):
+        topik = Topik.objects.create(judul=f"Topik {t}", urutan=t + 10)
+        for i in range(subtopik_per_topik):
+            subtopik = SubTopik.objects.create(
+                topik=topik, judul=f"Materi {t}-{i}", konten="Isi", urutan=i, pembuat=guru
+            )
+            kuis = Kuis.objects.create(subtopik=subtopik, judul=f"Kuis {t}-{i}")
+            UserMateriProgress.objects.create(user=siswa, materi=subtopik)
+            HasilKuis.objects.create(siswa=siswa, kuis=kuis, skor=50)
+
+
+class UjiEkoSphere(TestCase):
+    # Stempel versi di cache tidak ikut di-rollback antar test; kosongkan agar
+    # indeks dalam proses (lencana, kurikulum, kunci jawaban) dibangun ulang
+    def setUp(self):
+        cache.clear()
+
+
+class StatistikModulTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, (self.materi,) = buat_kurikulum()
+        self.siswa = buat_siswa()
+
+    def jumlah_selesai(self):
+        return StatistikModul.objects.get(materi=self.materi).jumlah_selesai
+
+    def test_penyelesaian_pertama_membuat_penghitung(self):
+        self.assertFalse(StatistikModul.objects.filter(materi=self.materi).exists())
+        ubah_jumlah_selesai(self.materi.id, 1)
+        self.assertEqual(self.jumlah_selesai(), 1)
+
+    def test_penghitung_yang_ada_dinaikkan(self):
+        StatistikModul.objects.create(materi=self.materi, jumlah_selesai=3)
+        ubah_jumlah_selesai(self.materi.id, 1)
+        self.assertEqual(self.jumlah_selesai(), 4)
+
+    def test_penghitung_tidak_negatif(self):
+        StatistikModul.objects.create(materi=self.materi, jumlah_selesai=0)
+        ubah_jumlah_selesai(self.materi.id, -1)
+        self.assertEqual(self.jumlah_selesai(), 0)
+
+    def test_tandai_dan_batalkan_lewat_view(self):
+        self.client.force_login(self.siswa)
+        self.client.get(f"/materi/selesai/{self.materi.id}/")
+        self.client.get(f"/materi/selesai/{self.materi.id}/")
+        self.assertEqual(self.jumlah_selesai(), 1)
+        self.client.get(f"/materi/batalkan-selesai/{self.materi.id}/")
+        self.assertEqual(self.jumlah_selesai(), 0)
+
+    def test_hapus_user_mengurangi_penghitung(self):
+        siswa_lain = buat_siswa("siswa_lain")
+        UserMateriProgress.objects.create(user=self.siswa, materi=self.materi)
+        UserMateriProgress.objects.create(user=siswa_lain, materi=self.materi)
+        self.assertEqual(self.jumlah_selesai(), 2)
+        self.siswa.delete()
+        self.assertEqual(self.jumlah_selesai(), 1)
+
+
+class PenilaianKuisTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, (materi,) = buat_kurikulum(pertanyaan_per_kuis=3)
+        self.kuis = materi.kuis
+        self.siswa = buat_siswa()
+        self.pertanyaan = list(self.kuis.pertanyaan.order_by("id"))
+        self.benar = {p.id: p.pilihan.get(is_benar=True).id for p in self.pertanyaan}
+        self.salah = {p.id: p.pilihan.filter(is_benar=False).first().id for p in self.pertanyaan}
+
+    def jawab(self, jumlah_benar):
+        jawaban = {
+            p.id: (self.benar if i < jumlah_benar else self.salah)[p.id]
+            for i, p in enumerate(self.pertanyaan)
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            return nilai_kuis(self.siswa, self.kuis, jawaban)
+
+    def total_poin(self):
+        return ProfilSiswa.objects.get(user=self.siswa).total_poin
+
+    def test_skor_penuh(self):
+        lencana = Lencana.objects.create(nama="Pemula", deskripsi="-", syarat_poin=30)
+        hasil = self.jawab(3)
+        self.assertEqual(hasil["skor"], 100)
+        self.assertEqual(hasil["jawaban_benar"], 3)
+        self.assertEqual(hasil["tambahan_poin"], 30)
+        self.assertEqual(hasil["lencana_baru"], [lencana])
+        self.assertEqual(self.total_poin(), 30)
+        self.assertEqual(HasilKuis.objects.get(siswa=self.siswa, kuis=self.kuis).skor, 100)
+        self.assertEqual(
+            QuizAttemptLog.objects.filter(user=self.siswa, is_correct=True).count(), 3
+        )
+        self.assertEqual(StatistikPertanyaan.objects.filter(jumlah_percobaan=1).count(), 3)
+
+    def test_skor_sebagian(self):
+        hasil = self.jawab(2)
+        self.assertAlmostEqual(hasil["skor"], 200 / 3)
+        self.assertEqual(hasil["tambahan_poin"], 20)
+        self.assertEqual(self.total_poin(), 20)
+        self.assertEqual(QuizAttemptLog.objects.filter(user=self.siswa).count(), 3)
+        salah = StatistikPertanyaan.objects.get(pertanyaan=self.pertanyaan[2])
+        self.assertEqual((salah.jumlah_salah, salah.jumlah_percobaan), (1, 1))
+
+    def test_skor_nol(self):
+        hasil = self.jawab(0)
+        self.assertEqual(hasil["skor"], 0)
+        self.assertEqual(hasil["tambahan_poin"], 0)
+        self.assertEqual(self.total_poin(), 0)
+        self.assertEqual(HasilKuis.objects.get(siswa=self.siswa, kuis=self.kuis).skor, 0)
+
+    def test_mengulang_hanya_menambah_selisih_poin(self):
+        self.jawab(1)
+        hasil = self.jawab(3)
+        self.assertEqual(hasil["tambahan_poin"], 20)
+        self.assertEqual(self.total_poin(), 30)
+        self.assertEqual(HasilKuis.objects.filter(siswa=self.siswa).count(), 1)
+        # Skor lebih rendah tidak menimpa skor terbaik dengan poin negatif
+        hasil = self.jawab(0)
+        self.assertEqual(hasil["tambahan_poin"], 0)
+        self.assertEqual(self.total_poin(), 30)
+
+    def test_stempel_siswa_naik_setelah_commit(self):
+        stempel = ambil_versi(versi_siswa(self.siswa.id))
+        self.assertEqual(snapshot_siswa(self.siswa)["hasil_kuis_list"], [])
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            nilai_kuis(self.siswa, self.kuis, self.benar)
+        # Belum di-commit: stempel belum boleh berubah
+        self.assertEqual(ambil_versi(versi_siswa(self.siswa.id)), stempel)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(ambil_versi(versi_siswa(self.siswa.id)), stempel)
+        self.assertEqual(
+            snapshot_siswa(self.siswa)["hasil_kuis_list"], [{"kuis_judul": "Kuis 1", "skor": 100}]
+        )
+
+    def test_pengerjaan_ulang_menaikkan_stempel_siswa(self):
+        self.jawab(1)
+        self.assertAlmostEqual(snapshot_siswa(self.siswa)["hasil_kuis_list"][0]["skor"], 100 / 3)
+        self.jawab(3)
+        self.assertEqual(snapshot_siswa(self.siswa)["hasil_kuis_list"][0]["skor"], 100)
+
+    def test_jumlah_query_tidak_bergantung_jumlah_pertanyaan(self):
+        topik = Topik.objects.get()
+        guru = User.objects.get(role="Guru")
+        subtopik = SubTopik.objects.create(topik=topik, judul="Panjang", konten="-", pembuat=guru)
+        kuis_panjang = Kuis.objects.create(subtopik=subtopik, judul="Kuis panjang")
+        for i in range(12):
+            pertanyaan = Pertanyaan.objects.create(kuis=kuis_panjang, teks_pertanyaan=f"Soal {i}")
+            PilihanJawaban.objects.create(pertanyaan=pertanyaan, teks_jawaban="Benar", is_benar=True)
+
+        # Indeks lencana di memori dibangun sekali per proses, bukan per kuis
+        indeks_lencana.semua()
+        jumlah_query = []
+        for kuis in (self.kuis, kuis_panjang):
+            siswa = buat_siswa(f"siswa_{kuis.id}")
+            jawaban = dict(
+                PilihanJawaban.objects.filter(pertanyaan__kuis=kuis, is_benar=True).values_list(
+                    "pertanyaan_id", "id"
+                )
+            )
+            cache_kunci_jawaban.clear()
+            with CaptureQueriesContext(connection) as konteks:
+                nilai_kuis(siswa, kuis, jawaban)
+            jumlah_query.append(len(konteks.captured_queries))
+        self.assertEqual(jumlah_query[0], jumlah_query[1])
+
+
+class CacheKunciJawabanTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, (materi,) = buat_kurikulum(pertanyaan_per_kuis=1)
+        self.kuis = materi.kuis
+        self.pertanyaan = self.kuis.pertanyaan.get()
+        cache_kunci_jawaban.clear()
+
+    def test_kunci_baru_terlihat_setelah_commit(self):
+        benar_lama = self.pertanyaan.pilihan.get(is_benar=True)
+        benar_baru = self.pertanyaan.pilihan.exclude(pk=benar_lama.pk).first()
+        self.assertEqual(cache_kunci_jawaban.get(self.kuis.id), {self.pertanyaan.id: benar_lama.id})
+        stempel = ambil_versi(VERSI_KUIS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                benar_lama.is_benar = False
+                benar_lama.save()
+                benar_baru.is_benar = True
+                benar_baru.save()
+                # Belum di-commit: stempel tidak boleh naik lebih dulu
+                self.assertEqual(ambil_versi(VERSI_KUIS), stempel)
+
+        self.assertNotEqual(ambil_versi(VERSI_KUIS), stempel)
+        self.assertEqual(cache_kunci_jawaban.get(self.kuis.id), {self.pertanyaan.id: benar_baru.id})
+
+    def test_rollback_tidak_menaikkan_stempel(self):
+        stempel = ambil_versi(VERSI_KUIS)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.pertanyaan.pilihan.update(is_benar=False)
+                self.pertanyaan.pilihan.first().save()
+                transaction.set_rollback(True)
+        self.assertEqual(ambil_versi(VERSI_KUIS), stempel)
+
+    def test_kuis_terlama_digusur(self):
+        subtopik = self.kuis.subtopik
+        kuis_lain = [
+            Kuis.objects.create(
+                subtopik=SubTopik.objects.create(
+                    topik=subtopik.topik, judul=f"Lain {i}", konten="-", pembuat=subtopik.pembuat
+                ),
+                judul=f"Kuis lain {i}",
+            )
+            for i in range(2)
+        ]
+        kecil = CacheKunciJawaban(maksimum=2)
+        a, b, c = self.kuis.id, kuis_lain[0].id, kuis_lain[1].id
+        kecil.get(a)
+        kecil.get(b)
+        kecil.get(a)  # a jadi yang terbaru dipakai, b yang terlama
+        kecil.get(c)
+        self.assertEqual(kecil.statistik(), {"hit": 1, "miss": 3, "ukuran": 2})
+
+        with self.assertNumQueries(0):
+            kecil.get(a)
+        # b sudah digusur: dibaca ulang dari database dan dihitung miss
+        with self.assertNumQueries(1):
+            self.assertEqual(kecil.get(b), {})
+        self.assertEqual(kecil.statistik(), {"hit": 2, "miss": 4, "ukuran": 2})
+
+    def test_penilaian_hangat_tanpa_query_konten(self):
+        siswa = buat_siswa()
+        jawaban = {self.pertanyaan.id: self.pertanyaan.pilihan.get(is_benar=True).id}
+        nilai_kuis(siswa, self.kuis, jawaban)
+        hit = cache_kunci_jawaban.statistik()["hit"]
+
+        with CaptureQueriesContext(connection) as konteks:
+            nilai_kuis(siswa, self.kuis, jawaban)
+        self.assertEqual(cache_kunci_jawaban.statistik()["hit"], hit + 1)
+        tabel_konten = ("core_pertanyaan", "core_pilihanjawaban", "core_kuis")
+        query_konten = [
+            q["sql"] for q in konteks.captured_queries
+            if re.search(r'FROM "(%s)"' % "|".join(tabel_konten), q["sql"])
+        ]
+        self.assertEqual(query_konten, [])
+
+
+class LencanaTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        self.siswa = buat_siswa()
+        self.profil = ProfilSiswa.objects.create(user=self.siswa)
+        self.lencana = [
+            Lencana.objects.create(nama=f"Lencana {syarat}", deskripsi="-", syarat_poin=syarat)
+            for syarat in (20, 50, 100)
+        ]
+
+    def nama(self, daftar):
+        return [lencana.nama for lencana in daftar]
+
+    def test_poin_tepat_di_ambang(self):
+        self.assertEqual(self.nama(indeks_lencana.terlewati(10, 20)), ["Lencana 20"])
+        # Sudah tepat di ambang sebelumnya: tidak terlewati lagi
+        self.assertEqual(indeks_lencana.terlewati(20, 49), [])
+        self.assertEqual(self.nama(indeks_lencana.terlewati(49, 50)), ["Lencana 50"])
+        self.assertEqual(indeks_lencana.terlewati(19, 19), [])
+
+    def test_melewati_beberapa_ambang_sekaligus(self):
+        self.assertEqual(
+            self.nama(indeks_lencana.terlewati(0, 100)), ["Lencana 20", "Lencana 50", "Lencana 100"]
+        )
+        self.assertEqual(
+            self.nama(indeks_lencana.terlewati(20, 150)), ["Lencana 50", "Lencana 100"]
+        )
+        self.assertEqual(indeks_lencana.terlewati(100, 0), [])
+
+    def test_berikan_lencana_dua_query(self):
+        indeks_lencana.semua()  # indeks sudah hangat
+        with self.assertNumQueries(2):
+            baru = berikan_lencana(self.profil.id, self.siswa.id, 10, 60)
+        self.assertEqual(self.nama(baru), ["Lencana 20", "Lencana 50"])
+        self.profil.refresh_from_db()
+        self.assertEqual(self.profil.jumlah_lencana, 2)
+
+    def test_lencana_yang_sudah_dimiliki_tidak_menggandakan_jumlah(self):
+        self.profil.lencana.add(self.lencana[1])
+        berikan_lencana(self.profil.id, self.siswa.id, 10, 60)
+        self.profil.refresh_from_db()
+        self.assertEqual(self.profil.jumlah_lencana, 2)
+        self.assertEqual(self.profil.lencana.count(), 2)
+
+    def test_sinkronkan_hanya_lencana_yang_belum_dimiliki(self):
+        self.profil.lencana.add(self.lencana[0])
+        self.profil.total_poin = 100
+        self.assertEqual(self.nama(sinkronkan_lencana(self.profil)), ["Lencana 50", "Lencana 100"])
+        self.assertEqual(sinkronkan_lencana(self.profil), [])
+        self.profil.refresh_from_db()
+        self.assertEqual(self.profil.jumlah_lencana, 3)
+
+    def test_stempel_lencana_dan_peringkat_naik_setelah_commit(self):
+        self.assertEqual(self.nama(indeks_lencana.terlewati(0, 20)), ["Lencana 20"])
+        stempel = (ambil_versi(VERSI_LENCANA), ambil_versi(VERSI_PERINGKAT))
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.lencana[0].syarat_poin = 30
+                self.lencana[0].save()
+                buat_siswa("siswa_baru").delete()
+                # Indeks yang dibangun ulang sebelum commit tidak boleh
+                # tersimpan dengan stempel baru
+                self.assertEqual(
+                    (ambil_versi(VERSI_LENCANA), ambil_versi(VERSI_PERINGKAT)), stempel
+                )
+        self.assertNotEqual(ambil_versi(VERSI_LENCANA), stempel[0])
+        self.assertNotEqual(ambil_versi(VERSI_PERINGKAT), stempel[1])
+        self.assertEqual(indeks_lencana.terlewati(0, 20), [])
+
+
+class PapanPeringkatTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        self.siswa = []
+        for i, poin in enumerate((30, 10, 30, 0)):
+            siswa = buat_siswa(f"siswa_{i}")
+            ProfilSiswa.objects.create(user=siswa, total_poin=poin)
+            self.siswa.append(siswa)
+        self.papan = PapanPeringkat(ttl=60)
+
+    def urutan(self):
+        return [(entri["username"], entri["peringkat"]) for entri in self.papan.teratas(10)]
+
+    def test_urutan_dan_peringkat_seri(self):
+        self.assertEqual(
+            self.urutan(), [("siswa_0", 1), ("siswa_2", 1), ("siswa_1", 3), ("siswa_3", 4)]
+        )
+        self.assertEqual(self.papan.peringkat(self.siswa[3].id)["peringkat"], 4)
+        self.assertEqual(
+            [entri["username"] for entri in self.papan.terbawah(3, kurang_dari=30)],
+            ["siswa_3", "siswa_1"],
+        )
+        self.assertEqual(
+            [entri["username"] for entri in self.papan.halaman(2, 2)], ["siswa_1", "siswa_3"]
+        )
+
+    def test_perbarui_memindahkan_posisi(self):
+        self.papan.total()
+        self.papan.perbarui(self.siswa[3], 50)
+        self.assertEqual(self.urutan()[0], ("siswa_3", 1))
+        self.assertEqual(self.papan.total(), 4)
+
+    def test_callback_tidak_berurutan_memakai_poin_terbaru(self):
+        papan_peringkat.total()
+        siswa = self.siswa[1]
+        with self.captureOnCommitCallbacks() as callbacks:
+            tambah_poin(siswa, 5)
+            tambah_poin(siswa, 5)
+        # Callback transaksi kedua berjalan lebih dulu, yang pertama menyusul
+        for callback in reversed(callbacks):
+            callback()
+        self.assertEqual(papan_peringkat.peringkat(siswa.id)["total_poin"], 20)
+
+
+class SidebarKurikulumTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, self.materi = buat_kurikulum(jumlah_subtopik=2, pertanyaan_per_kuis=0)
+
+    def test_penanda_per_pengguna(self):
+        pertama, kedua = self.materi
+        html = render_sidebar_materi(kedua.id, {pertama.id})
+        self.assertEqual(html.count(IKON_SELESAI), 1)
+        self.assertEqual(html.count(" active"), 1)
+        self.assertNotIn("__aktif_", html)
+        self.assertNotIn("<!--selesai:", html)
+
+    def test_judul_mirip_penanda_tidak_diganti(self):
+        pertama, kedua = self.materi
+        with self.captureOnCommitCallbacks(execute=True):
+            kedua.judul = f"Bab __aktif_{kedua.id}__ <!--selesai:{kedua.id}-->"
+            kedua.save()
+        html = render_sidebar_materi(kedua.id, {kedua.id})
+        self.assertIn(f"Bab __aktif_{kedua.id}__ &lt;!--selesai:{kedua.id}--&gt;", html)
+        self.assertEqual(html.count(IKON_SELESAI), 1)
+
+    def test_jumlah_query_halaman_materi_konstan(self):
+        siswa = buat_siswa()
+        ProfilSiswa.objects.create(user=siswa)
+        self.client.force_login(siswa)
+        url = f"/materi/{self.materi[0].id}/"
+        guru = User.objects.get(username="guru_uji")
+
+        for jumlah_topik in (0, 1, 10):
+            with self.subTest(topik_tambahan=jumlah_topik):
+                tumbuhkan_kurikulum(guru, siswa, jumlah_topik)
+                # Dingin: cache dan stempel kosong, indeks kurikulum (topik +
+                # subtopik) dibangun ulang. Sisanya sesi, user, subtopik aktif,
+                # progres misi, materi selesai dan profil siswa.
+                cache.clear()
+                with self.assertNumQueries(8):
+                    self.client.get(url)
+                with self.assertNumQueries(6):
+                    response = self.client.get(url)
+                self.assertEqual(
+                    response.content.count(IKON_SELESAI.encode()),
+                    UserMateriProgress.objects.filter(user=siswa).count(),
+                )
+
+    def test_stempel_kurikulum_naik_setelah_commit(self):
+        self.assertEqual(indeks_kurikulum.subtopik(self.materi[0].id)["judul"], "Materi 1")
+        stempel = ambil_versi(VERSI_KURIKULUM)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                SubTopik.objects.filter(pk=self.materi[0].pk).get().delete()
+                self.assertEqual(ambil_versi(VERSI_KURIKULUM), stempel)
+        self.assertNotEqual(ambil_versi(VERSI_KURIKULUM), stempel)
+        self.assertIsNone(indeks_kurikulum.subtopik(self.materi[0].id))
+
+
+class NavigasiKurikulumTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        guru, (self.a1, self.a2) = buat_kurikulum(jumlah_subtopik=2, pertanyaan_per_kuis=0)
+        # Urutan topik sama dengan "Ekosistem"; id memecah seri
+        topik_b = Topik.objects.create(judul="Rantai Makanan", urutan=1)
+        self.b1 = SubTopik.objects.create(topik=topik_b, judul="B1", konten="Isi", urutan=0, pembuat=guru)
+        topik_c = Topik.objects.create(judul="Siklus", urutan=2)
+        self.c1 = SubTopik.objects.create(topik=topik_c, judul="C1", konten="Isi", urutan=0, pembuat=guru)
+
+    def id_navigasi(self, subtopik):
+        return tuple(s and s["id"] for s in indeks_kurikulum.navigasi(subtopik.id))
+
+    def test_modul_pertama_dan_terakhir(self):
+        self.assertEqual(self.id_navigasi(self.a1), (None, self.a2.id))
+        self.assertEqual(self.id_navigasi(self.c1), (self.b1.id, None))
+        self.assertEqual(indeks_kurikulum.navigasi(self.c1.id + 100), (None, None))
+
+    def test_navigasi_melintasi_batas_topik(self):
+        self.assertEqual(self.id_navigasi(self.a2), (self.a1.id, self.b1.id))
+        self.assertEqual(self.id_navigasi(self.b1), (self.a2.id, self.c1.id))
+        urutan_sidebar = [
+            i for topik in indeks_kurikulum.semua_topik() for i in topik["subtopik_ids"]
+        ]
+        self.assertEqual(urutan_sidebar, [self.a1.id, self.a2.id, self.b1.id, self.c1.id])
+
+    def test_urutan_subtopik_berubah_membangun_ulang_indeks(self):
+        self.assertEqual(self.id_navigasi(self.a1), (None, self.a2.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.a1.urutan = 5
+            self.a1.save()
+        self.assertEqual(self.id_navigasi(self.a2), (None, self.a1.id))
+        self.assertEqual(self.id_navigasi(self.a1), (self.a2.id, self.b1.id))
+
+    def test_detail_hangat_tanpa_query_subtopik_untuk_navigasi(self):
+        self.client.force_login(buat_siswa())
+        url = f"/materi/{self.b1.id}/"
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as konteks:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["subtopik_sebelumnya"]["id"], self.a2.id)
+        self.assertEqual(response.context["subtopik_selanjutnya"]["id"], self.c1.id)
+        self.assertContains(response, f'href="/materi/{self.a2.id}/"')
+        self.assertContains(response, f'href="/materi/{self.c1.id}/"')
+        # Hanya get_object_or_404 subtopik aktif yang membaca tabel subtopik
+        dari_subtopik = [
+            q["sql"] for q in konteks.captured_queries if 'FROM "core_subtopik"' in q["sql"]
+        ]
+        self.assertEqual(len(dari_subtopik), 1)
+        self.assertIn(f'"core_subtopik"."id" = {self.b1.id}', dari_subtopik[0])
+
+
+def _templates_terukur():
+    return [{**settings.TEMPLATES[0], "BACKEND": "core.middleware.DjangoTemplatesTerukur"}]
+
+
+class InstrumentasiQueryTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        self.direktori = tempfile.TemporaryDirectory()
+        self.addCleanup(self.direktori.cleanup)
+        self.path_log = Path(self.direktori.name) / "query.jsonl"
+        pengaturan = override_settings(
+            EKOSPHERE_INSTRUMENTASI=True,
+            EKOSPHERE_INSTRUMENTASI_LOG=self.path_log,
+            EKOSPHERE_INSTRUMENTASI_BUFFER=2,
+            TEMPLATES=_templates_terukur(),
+        )
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+        self.siswa = buat_siswa()
+        ProfilSiswa.objects.create(user=self.siswa)
+
+    def catatan(self):
+        with open(self.path_log, encoding="utf-8") as berkas:
+            return [json.loads(baris) for baris in berkas]
+
+    def test_view_sinkron_dicatat_per_buffer(self):
+        self.client.force_login(self.siswa)
+        response = self.client.get("/progres/")
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        # Buffer 2 baris: request pertama belum ditulis
+        self.assertFalse(self.path_log.exists())
+        self.client.get("/progres/")
+        catatan = self.catatan()
+        self.assertEqual([c["url"] for c in catatan], ["progres", "progres"])
+        self.assertGreater(catatan[0]["render_ms"], 0)
+
+    async def test_view_async_ikut_dihitung(self):
+        pertanyaan = await PertanyaanArena.objects.acreate(
+            tipe="kartu_simbiosis", konten_json={"teks": "Lebah dan bunga"}
+        )
+        await self.async_client.aforce_login(self.siswa)
+        with self.settings(EKOSPHERE_INSTRUMENTASI_BUFFER=1):
+            response = await self.async_client.post(
+                "/api/arena/simpan-jawaban/",
+                {"pertanyaan_id": pertanyaan.id, "jawaban_benar": True},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        (catatan,) = self.catatan()
+        self.assertEqual(catatan["query"], int(response["X-Query-Count"]))
+
+    def test_query_saat_streaming_ikut_dicatat(self):
+        _, (subtopik,) = buat_kurikulum(pertanyaan_per_kuis=1)
+        pertanyaan = Pertanyaan.objects.get(kuis__subtopik=subtopik)
+        QuizAttemptLog.objects.bulk_create(
+            QuizAttemptLog(user=self.siswa, question=pertanyaan, is_correct=True) for _ in range(5)
+        )
+        self.client.force_login(User.objects.get(username="guru_uji"))
+        with (
+            self.settings(
+                EKOSPHERE_INSTRUMENTASI_BUFFER=1, EKOSPHERE_BUDGET_QUERY={"ekspor": {"query": 3}}
+            ),
+            mock.patch("core.ekspor.UKURAN_CHUNK", 2),
+        ):
+            response = self.client.get("/dashboard-guru/ekspor/log-kuis/")
+            self.assertTrue(response.streaming)
+            self.assertNotIn("X-Query-Count", response)
+            self.assertFalse(self.path_log.exists())
+            with self.assertLogs("core.middleware", "WARNING"):
+                isi = b"".join(response.streaming_content)
+
+        self.assertEqual(len(isi.splitlines()), 6)
+        (catatan,) = self.catatan()
+        self.assertEqual(catatan["url"], "ekspor")
+        self.assertTrue(catatan["streaming"])
+        # Sesi, user, lalu tiga chunk keyset (2 + 2 + 1 baris)
+        self.assertEqual(catatan["query"], 5)
+        self.assertEqual(list(catatan["duplikat"].values()), [2])
+        self.assertEqual(catatan["melewati_budget"], ["query 5 > 3"])
+
+    async def test_streaming_async_ikut_dicatat(self):
+        async def isi():
+            yield b"topik: "
+            yield str(await Topik.objects.acount()).encode()
+
+        async def get_response(request):
+            return StreamingHttpResponse(isi())
+
+        await sync_to_async(_pasang_pencatat_query)()
+        with self.settings(EKOSPHERE_INSTRUMENTASI_BUFFER=1):
+            middleware = InstrumentasiQueryMiddleware(get_response)
+        response = await middleware(RequestFactory().get("/aliran/"))
+        self.assertTrue(response.is_async)
+        isi = b"".join([potongan async for potongan in response.streaming_content])
+        self.assertEqual(isi, b"topik: 0")
+
+        (catatan,) = await sync_to_async(self.catatan)()
+        self.assertEqual(catatan["url"], "/aliran/")
+        self.assertTrue(catatan["streaming"])
+        self.assertEqual(catatan["query"], 1)
+
+    def test_budget_per_view_digabung_dengan_bawaan(self):
+        middleware = InstrumentasiQueryMiddleware(lambda request: None)
+        middleware.budget = {
+            "*": {"query": 20, "db_ms": 200, "duplikat": 0},
+            "progres": {"query": 5},
+        }
+        self.assertEqual(
+            middleware._budget_untuk("progres"), {"query": 5, "db_ms": 200, "duplikat": 0}
+        )
+        self.assertEqual(middleware._budget_untuk("lain")["query"], 20)
+
+
+class KompaksiLogTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, (subtopik,) = buat_kurikulum(pertanyaan_per_kuis=2)
+        self.pertanyaan = list(Pertanyaan.objects.filter(kuis__subtopik=subtopik).order_by("id"))
+        self.siswa = buat_siswa()
+        self.siswa_lain = buat_siswa("siswa_lain")
+        sekarang = timezone.now()
+        # 6 jawaban lama (3 hari berbeda) dan 2 jawaban baru per siswa
+        for siswa in (self.siswa, self.siswa_lain):
+            for i in range(8):
+                log = QuizAttemptLog.objects.create(
+                    user=siswa, question=self.pertanyaan[i % 2], is_correct=i % 3 == 0
+                )
+                umur = timedelta(days=100 + i // 2) if i < 6 else timedelta(hours=i)
+                QuizAttemptLog.objects.filter(id=log.id).update(answered_at=sekarang - umur)
+        self.batas = sekarang - timedelta(days=90)
+
+    def statistik(self):
+        return {
+            s.pertanyaan_id: (s.jumlah_percobaan, s.jumlah_salah, s.tingkat_kesalahan)
+            for s in StatistikPertanyaan.objects.all()
+        }
+
+    def test_statistik_sama_sebelum_dan_sesudah_kompaksi(self):
+        rebuild_statistik_pertanyaan()
+        sebelum = self.statistik()
+        lama = QuizAttemptLog.objects.filter(answered_at__lt=self.batas)
+        jumlah_lama, benar_lama = lama.count(), lama.filter(is_correct=True).count()
+
+        self.assertEqual(kompaksi("kuis", self.batas), jumlah_lama)
+
+        rekap = RekapHarianKuis.objects.all()
+        self.assertEqual(sum(r.jumlah for r in rekap), jumlah_lama)
+        self.assertEqual(sum(r.jumlah_benar for r in rekap), benar_lama)
+        rebuild_statistik_pertanyaan()
+        self.assertEqual(self.statistik(), sebelum)
+
+    def test_linimasa_berlanjut_ke_rekap_harian(self):
+        kompaksi("kuis", self.batas)
+        baris, kursor = [], None
+        while True:
+            halaman = halaman_riwayat("log-kuis", self.siswa.id, kursor, ukuran=3)
+            baris += halaman["baris"]
+            kursor = halaman["kursor_berikutnya"]
+            if kursor is None:
+                break
+
+        mentah = [b for b in baris if not b.get("ringkasan")]
+        ringkasan = [b for b in baris if b.get("ringkasan")]
+        self.assertEqual(len(mentah), 2)
+        self.assertEqual(baris[: len(mentah)], mentah)
+        self.assertEqual(sum(b["jumlah"] for b in ringkasan), 6)
+        self.assertEqual(len(ringkasan), RekapHarianKuis.objects.filter(user=self.siswa).count())
+        tanggal = [b["waktu"] for b in ringkasan]
+        self.assertEqual(tanggal, sorted(tanggal, reverse=True))
+
+    def test_batch_gagal_tidak_diarsipkan(self):
+        arsip = io.StringIO()
+        with mock.patch("core.kompaksi._lipat_ke_rekap", side_effect=ValueError("rusak")):
+            with self.assertRaises(ValueError):
+                kompaksi("kuis", self.batas, berkas_arsip=arsip)
+        self.assertEqual(arsip.getvalue(), "")
+        self.assertEqual(QuizAttemptLog.objects.filter(answered_at__lt=self.batas).count(), 12)
+
+        self.assertEqual(kompaksi("kuis", self.batas, ukuran_batch=5, berkas_arsip=arsip), 12)
+        ids = [json.loads(b)["id"] for b in arsip.getvalue().splitlines()]
+        self.assertEqual(len(ids), 12)
+        self.assertEqual(len(set(ids)), 12)
+
+    def test_hapus_siswa_mengurangi_statistik(self):
+        kompaksi("kuis", self.batas)
+        rebuild_statistik_pertanyaan()
+        self.siswa.delete()
+        tersisa = self.statistik()
+
+        rebuild_statistik_pertanyaan()
+        self.assertEqual(tersisa, self.statistik())
+
+
+class RencanaQueryTest(UjiEkoSphere):
+    """
+    Versi kecil `cek_query_plan`: setiap skenario route di benchmark_views
+    dijalankan pada fixture mini dan rencana query pada tabel yang tumbuh
+    bersama jumlah siswa tidak boleh berupa full scan atau temp B-tree.
+    """
+
+    TABEL_BESAR = {
+        "core_user",
+        "core_profilsiswa",
+        "core_hasilkuis",
+        "core_jawabansiswa",
+        "core_quizattemptlog",
+        "core_usermateriprogress",
+        "core_rekaphariankuis",
+        "core_rekapharianarena",
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.guru, (subtopik,) = buat_kurikulum()
+        self.siswa = buat_siswa()
+        ProfilSiswa.objects.create(user=self.siswa)
+        arena = PertanyaanArena.objects.create(
+            tipe="kartu_simbiosis",
+            konten_json={"soal": "Lebah dan Bunga", "jawaban_benar": "Mutualisme", "pilihan": ["Mutualisme"]},
+        )
+        PertanyaanArena.objects.create(tipe="klasifikasi", konten_json={"items": []})
+        PertanyaanArena.objects.create(tipe="cerita_predator", konten_json={"judul": "Jejak"})
+        pertanyaan = Pertanyaan.objects.filter(kuis__subtopik=subtopik).first()
+        QuizAttemptLog.objects.create(user=self.siswa, question=pertanyaan, is_correct=True)
+        HasilKuis.objects.create(siswa=self.siswa, kuis=subtopik.kuis, skor=100)
+        JawabanSiswa.objects.create(siswa=self.siswa, pertanyaan=arena, jawaban_benar=True)
+        UserMateriProgress.objects.create(user=self.siswa, materi=subtopik)
+
+    def test_rencana_query_semua_route(self):
+        diizinkan = [re.compile(pola) for pola in settings.EKOSPHERE_QUERY_PLAN_DIIZINKAN]
+        diuji, gagal = set(), {}
+        for nama, client, skenario, url, data in daftar_skenario(self.siswa, self.guru):
+            if client is None:
+                continue
+            with CaptureQueriesContext(connection) as konteks:
+                response = kirim_skenario(client, skenario, url, data)
+            self.assertLess(response.status_code, 400, nama)
+            diuji.add(nama.split(" #")[0])
+            for sidik_jari, _, pelanggaran in periksa_query(
+                konteks.captured_queries, self.TABEL_BESAR, diizinkan
+            ):
+                if pelanggaran:
+                    gagal.setdefault(nama, []).append((sidik_jari, pelanggaran))
+
+        self.assertEqual(gagal, {})
+        self.assertTrue({"ekspor", "perbarui_snapshot_kelas", "kuis"} <= diuji)
+
+    def test_indeks_pola_akses_ada(self):
+        with connection.cursor() as cursor:
+            indeks = {
+                nama
+                for tabel in self.TABEL_BESAR
+                for nama in connection.introspection.get_constraints(cursor, tabel)
+            }
+        self.assertTrue(
+            {
+                "attemptlog_user_waktu",
+                "attemptlog_benar_soal",
+                "hasilkuis_siswa_waktu",
+                "jawabansiswa_siswa_waktu",
+                "user_role_login",
+                "rekapkuis_user_tanggal",
+                "rekaparena_siswa_tanggal",
+            }
+            <= indeks
+        )
+
+
+@override_settings(EKOSPHERE_SQLITE_PRODUKSI=True)
+class TransaksiTulisTest(TransactionTestCase):
+    def test_begin_immediate_hanya_untuk_transaksi_tulis(self):
+        @transaksi_tulis
+        def tulis():
+            return Topik.objects.create(judul="Ekosistem", urutan=1)
+
+        with CaptureQueriesContext(connection) as konteks:
+            tulis()
+            with transaction.atomic():
+                Topik.objects.count()
+
+        begin = [q["sql"] for q in konteks.captured_queries if q["sql"].startswith("BEGIN")]
+        self.assertEqual(begin, ["BEGIN IMMEDIATE", "BEGIN"])
+        self.assertIsNone(connection.transaction_mode)
+
+    def test_penulis_serentak_tanpa_database_terkunci(self):
+        self.assertNotIn(":memory:", str(connection.settings_dict["NAME"]))
+        jumlah_thread, tulisan_per_thread = 20, 10
+        gerbang = threading.Barrier(jumlah_thread)
+        galat = []
+
+        @transaksi_tulis
+        def tulis(nomor, ke):
+            # Baca lalu tulis dalam satu transaksi, seperti jalur penilaian kuis
+            urutan = Topik.objects.count()
+            Topik.objects.create(judul=f"Topik {nomor}-{ke}", urutan=urutan)
+
+        def kerja(nomor):
+            try:
+                gerbang.wait()
+                for ke in range(tulisan_per_thread):
+                    tulis(nomor, ke)
+            except OperationalError as exc:
+                galat.append(exc)
+            finally:
+                connections.close_all()
+
+        thread = [threading.Thread(target=kerja, args=(nomor,)) for nomor in range(jumlah_thread)]
+        for t in thread:
+            t.start()
+        for t in thread:
+            t.join()
+
+        self.assertEqual(galat, [])
+        self.assertEqual(Topik.objects.count(), jumlah_thread * tulisan_per_thread)
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+
+    @mock.patch("core.basisdata.time.sleep")
+    def test_kompaksi_batch_memakai_transaksi_tulis(self, tidur):
+        _, (subtopik,) = buat_kurikulum(pertanyaan_per_kuis=1)
+        pertanyaan = Pertanyaan.objects.get(kuis__subtopik=subtopik)
+        siswa = buat_siswa()
+        lama = timezone.now() - timedelta(days=100)
+        for _ in range(4):
+            log = QuizAttemptLog.objects.create(user=siswa, question=pertanyaan, is_correct=True)
+            QuizAttemptLog.objects.filter(id=log.id).update(answered_at=lama)
+
+        lipat_asli = kompaksi_modul._lipat_ke_rekap
+        panggilan = []
+
+        def lipat(spek, baris):
+            panggilan.append(len(baris))
+            # Batch kedua terkunci sekali, lalu diulang oleh transaksi_tulis
+            if len(panggilan) == 2:
+                raise OperationalError("database is locked")
+            lipat_asli(spek, baris)
+
+        arsip = io.StringIO()
+        with (
+            mock.patch("core.kompaksi._lipat_ke_rekap", side_effect=lipat),
+            self.assertLogs("core.basisdata", "WARNING"),
+            CaptureQueriesContext(connection) as konteks,
+        ):
+            jumlah = kompaksi("kuis", timezone.now(), ukuran_batch=2, berkas_arsip=arsip)
+
+        self.assertEqual(jumlah, 4)
+        self.assertEqual(panggilan, [2, 2, 2])
+        begin = [q["sql"] for q in konteks.captured_queries if q["sql"].startswith("BEGIN")]
+        self.assertEqual(begin, ["BEGIN IMMEDIATE"] * 4)
+        ids = [json.loads(b)["id"] for b in arsip.getvalue().splitlines()]
+        self.assertEqual(sorted(ids), sorted(set(ids)))
+        self.assertEqual(len(ids), 4)
+        self.assertFalse(QuizAttemptLog.objects.exists())
+        self.assertEqual(sum(RekapHarianKuis.objects.values_list("jumlah", flat=True)), 4)
+
+    @mock.patch("core.basisdata.time.sleep")
+    def test_database_terkunci_diulang_lalu_berhasil(self, tidur):
+        fungsi = mock.Mock(
+            side_effect=[OperationalError("database is locked")] * 2 + ["ok"], __qualname__="tulis"
+        )
+        with self.assertLogs("core.basisdata", "WARNING") as log:
+            self.assertEqual(transaksi_tulis(fungsi)(), "ok")
+        self.assertEqual(fungsi.call_count, 3)
+        self.assertEqual(tidur.call_count, 2)
+        self.assertEqual(len(log.records), 2)
+
+    @override_settings(EKOSPHERE_RETRY_TULIS={"percobaan": 3, "jeda_awal": 0.01})
+    @mock.patch("core.basisdata.time.sleep")
+    def test_database_terkunci_dilempar_setelah_percobaan_habis(self, tidur):
+        fungsi = mock.Mock(side_effect=OperationalError("database is locked"), __qualname__="tulis")
+        with self.assertLogs("core.basisdata", "WARNING"):
+            with self.assertRaisesMessage(OperationalError, "database is locked"):
+                transaksi_tulis(fungsi)()
+        self.assertEqual(fungsi.call_count, 3)
+        self.assertEqual(tidur.call_count, 2)
+
+    @mock.patch("core.basisdata.time.sleep")
+    def test_error_lain_tidak_diulang(self, tidur):
+        fungsi = mock.Mock(side_effect=OperationalError("no such table: x"), __qualname__="tulis")
+        with self.assertRaises(OperationalError):
+            transaksi_tulis(fungsi)()
+        self.assertEqual(fungsi.call_count, 1)
+        tidur.assert_not_called()
+
+
+class SimpanJawabanArenaTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        self.siswa = buat_siswa()
+        self.pertanyaan = PertanyaanArena.objects.create(
+            tipe="kartu_simbiosis", konten_json={"soal": "Lebah dan Bunga"}
+        )
+        self.client.force_login(self.siswa)
+
+    def kirim(self, body):
+        return self.client.post("/api/arena/simpan-jawaban/", body, content_type="application/json")
+
+    def test_jawaban_benar_menambah_poin(self):
+        response = self.kirim({"pertanyaan_id": self.pertanyaan.id, "jawaban_benar": True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_poin_baru"], 10)
+
+    def test_body_tidak_valid_400(self):
+        for body in ("bukan json", "[1, 2]", {"pertanyaan_id": "x"}, {"pertanyaan_id": [1]}, {}):
+            with self.subTest(body=body):
+                response = self.kirim(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["status"], "gagal")
+        self.assertFalse(JawabanSiswa.objects.exists())
+
+    def test_pertanyaan_tidak_ada_404(self):
+        response = self.kirim({"pertanyaan_id": self.pertanyaan.id + 1, "jawaban_benar": True})
+        self.assertEqual(response.status_code, 404)
+
+
+class PoolArenaTest(UjiEkoSphere):
+    def test_konten_bukan_objek_dilewati(self):
+        rusak = PertanyaanArena.objects.create(tipe="kartu_simbiosis", konten_json=["bukan", "objek"])
+        baik = PertanyaanArena.objects.create(tipe="kartu_simbiosis", konten_json={"soal": "Lebah"})
+        with self.assertLogs("core.arena", "WARNING"):
+            pool = pool_arena.pool("kartu_simbiosis")
+        self.assertEqual(pool["pertama_id"], baik.id)
+        self.assertEqual(json.loads(pool["daftar"]), [{"soal": "Lebah", "id": baik.id}])
+        self.assertNotEqual(pool["pertama_id"], rusak.id)
+
+    def test_stempel_arena_naik_setelah_commit(self):
+        versi_awal = ambil_versi(VERSI_ARENA)
+        with self.captureOnCommitCallbacks(execute=True):
+            PertanyaanArena.objects.create(tipe="klasifikasi", konten_json={"items": []})
+            self.assertEqual(ambil_versi(VERSI_ARENA), versi_awal)
+        self.assertNotEqual(ambil_versi(VERSI_ARENA), versi_awal)
+        self.assertIsNotNone(pool_arena.pool("klasifikasi"))
+
+
+class EtagMateriTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, (self.materi,) = buat_kurikulum()
+        self.client.force_login(buat_siswa())
+        self.url = f"/materi/{self.materi.pk}/"
+
+    def test_etag_pertama_langsung_tervalidasi(self):
+        pertama = self.client.get(self.url)
+        self.assertEqual(pertama.status_code, 200)
+        self.assertIn(settings.CSRF_COOKIE_NAME, pertama.cookies)
+
+        kedua = self.client.get(self.url, headers={"if-none-match": pertama["ETag"]})
+        self.assertEqual(kedua.status_code, 304)
+
+    def test_rahasia_csrf_baru_mengubah_etag(self):
+        pertama = self.client.get(self.url)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "a" * 32
+        response = self.client.get(self.url, headers={"if-none-match": pertama["ETag"]})
+        self.assertEqual(response.status_code, 200)
+
+
+class RotasiInfoEkosistemTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            InfoEkosistem.objects.create(
+                nama=f"Penghuni {i}", deskripsi_singkat="-", gambar_url="https://x.id/a.png", kategori="Fauna"
+            )
+
+    def test_satu_putaran_tanpa_pengulangan_dan_tulis_hanya_di_awal(self):
+        with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            putaran = [info.id for _ in range(3) for info in sampler_info.sampel(2, user_id=1)]
+            self.assertEqual(set_many.call_count, 1)
+            self.assertEqual(len(set(putaran)), 6)
+            sampler_info.sampel(2, user_id=1)
+            self.assertEqual(set_many.call_count, 2)
+
+    def test_stempel_info_naik_setelah_commit(self):
+        versi_awal = ambil_versi(VERSI_INFO)
+        with self.captureOnCommitCallbacks(execute=True):
+            InfoEkosistem.objects.filter(nama="Penghuni 0").get().delete()
+            self.assertEqual(ambil_versi(VERSI_INFO), versi_awal)
+        self.assertNotEqual(ambil_versi(VERSI_INFO), versi_awal)
+        self.assertEqual(len(sampler_info.sampel(10)), 5)
+
+
+class DashboardSiswaTest(UjiEkoSphere):
+    def test_jumlah_query_dashboard_konstan(self):
+        guru, _ = buat_kurikulum(pertanyaan_per_kuis=0)
+        siswa = buat_siswa()
+        ProfilSiswa.objects.create(user=siswa)
+        self.client.force_login(siswa)
+        for jumlah_topik in (0, 1, 10):
+            with self.subTest(topik_tambahan=jumlah_topik):
+                tumbuhkan_kurikulum(guru, siswa, jumlah_topik)
+                # Dingin: sesi, user, snapshot siswa (profil, hasil kuis, lencana
+                # dimiliki), indeks lencana, indeks kurikulum (2), pool info
+                # ekosistem dan papan peringkat
+                cache.clear()
+                with self.assertNumQueries(10):
+                    self.client.get("/")
+                # Hangat: hanya sesi dan user
+                with self.assertNumQueries(2):
+                    response = self.client.get("/")
+                jumlah_hasil = HasilKuis.objects.filter(siswa=siswa).count()
+                self.assertEqual(len(response.context["hasil_kuis_list"]), jumlah_hasil)
+                self.assertEqual(len(response.context["daftar_materi"]), SubTopik.objects.count())
+
+
+class ProfilLazyTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        self.siswa = buat_siswa()
+        self.profil = ProfilSiswa.objects.create(user=self.siswa, total_poin=30)
+        PertanyaanArena.objects.create(tipe="cerita_predator", konten_json={"cerita": "Elang"})
+        self.client.force_login(self.siswa)
+
+    def query_profil(self, konteks):
+        return [q for q in konteks.captured_queries if 'FROM "core_profilsiswa"' in q["sql"]]
+
+    def test_profil_diambil_sekali_dan_dipakai_bersama(self):
+        url = "/arena/jejak-predator/"
+        self.client.get(url)
+        # Sesi, user, lalu profil sekali untuk view dan navbar (context processor)
+        with self.assertNumQueries(3), CaptureQueriesContext(connection) as konteks:
+            response = self.client.get(url)
+        self.assertEqual(len(self.query_profil(konteks)), 1)
+        self.assertIs(response.context["profil_siswa"], response.wsgi_request._profil_siswa_cache)
+        self.assertContains(response, "30 Poin")
+
+    def test_json_tanpa_query_profil(self):
+        url = "/api/papan-peringkat/"
+        self.client.get(url)
+        with self.assertNumQueries(2), CaptureQueriesContext(connection) as konteks:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.query_profil(konteks), [])
+
+    def test_jumlah_lencana_mengikuti_m2m(self):
+        perunggu = Lencana.objects.create(nama="Perunggu", deskripsi="-", syarat_poin=10)
+        perak = Lencana.objects.create(nama="Perak", deskripsi="-", syarat_poin=20)
+        profil_lain = ProfilSiswa.objects.create(user=buat_siswa("siswa_lain"))
+
+        def jumlah():
+            return dict(ProfilSiswa.objects.values_list("id", "jumlah_lencana"))
+
+        self.profil.lencana.add(perunggu, perak)
+        self.assertEqual(jumlah(), {self.profil.id: 2, profil_lain.id: 0})
+        self.profil.lencana.remove(perunggu)
+        self.assertEqual(jumlah(), {self.profil.id: 1, profil_lain.id: 0})
+        # Arah sebaliknya (dari sisi lencana)
+        perak.profilsiswa_set.add(profil_lain)
+        self.assertEqual(jumlah(), {self.profil.id: 1, profil_lain.id: 1})
+        perak.profilsiswa_set.remove(self.profil)
+        self.assertEqual(jumlah(), {self.profil.id: 0, profil_lain.id: 1})
+        perak.profilsiswa_set.clear()
+        self.assertEqual(jumlah(), {self.profil.id: 0, profil_lain.id: 0})
+
+
+class SnapshotKelasDashboardTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        self.guru, _ = buat_kurikulum()
+        self.client.force_login(self.guru)
+
+    def test_snapshot_basi_ditampilkan_tanpa_dihitung_ulang(self):
+        snapshot = buat_snapshot_kelas()
+        SnapshotKelas.objects.filter(id=snapshot.id).update(
+            dibuat_pada=timezone.now() - timedelta(hours=2)
+        )
+        response = self.client.get("/dashboard-guru/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["snapshot_basi"])
+        self.assertEqual(SnapshotKelas.objects.count(), 1)
+
+    def test_dashboard_pertama_membuat_snapshot(self):
+        self.client.get("/dashboard-guru/")
+        self.assertEqual(SnapshotKelas.objects.count(), 1)
+
+    def test_perbarui_terlalu_cepat_memberi_pesan(self):
+        buat_snapshot_kelas()
+        response = self.client.post("/dashboard-guru/perbarui/", follow=True)
+        self.assertEqual(SnapshotKelas.objects.count(), 1)
+        (pesan,) = response.context["messages"]
+        self.assertIn("tidak dihitung ulang", str(pesan))
+        self.assertContains(response, "tidak dihitung ulang")
+
+    def test_perbarui_membuat_snapshot_baru(self):
+        snapshot = buat_snapshot_kelas()
+        SnapshotKelas.objects.filter(id=snapshot.id).update(
+            dibuat_pada=timezone.now() - timedelta(minutes=5)
+        )
+        response = self.client.post("/dashboard-guru/perbarui/", follow=True)
+        self.assertEqual(SnapshotKelas.objects.count(), 2)
+        self.assertEqual(list(response.context["messages"]), [])
+
+
+class EksporTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, (subtopik,) = buat_kurikulum()
+        self.kuis = subtopik.kuis
+        self.pertanyaan = Pertanyaan.objects.filter(kuis=self.kuis).first()
+
+    def baca_csv(self, jenis, parameter=None):
+        isi = "".join(alirkan_ekspor(jenis, queryset_ekspor(jenis, parameter or {})))
+        return list(csv.reader(io.StringIO(isi)))
+
+    def test_sel_berawalan_rumus_diberi_kutip(self):
+        for i, username in enumerate(["=HYPERLINK(1)", "+62812", "-1", "@SUM", "biasa"]):
+            siswa = buat_siswa(username)
+            HasilKuis.objects.create(siswa=siswa, kuis=self.kuis, skor=i)
+
+        baris = self.baca_csv("hasil-kuis")
+        username = [b[2] for b in baris[1:]]
+        self.assertEqual(username, ["'=HYPERLINK(1)", "'+62812", "'-1", "'@SUM", "biasa"])
+        # Angka tidak diubah, dan NDJSON tetap memuat nilai asli
+        self.assertEqual(baris[1][5], "0.0")
+        ndjson = "".join(alirkan_ekspor("hasil-kuis", queryset_ekspor("hasil-kuis", {}), "ndjson"))
+        self.assertEqual(json.loads(ndjson.splitlines()[0])["username"], "=HYPERLINK(1)")
+
+    def test_chunk_dibaca_dengan_keyset(self):
+        siswa = buat_siswa()
+        QuizAttemptLog.objects.bulk_create(
+            QuizAttemptLog(user=siswa, question=self.pertanyaan, is_correct=i % 2 == 0)
+            for i in range(5)
+        )
+        with mock.patch("core.ekspor.UKURAN_CHUNK", 2), CaptureQueriesContext(connection) as konteks:
+            baris = self.baca_csv("log-kuis")
+
+        ids = [int(b[0]) for b in baris[1:]]
+        self.assertEqual(ids, sorted(QuizAttemptLog.objects.values_list("id", flat=True)))
+        # Tiga SELECT terpisah (2 + 2 + 1 baris), chunk berikutnya lewat id > terakhir
+        self.assertEqual(len(konteks.captured_queries), 3)
+        self.assertIn(f'"id" > {ids[1]}', konteks.captured_queries[1]["sql"])
+
+
+class KurikulumJsonTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        self.guru, _ = buat_kurikulum(pertanyaan_per_kuis=2)
+        PertanyaanArena.objects.create(tipe="klasifikasi", konten_json={"soal": "Lumut"})
+        InfoEkosistem.objects.create(
+            nama="Elang", deskripsi_singkat="Predator", gambar_url="https://contoh.id/e.png",
+            kategori="Fauna",
+        )
+        self.data = ekspor_kurikulum()
+
+    def jumlah_baris(self):
+        return [
+            model.objects.count()
+            for model in (Topik, SubTopik, Kuis, Pertanyaan, PilihanJawaban, PertanyaanArena, InfoEkosistem)
+        ]
+
+    def test_impor_ulang_tidak_mengubah_apa_pun(self):
+        sebelum = self.jumlah_baris()
+        ringkasan, perubahan = impor_kurikulum(self.data, self.guru)
+        self.assertEqual(perubahan, [])
+        self.assertTrue(all(j["baru"] == j["diubah"] == 0 for j in ringkasan.values()))
+        self.assertEqual(self.jumlah_baris(), sebelum)
+
+    def test_perubahan_dilaporkan_dan_disimpan(self):
+        subtopik = self.data["topik"][0]["subtopik"][0]
+        subtopik["konten"] = "Isi baru"
+        subtopik["kuis"]["pertanyaan"].append(
+            {"teks_pertanyaan": "Soal baru", "pilihan": [{"teks_jawaban": "Ya", "is_benar": True}]}
+        )
+        ringkasan, perubahan = impor_kurikulum(self.data, self.guru)
+
+        self.assertEqual(ringkasan["SubTopik"]["diubah"], 1)
+        self.assertEqual(ringkasan["Pertanyaan"]["baru"], 1)
+        self.assertIn("+ Pertanyaan", "\n".join(perubahan))
+        self.assertEqual(SubTopik.objects.get().konten, "Isi baru")
+        self.assertTrue(Pertanyaan.objects.filter(teks_pertanyaan="Soal baru").exists())
+
+    def test_dry_run_dibatalkan(self):
+        self.data["topik"].append({"judul": "Topik baru", "urutan": 2, "subtopik": []})
+        sebelum = self.jumlah_baris()
+        ringkasan, _ = impor_kurikulum(self.data, self.guru, dry_run=True)
+        self.assertEqual(ringkasan["Topik"]["baru"], 1)
+        self.assertEqual(self.jumlah_baris(), sebelum)
+
+    def test_kunci_alami_ganda_di_database_ditolak(self):
+        Topik.objects.create(judul="Ekosistem", urutan=5)
+        with self.assertRaisesMessage(KunciAlamiGanda, "'Ekosistem'"):
+            impor_kurikulum(self.data, self.guru)
+
+    def test_perintah_ekspor_menulis_ke_stdout(self):
+        keluaran = io.StringIO()
+        call_command("ekspor_kurikulum", stdout=keluaran)
+        self.assertEqual(json.loads(keluaran.getvalue()), self.data)
+
+
+@override_settings(
+    EKOSPHERE_ROSTER_VALIDATOR_PASSWORD=[
+        {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
+        {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
+    ],
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class RosterTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        sementara = tempfile.TemporaryDirectory()
+        self.addCleanup(sementara.cleanup)
+        self.direktori = Path(sementara.name)
+
+    def roster(self, *baris):
+        return io.StringIO(
+            "username,password,first_name,last_name,email\n" + "".join(b + "\n" for b in baris)
+        )
+
+    def test_baris_divalidasi_seperti_pendaftaran(self):
+        with self.assertRaises(RosterTidakValid) as konteks:
+            baca_roster(
+                self.roster(
+                    "andi,pendek1,,,",
+                    "budi,budi_santoso,Budi,Santoso,",
+                    f"{'c' * 151},RahasiaKuat#1,,,",
+                    "dewi,RahasiaKuat#2,,,bukan-email",
+                    "eko,RahasiaKuat#3,,,eko@sekolah.id",
+                )
+            )
+        kesalahan = konteks.exception.kesalahan
+        self.assertEqual([k.split(":")[0] for k in kesalahan], ["Baris 2", "Baris 3", "Baris 4", "Baris 5"])
+        self.assertIn("password ditolak", kesalahan[0])
+        self.assertIn("username lebih dari 150 karakter", kesalahan[2])
+        self.assertIn("email", kesalahan[3])
+        # Pesan kesalahan tidak pernah memuat password
+        self.assertFalse(any("pendek1" in k or "budi_santoso" in k for k in kesalahan))
+
+    def test_password_kosong_tidak_divalidasi(self):
+        (data,) = baca_roster(self.roster("andi,,,,"))
+        self.assertTrue(data["password_dibuat"])
+
+    def test_kredensial_ditulis_sebelum_akun_disimpan(self):
+        berkas = self.direktori / "roster.csv"
+        berkas.write_text("username,password\nandi,\nbudi,RahasiaKuat#1\n", encoding="utf-8")
+        kredensial = self.direktori / "kredensial.csv"
+
+        with mock.patch(
+            "core.management.commands.impor_roster.simpan_roster", side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            call_command("impor_roster", str(berkas), kredensial=str(kredensial), proses=1, stdout=io.StringIO())
+        # Gagal menyimpan: tidak ada berkas kredensial maupun berkas sementara
+        self.assertEqual(sorted(p.name for p in self.direktori.iterdir()), ["roster.csv"])
+
+        call_command("impor_roster", str(berkas), kredensial=str(kredensial), proses=1, stdout=io.StringIO())
+        self.assertEqual(kredensial.stat().st_mode & 0o777, 0o600)
+        (baris,) = list(csv.DictReader(kredensial.open(encoding="utf-8")))
+        self.assertEqual(baris["username"], "andi")
+        self.assertTrue(User.objects.get(username="andi").check_password(baris["password"]))
+        self.assertEqual(User.objects.filter(role="Siswa").count(), 2)
+
+
+class FeedRiwayatTest(UjiEkoSphere):
+    def setUp(self):
+        super().setUp()
+        _, (subtopik,) = buat_kurikulum(pertanyaan_per_kuis=2)
+        pertanyaan = list(Pertanyaan.objects.filter(kuis__subtopik=subtopik))
+        self.siswa = buat_siswa()
+        self.client.force_login(self.siswa)
+        log = QuizAttemptLog.objects.bulk_create(
+            QuizAttemptLog(user=self.siswa, question=pertanyaan[i % 2], is_correct=True)
+            for i in range(7)
+        )
+        # Beberapa baris berwaktu sama agar urutan id ikut diuji
+        sekarang = timezone.now()
+        for i, baris in enumerate(log):
+            QuizAttemptLog.objects.filter(id=baris.id).update(
+                answered_at=sekarang - timedelta(minutes=i // 2)
+            )
+        self.url = "/progres/riwayat/log-kuis/"
+
+    def test_halaman_mencakup_semua_baris_tanpa_duplikat(self):
+        ids, kursor = [], None
+        while True:
+            parameter = {"ukuran": 3, **({"kursor": kursor} if kursor else {})}
+            data = self.client.get(self.url, parameter).json()
+            self.assertLessEqual(len(data["baris"]), 3)
+            ids += [baris["id"] for baris in data["baris"]]
+            kursor = data["kursor_berikutnya"]
+            if kursor is None:
+                break
+        diharapkan = list(
+            QuizAttemptLog.objects.filter(user=self.siswa)
+            .order_by("-answered_at", "id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, diharapkan)
+
+    def test_kursor_rusak_ditolak(self):
+        for kursor in ("!!!", "YWJj", "cmVrYXB8a2VtYXJpbnwx"):
+            response = self.client.get(self.url, {"kursor": kursor})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {"error": "Kursor halaman tidak valid"})
+
+    def test_ukuran_bukan_angka_ditolak_dengan_pesan_tetap(self):
+        response = self.client.get(self.url, {"ukuran": "1e3'--"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Parameter ukuran harus berupa angka"})
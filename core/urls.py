@@ -29,6 +29,12 @@ urlpatterns = [
         views.api_rantai_makanan_view,
         name="api_rantai_makanan",
     ),
+    # URL UNTUK PAPAN PERINGKAT (JSON, mendukung ?halaman=&ukuran=)
+    path(
+        "api/papan-peringkat/",
+        views.api_papan_peringkat_view,
+        name="api_papan_peringkat",
+    ),
     # URL BARU UNTUK ARENA
     path("arena/duel-simbiosis/", views.duel_simbiosis_view, name="duel_simbiosis"),
     # URL BARU UNTUK MENYIMPAN JAWABAN ARENA
@@ -41,14 +47,26 @@ urlpatterns = [
     path("arena/jejak-predator/", views.jejak_predator_view, name="jejak_predator"),
     # URL BARU UNTUK HALAMAN PROGRES SISWA
     path("progres/", views.progres_view, name="progres"),
+    # Feed JSON riwayat (keyset pagination): ?kursor=&ukuran=
+    path("progres/riwayat/<slug:jenis>/", views.riwayat_progres_view, name="riwayat_progres"),
 
     # --- URL BARU UNTUK DASHBOARD GURU DITAMBAHKAN DI SINI ---
     
     # URL untuk Dashboard Guru
     path('dashboard-guru/', views.teacher_dashboard_view, name='teacher_dashboard'),
+    # Memperbarui snapshot KPI kelas sesuai permintaan (POST)
+    path('dashboard-guru/perbarui/', views.perbarui_snapshot_kelas_view, name='perbarui_snapshot_kelas'),
     
+    # Ekspor data penilaian (streaming): ?format=csv|ndjson&dari=&sampai=&kuis=&siswa=
+    path('dashboard-guru/ekspor/<slug:jenis>/', views.ekspor_view, name='ekspor'),
+
     # URL untuk melihat detail progres siswa (INTERAKTIF)
     path('detail-siswa/<int:user_id>/', views.detail_siswa_view, name='detail_siswa'),
+    path(
+        'detail-siswa/<int:user_id>/riwayat/<slug:jenis>/',
+        views.riwayat_detail_siswa_view,
+        name='riwayat_detail_siswa',
+    ),
 
     # --- TAMBAHKAN URL INI ---
     path('materi/selesai/<int:pk>/', views.tandai_materi_selesai_view, name='tandai_materi_selesai'),
@@ -0,0 +1,72 @@
+# core/versi.py
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Nama-nama stempel versi konten
+VERSI_KUIS = "kuis"
+VERSI_LENCANA = "lencana"
+VERSI_PERINGKAT = "peringkat"
+VERSI_KURIKULUM = "kurikulum"
+VERSI_ARENA = "arena"
+VERSI_INFO = "info_ekosistem"
+
+
+def _kunci(nama):
+    return f"ekosphere:versi:{nama}"
+
+
+def _ttl():
+    return getattr(settings, "EKOSPHERE_VERSI_TTL", None)
+
+
+def ambil_versi(nama):
+    """
+    Mengembalikan stempel versi saat ini. Stempel awal diambil dari waktu
+    sekarang (nanodetik), sehingga jika entri cache hilang, versi baru tidak
+    akan pernah bertabrakan dengan versi lama yang masih tersimpan di memori.
+    Pada cache per proses stempel diberi umur EKOSPHERE_VERSI_TTL, jadi
+    perubahan dari proses lain tetap terlihat setelah stempelnya diperbarui.
+    """
+    versi = cache.get(_kunci(nama))
+    if versi is None:
+        cache.add(_kunci(nama), time.time_ns(), timeout=_ttl())
+        versi = cache.get(_kunci(nama))
+    return versi
+
+
+def naikkan_versi(nama):
+    """Menandai bahwa konten `nama` berubah; semua cache turunannya jadi basi."""
+    try:
+        return cache.incr(_kunci(nama))
+    except ValueError:
+        # Entri belum ada (atau sudah tergusur), buat stempel baru
+        versi = time.time_ns()
+        cache.set(_kunci(nama), versi, timeout=_ttl())
+        return versi
+
+
+def naikkan_versi_setelah_commit(nama):
+    """
+    Seperti naikkan_versi, tetapi menunggu transaksi berjalan di-commit.
+    Jika stempel dinaikkan lebih dulu, pembaca lain bisa membaca data lama
+    dan menyimpannya di cache dengan stempel yang baru. Di luar transaksi
+    stempel langsung dinaikkan.
+    """
+    transaction.on_commit(lambda: naikkan_versi(nama))
+
+
+def versi_siswa(user_id):
+    """Nama stempel data milik satu pengguna (progres, hasil kuis, poin, lencana)."""
+    return f"siswa:{user_id}"
+
+
+def naikkan_versi_siswa(user_id):
+    """
+    Menaikkan stempel data pengguna setelah transaksi berjalan di-commit,
+    agar pembaca lain tidak memasangkan stempel baru dengan data lama.
+    """
+    transaction.on_commit(lambda: naikkan_versi(versi_siswa(user_id)))
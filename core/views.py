@@ -1,32 +1,66 @@
 # core/views.py
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Count, Q, Avg
 from django.utils import timezone
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 import json
 from django.utils.safestring import mark_safe
 from .forms import CustomUserCreationForm
 from django.contrib import messages  # <--- PASTIKAN INI ADA
+from .penilaian import nilai_kuis, jawaban_dari_form
+from .lencana import berikan_lencana
+from .poin import tambah_poin, POIN_JAWABAN_ARENA
+from .papan_peringkat import papan_peringkat, konteks_papan_peringkat
+from .kurikulum import indeks_kurikulum, render_sidebar_materi
+from .profil import ambil_profil_siswa
+from .basisdata import transaksi_tulis
+from .arena import pool_arena
+from .info_ekosistem import sampler_info
+from .snapshot_siswa import snapshot_siswa
+from .ekspor import (
+    FORMAT_EKSPOR,
+    SPESIFIKASI_EKSPOR,
+    FilterEksporTidakValid,
+    alirkan_ekspor,
+    queryset_ekspor,
+)
+from .riwayat import (
+    SPESIFIKASI_RIWAYAT,
+    UKURAN_HALAMAN,
+    KursorTidakValid,
+    halaman_riwayat,
+)
+from .analitik_kelas import (
+    perbarui_snapshot_kelas,
+    snapshot_basi,
+    snapshot_kelas_terbaru,
+    snapshot_untuk_dashboard,
+    umur_teks,
+)
+from .kondisional import (
+    CACHE_CONTROL_PRIVAT,
+    CACHE_CONTROL_PUBLIK,
+    etag_arena,
+    etag_materi,
+    etag_statis,
+)
 
 # --- Model-model yang diimpor ---
 from .models import (
     User,
-    Topik,
     SubTopik,  # Ini adalah model 'Materi' Anda
-    Kuis,
-    Pertanyaan,  # Ini adalah model 'Question' Anda
-    PilihanJawaban,  # Ditambahkan untuk kuis_view
     HasilKuis,
     ProfilSiswa,  # Ini adalah model 'Profile' Anda
     Lencana,
     PertanyaanArena,
     JawabanSiswa,
-    InfoEkosistem,
     UserMateriProgress,
-    QuizAttemptLog,
 )
 
 
@@ -49,32 +83,13 @@ def dashboard_view(request):
         return redirect("teacher_dashboard")
 
     elif request.user.role == "Siswa":
-        # Logika dashboard siswa (tidak berubah)
-        profil_siswa, created = ProfilSiswa.objects.get_or_create(user=request.user)
-        hasil_kuis_siswa = HasilKuis.objects.filter(siswa=request.user)
-        semua_subtopik = SubTopik.objects.all()
-        completed_quiz_ids = set(hasil_kuis_siswa.values_list("kuis_id", flat=True))
-        lencana_selanjutnya = (
-            Lencana.objects.exclude(id__in=profil_siswa.lencana.all())
-            .order_by("syarat_poin")
-            .first()
-        )
-        progres_persen = 0
-        if lencana_selanjutnya and lencana_selanjutnya.syarat_poin > 0:
-            progres_persen = (
-                profil_siswa.total_poin / lencana_selanjutnya.syarat_poin
-            ) * 100
-            if progres_persen > 100:
-                progres_persen = 100
-        info_items = InfoEkosistem.objects.order_by("?")[:3]
+        # Data dashboard dari snapshot per siswa yang di-cache (core.snapshot_siswa);
+        # papan peringkat dan kartu info tetap diambil segar setiap request
         context = {
-            "daftar_materi": semua_subtopik,
-            "profil_siswa": profil_siswa,
-            "hasil_kuis_list": hasil_kuis_siswa,
-            "completed_quiz_ids": completed_quiz_ids,
-            "lencana_selanjutnya": lencana_selanjutnya,
-            "progres_persen": progres_persen,
-            "info_items": info_items,
+            **snapshot_siswa(request.user),
+            # Sampel acak tanpa ORDER BY RANDOM(), dirotasi per siswa
+            "info_items": sampler_info.sampel(3, user_id=request.user.id),
+            **konteks_papan_peringkat(request.user),
         }
         return render(request, "core/dashboard.html", context)
 
@@ -86,119 +101,149 @@ def dashboard_view(request):
 @login_required
 @user_passes_test(is_guru, login_url="/login/")
 def teacher_dashboard_view(request):
-    # Logika dashboard guru (tidak berubah)
-    siswa_list = User.objects.filter(role="Siswa")
-    total_siswa = siswa_list.count() if siswa_list.exists() else 1
-    semua_materi = SubTopik.objects.all().order_by("topik__urutan", "urutan")
-    progres_modul_kelas = []
-    for materi in semua_materi:
-        siswa_selesai_count = UserMateriProgress.objects.filter(materi=materi).count()
-        persentase = (siswa_selesai_count / total_siswa) * 100
-        progres_modul_kelas.append(
-            {
-                "nama_materi": materi.judul,
-                "persentase": round(persentase),
-                "label": f"{siswa_selesai_count} dari {total_siswa} siswa",
-            }
-        )
-    siswa_berprestasi = ProfilSiswa.objects.filter(user__role="Siswa").order_by(
-        "-total_poin"
-    )[:3]
-    siswa_perlu_perhatian = ProfilSiswa.objects.filter(
-        user__role="Siswa", total_poin__lt=50
-    ).order_by("total_poin")[:3]
-    total_modul_selesai = UserMateriProgress.objects.count()
-    total_modul_seharusnya = total_siswa * semua_materi.count()
-    avg_completion_rate = (
-        (total_modul_selesai / total_modul_seharusnya) * 100
-        if total_modul_seharusnya > 0
-        else 0
-    )
-    one_week_ago = timezone.now() - timezone.timedelta(days=7)
-    siswa_aktif_count = siswa_list.filter(last_login__gte=one_week_ago).count()
-    top_wrong_q_ids = (
-        QuizAttemptLog.objects.filter(is_correct=False, user__role="Siswa")
-        .values("question")
-        .annotate(wrong_count=Count("question"))
-        .order_by("-wrong_count")[:5]
-    )
-    peta_kesulitan = Pertanyaan.objects.filter(
-        id__in=[item["question"] for item in top_wrong_q_ids]
-    )
+    # KPI kelas dibaca dari snapshot terbaru (satu query), lihat core.analitik_kelas
+    snapshot = snapshot_untuk_dashboard()
     context = {
-        "progres_modul_kelas": progres_modul_kelas,
-        "siswa_berprestasi": siswa_berprestasi,
-        "siswa_perlu_perhatian": siswa_perlu_perhatian,
-        "kpi_avg_completion": round(avg_completion_rate),
-        "kpi_siswa_aktif": f"{siswa_aktif_count} dari {total_siswa} siswa",
-        "peta_kesulitan": peta_kesulitan,
-        "total_siswa": total_siswa,
+        **snapshot.data,
+        "snapshot_dibuat_pada": snapshot.dibuat_pada,
+        "snapshot_umur": umur_teks(snapshot),
+        "snapshot_basi": snapshot_basi(snapshot),
+        "retensi_log_hari": getattr(settings, "EKOSPHERE_RETENSI_LOG_HARI", 90),
         "daftar_materi": SubTopik.objects.filter(pembuat=request.user),
     }
     return render(request, "core/teacher_dashboard.html", context)
 
 
+@login_required
+@require_POST
+@user_passes_test(is_guru, login_url="/login/")
+def perbarui_snapshot_kelas_view(request):
+    sebelumnya = snapshot_kelas_terbaru()
+    if sebelumnya is not None and perbarui_snapshot_kelas(sebelumnya) is sebelumnya:
+        # Snapshot terakhir masih terlalu baru atau sedang dibuat proses lain
+        messages.info(
+            request,
+            f"Data kelas tidak dihitung ulang: snapshot terakhir dibuat {umur_teks(sebelumnya)} "
+            "atau sedang diperbarui. Coba lagi sebentar lagi.",
+        )
+    elif sebelumnya is None:
+        perbarui_snapshot_kelas()
+    return redirect("teacher_dashboard")
+
+
+@login_required
+@user_passes_test(is_guru, login_url="/login/")
+def ekspor_view(request, jenis):
+    # Ekspor streaming (CSV/NDJSON) untuk penilaian, lihat core.ekspor
+    if jenis not in SPESIFIKASI_EKSPOR:
+        raise Http404("Jenis ekspor tidak dikenal")
+    format_ = request.GET.get("format", "csv")
+    if format_ not in FORMAT_EKSPOR:
+        return JsonResponse({"error": "Format harus csv atau ndjson"}, status=400)
+    try:
+        queryset = queryset_ekspor(jenis, request.GET)
+    except FilterEksporTidakValid as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    response = StreamingHttpResponse(
+        alirkan_ekspor(jenis, queryset, format_), content_type=FORMAT_EKSPOR[format_]
+    )
+    nama_berkas = f"{jenis}-{timezone.localdate():%Y%m%d}.{format_}"
+    response["Content-Disposition"] = f'attachment; filename="{nama_berkas}"'
+    return response
+
+
+# Linimasa riwayat di halaman progres: halaman pertama dirender di server,
+# halaman berikutnya diambil dari feed JSON (keyset pagination, core.riwayat)
+JUDUL_RIWAYAT = {
+    "kuis": "Riwayat Kuis",
+    "log-kuis": "Jawaban Kuis",
+    "arena": "Jawaban Arena",
+}
+
+
+def _linimasa_riwayat(siswa_id, nama_url_feed, **kwargs_url):
+    return [
+        {
+            "jenis": jenis,
+            "judul": judul,
+            "halaman": halaman_riwayat(jenis, siswa_id),
+            "url_feed": reverse(nama_url_feed, kwargs={"jenis": jenis, **kwargs_url}),
+        }
+        for jenis, judul in JUDUL_RIWAYAT.items()
+    ]
+
+
+def _feed_riwayat(request, siswa_id, jenis):
+    if jenis not in SPESIFIKASI_RIWAYAT:
+        raise Http404("Jenis riwayat tidak dikenal")
+    # Pesan galat tetap; teks ValueError bisa memuat masukan pengguna
+    try:
+        ukuran = int(request.GET.get("ukuran", UKURAN_HALAMAN))
+    except ValueError:
+        return JsonResponse({"error": "Parameter ukuran harus berupa angka"}, status=400)
+    try:
+        halaman = halaman_riwayat(jenis, siswa_id, request.GET.get("kursor"), ukuran)
+    except KursorTidakValid:
+        return JsonResponse({"error": "Kursor halaman tidak valid"}, status=400)
+    return JsonResponse(halaman)
+
+
 # --- 3. VIEW BARU: DETAIL SISWA VIEW ---
 @login_required
 @user_passes_test(is_guru, login_url="/login/")
 def detail_siswa_view(request, user_id):
-    # Logika detail siswa (tidak berubah)
     siswa = get_object_or_404(User, id=user_id, role="Siswa")
     profil_siswa = get_object_or_404(ProfilSiswa, user=siswa)
-    hasil_kuis = HasilKuis.objects.filter(siswa=siswa).order_by("-waktu_selesai")
     semua_lencana = Lencana.objects.all().order_by("syarat_poin")
     lencana_dimiliki_ids = profil_siswa.lencana.values_list("id", flat=True)
     context = {
         "siswa": siswa,
         "profil_siswa": profil_siswa,
-        "hasil_kuis_list": hasil_kuis,
+        "linimasa_riwayat": _linimasa_riwayat(
+            siswa.id, "riwayat_detail_siswa", user_id=siswa.id
+        ),
         "semua_lencana": semua_lencana,
         "lencana_dimiliki_ids": lencana_dimiliki_ids,
     }
     return render(request, "core/progres.html", context)
 
 
+@login_required
+@user_passes_test(is_guru, login_url="/login/")
+@cache_control(**CACHE_CONTROL_PRIVAT)
+def riwayat_detail_siswa_view(request, user_id, jenis):
+    # Feed JSON riwayat seorang siswa untuk guru: ?kursor=&ukuran=
+    siswa = get_object_or_404(User, id=user_id, role="Siswa")
+    return _feed_riwayat(request, siswa.id, jenis)
+
+
 # --- 4. VIEW SUBTOPIK DETAIL TELAH DIPERBARUI ---
 @login_required
+@cache_control(**CACHE_CONTROL_PRIVAT)
+@condition(etag_func=etag_materi)
 def subtopik_detail_view(request, pk):
-    semua_topik = Topik.objects.all()
     subtopik_aktif = get_object_or_404(SubTopik, pk=pk)
 
     # --- LOGIKA UNTUK NAVIGASI ---
-    semua_subtopik_terurut = list(
-        SubTopik.objects.all().order_by("topik__urutan", "urutan")
-    )  # Ditambahkan order_by
-    try:
-        current_index = semua_subtopik_terurut.index(subtopik_aktif)
-        subtopik_sebelumnya = (
-            semua_subtopik_terurut[current_index - 1] if current_index > 0 else None
-        )
-        subtopik_selanjutnya = (
-            semua_subtopik_terurut[current_index + 1]
-            if current_index < len(semua_subtopik_terurut) - 1
-            else None
-        )
-    except ValueError:
-        # Jika subtopik_aktif tidak ditemukan (seharusnya tidak terjadi dengan get_object_or_404)
-        subtopik_sebelumnya = None
-        subtopik_selanjutnya = None
+    # Sebelumnya/selanjutnya diambil dari indeks kurikulum di memori (tanpa query)
+    subtopik_sebelumnya, subtopik_selanjutnya = indeks_kurikulum.navigasi(
+        subtopik_aktif.id
+    )
     # --- AKHIR LOGIKA NAVIGASI ---
 
     # --- LOGIKA UNTUK PROGRES MISI (Kuis) ---
-    topik_aktif = subtopik_aktif.topik
-    total_subtopik_misi = topik_aktif.subtopik_set.count()
+    topik_aktif = indeks_kurikulum.topik(subtopik_aktif.topik_id)
+    total_subtopik_misi = topik_aktif["jumlah_subtopik"] if topik_aktif else 0
     kuis_selesai_count = 0
     if request.user.is_authenticated and request.user.role == "Siswa":
         kuis_selesai_count = HasilKuis.objects.filter(
-            siswa=request.user, kuis__subtopik__topik=topik_aktif
+            siswa=request.user, kuis__subtopik__topik_id=subtopik_aktif.topik_id
         ).count()
     progres_misi_persen = 0
     if total_subtopik_misi > 0:
         progres_misi_persen = (kuis_selesai_count / total_subtopik_misi) * 100
     # --- AKHIR LOGIKA PROGRES MISI ---
 
-    profil_siswa, created = ProfilSiswa.objects.get_or_create(user=request.user)
-
     # --- LOGIKA BARU UNTUK TOMBOL & SIDEBAR ---
     completed_materi_ids = set()
     is_materi_selesai = False
@@ -212,7 +257,9 @@ def subtopik_detail_view(request, pk):
     # --- AKHIR LOGIKA BARU ---
 
     context = {
-        "semua_topik": semua_topik,
+        # Sidebar diambil dari fragmen yang di-cache, hanya penanda per user yang digabung
+        "sidebar_materi": render_sidebar_materi(subtopik_aktif.id, completed_materi_ids),
+        "punya_kuis": (indeks_kurikulum.subtopik(subtopik_aktif.id) or {}).get("punya_kuis"),
         "subtopik_aktif": subtopik_aktif,
         "subtopik_sebelumnya": subtopik_sebelumnya,
         "subtopik_selanjutnya": subtopik_selanjutnya,
@@ -232,56 +279,15 @@ def subtopik_detail_view(request, pk):
 @login_required
 @user_passes_test(is_siswa, login_url="/login/")
 def kuis_view(request, pk):
-    # Logika view kuis (tidak berubah)
+    # Penilaian set-based ada di core.penilaian.nilai_kuis
     subtopik = get_object_or_404(SubTopik, pk=pk)
     kuis = subtopik.kuis
     if request.method == "POST":
-        total_pertanyaan = kuis.pertanyaan.count()
-        jawaban_benar = 0
-        for pertanyaan in kuis.pertanyaan.all():
-            jawaban_pengguna_id = request.POST.get(f"pertanyaan_{pertanyaan.id}")
-            is_correct_answer = False
-            if jawaban_pengguna_id:
-                try:
-                    pilihan_benar = pertanyaan.pilihan.get(is_benar=True)
-                    if int(jawaban_pengguna_id) == pilihan_benar.id:
-                        jawaban_benar += 1
-                        is_correct_answer = True
-                except PilihanJawaban.DoesNotExist:
-                    pass
-            QuizAttemptLog.objects.create(
-                user=request.user, question=pertanyaan, is_correct=is_correct_answer
-            )
-        skor_saat_ini = (
-            (jawaban_benar / total_pertanyaan) * 100 if total_pertanyaan > 0 else 0
-        )
-        profil_siswa, created = ProfilSiswa.objects.get_or_create(user=request.user)
-        try:
-            hasil_sebelumnya = HasilKuis.objects.get(siswa=request.user, kuis=kuis)
-            skor_sebelumnya = hasil_sebelumnya.skor
-        except HasilKuis.DoesNotExist:
-            skor_sebelumnya = 0.0
-        HasilKuis.objects.update_or_create(
-            siswa=request.user, kuis=kuis, defaults={"skor": skor_saat_ini}
-        )
-        tambahan_poin = 0
-        if skor_saat_ini > skor_sebelumnya:
-            jawaban_benar_sebelumnya = round((skor_sebelumnya / 100) * total_pertanyaan)
-            selisih_jawaban_benar = jawaban_benar - jawaban_benar_sebelumnya
-            tambahan_poin = selisih_jawaban_benar * 10
-            if tambahan_poin > 0:
-                profil_siswa.total_poin += tambahan_poin
-                profil_siswa.save()
-        lencana_baru_didapat = []
-        lencana_yang_belum_dimiliki = Lencana.objects.exclude(profilsiswa=profil_siswa)
-        for lencana in lencana_yang_belum_dimiliki:
-            if profil_siswa.total_poin >= lencana.syarat_poin:
-                profil_siswa.lencana.add(lencana)
-                lencana_baru_didapat.append(lencana)
+        hasil = nilai_kuis(request.user, kuis, jawaban_dari_form(request.POST))
         context = {
-            "skor": skor_saat_ini,
+            "skor": hasil["skor"],
             "kuis": kuis,
-            "lencana_baru": lencana_baru_didapat,
+            "lencana_baru": hasil["lencana_baru"],
         }
         return render(request, "core/kuis_hasil.html", context)
     context = {"kuis": kuis}
@@ -302,53 +308,98 @@ def register_view(request):
 
 
 # --- SISA API & ARENA VIEWS (TIDAK BERUBAH) ---
-def api_klasifikasi_view(request):
-    pertanyaan = PertanyaanArena.objects.filter(tipe="klasifikasi").first()
-    if pertanyaan:
-        return JsonResponse(pertanyaan.konten_json)
+@cache_control(**CACHE_CONTROL_PUBLIK)
+@condition(etag_func=etag_arena)
+async def api_klasifikasi_view(request):
+    # View async: di bawah ASGI tidak memakai thread per request
+    # JSON sudah diserialisasi di pool arena (core.arena)
+    pool = await pool_arena.apool("klasifikasi")
+    if pool:
+        return HttpResponse(pool["pertama_bytes"], content_type="application/json")
     return JsonResponse({"error": "Data tidak ditemukan"}, status=404)
 
 
+@login_required
+def api_papan_peringkat_view(request):
+    try:
+        halaman = max(int(request.GET.get("halaman", 1)), 1)
+        ukuran = min(max(int(request.GET.get("ukuran", 20)), 1), 100)
+    except ValueError:
+        return JsonResponse({"error": "Parameter halaman/ukuran tidak valid"}, status=400)
+    return JsonResponse(
+        {
+            "halaman": halaman,
+            "ukuran": ukuran,
+            "total": papan_peringkat.total(),
+            "data": papan_peringkat.halaman(halaman, ukuran),
+            "saya": papan_peringkat.peringkat(request.user.id),
+        }
+    )
+
+
+# Data statis; diserialisasi sekali saat modul dimuat. Sebelumnya "organisme"
+# berisi placeholder `[...]` (Ellipsis) yang membuat JsonResponse gagal (500).
+DATA_RANTAI_MAKANAN = json.dumps({"nama": "Rawa Gambut", "organisme": []}).encode()
+ETAG_RANTAI_MAKANAN = etag_statis(DATA_RANTAI_MAKANAN)
+
+
+@cache_control(**CACHE_CONTROL_PUBLIK)
+@condition(etag_func=lambda request: ETAG_RANTAI_MAKANAN)
 def api_rantai_makanan_view(request):
-    data_ekosistem = {"nama": "Rawa Gambut", "organisme": [...]}  # Data statis
-    return JsonResponse(data_ekosistem)
+    return HttpResponse(DATA_RANTAI_MAKANAN, content_type="application/json")
 
 
 @login_required
 @user_passes_test(is_siswa, login_url="/login/")
 def duel_simbiosis_view(request):
-    # Logika duel simbiosis (tidak berubah)
-    pertanyaan_list = PertanyaanArena.objects.filter(tipe="kartu_simbiosis")
-    data_untuk_js = []
-    for p in pertanyaan_list:
-        konten = p.konten_json
-        konten["id"] = p.id
-        data_untuk_js.append(konten)
-    pertanyaan_json = mark_safe(json.dumps(data_untuk_js))
-    profil_siswa, created = ProfilSiswa.objects.get_or_create(user=request.user)
+    pool = pool_arena.pool("kartu_simbiosis")
+    pertanyaan_json = mark_safe(pool["daftar"] if pool else "[]")
+    profil_siswa = ambil_profil_siswa(request)
     context = {"pertanyaan_json": pertanyaan_json, "profil_siswa": profil_siswa}
     return render(request, "core/arena_duel_simbiosis.html", context)
 
 
+@transaksi_tulis
+def _simpan_jawaban_arena(request, pertanyaan, jawaban_benar):
+    JawabanSiswa.objects.create(
+        siswa=request.user, pertanyaan=pertanyaan, jawaban_benar=jawaban_benar
+    )
+    if not jawaban_benar:
+        return ambil_profil_siswa(request).total_poin, []
+    # Increment atomik: hanya kolom total_poin yang ditulis
+    profil_id, poin_lama, total_poin = tambah_poin(request.user, POIN_JAWABAN_ARENA)
+    return total_poin, berikan_lencana(profil_id, request.user.id, poin_lama, total_poin)
+
+
 @login_required
 @require_POST
 @user_passes_test(is_siswa, login_url="/login/")
-def api_simpan_jawaban_view(request):
-    # Logika simpan jawaban arena (tidak berubah)
-    data = json.loads(request.body)
-    pertanyaan_id = data.get("pertanyaan_id")
-    jawaban_benar = data.get("jawaban_benar")
+async def api_simpan_jawaban_view(request):
+    # View async. ORM async Django belum mendukung transaksi, jadi blok tulis
+    # (_simpan_jawaban_arena) tetap sinkron dan dijalankan lewat sync_to_async.
+    # request.user (lazy) dan request.auser() punya cache masing-masing; pakai
+    # user yang sudah dimuat login_required agar tidak di-query dua kali
+    request.user = await request.auser()
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise TypeError
+        pertanyaan_id = int(data.get("pertanyaan_id"))
+        jawaban_benar = data.get("jawaban_benar")
+    except (json.JSONDecodeError, ValueError, TypeError):
+        # Body bukan objek JSON atau pertanyaan_id bukan angka
+        return JsonResponse({"status": "gagal", "error": "Data jawaban tidak valid"}, status=400)
     try:
-        pertanyaan = PertanyaanArena.objects.get(id=pertanyaan_id)
-        profil_siswa, created = ProfilSiswa.objects.get_or_create(user=request.user)
-        JawabanSiswa.objects.create(
-            siswa=request.user, pertanyaan=pertanyaan, jawaban_benar=jawaban_benar
+        pertanyaan = await PertanyaanArena.objects.aget(id=pertanyaan_id)
+        total_poin, lencana_baru = await sync_to_async(_simpan_jawaban_arena)(
+            request, pertanyaan, jawaban_benar
         )
-        if jawaban_benar:
-            profil_siswa.total_poin += 10
-            profil_siswa.save()
         return JsonResponse(
-            {"status": "sukses", "total_poin_baru": profil_siswa.total_poin}
+            {
+                "status": "sukses",
+                "total_poin_baru": total_poin,
+                "lencana_baru": [lencana.nama for lencana in lencana_baru],
+            }
         )
     except PertanyaanArena.DoesNotExist:
         return JsonResponse(
@@ -359,13 +410,12 @@ def api_simpan_jawaban_view(request):
 @login_required
 @user_passes_test(is_siswa, login_url="/login/")
 def jejak_predator_view(request):
-    # Logika jejak predator (tidak berubah)
-    cerita = PertanyaanArena.objects.filter(tipe="cerita_predator").first()
-    cerita_json = mark_safe(json.dumps(cerita.konten_json)) if cerita else None
-    profil_siswa, created = ProfilSiswa.objects.get_or_create(user=request.user)
+    pool = pool_arena.pool("cerita_predator")
+    cerita_json = mark_safe(pool["pertama"]) if pool else None
+    profil_siswa = ambil_profil_siswa(request)
     context = {
         "cerita_json": cerita_json,
-        "pertanyaan_id": cerita.id if cerita else None,
+        "pertanyaan_id": pool["pertama_id"] if pool else None,
         "profil_siswa": profil_siswa,
     }
     return render(request, "core/arena_jejak_predator.html", context)
@@ -374,14 +424,12 @@ def jejak_predator_view(request):
 @login_required
 @user_passes_test(is_siswa, login_url="/login/")
 def progres_view(request):
-    # Logika progres siswa (tidak berubah)
-    profil_siswa = get_object_or_404(ProfilSiswa, user=request.user)
-    hasil_kuis = HasilKuis.objects.filter(siswa=request.user).order_by("-waktu_selesai")
+    profil_siswa = ambil_profil_siswa(request)
     semua_lencana = Lencana.objects.all().order_by("syarat_poin")
     lencana_dimiliki_ids = profil_siswa.lencana.values_list("id", flat=True)
     context = {
         "profil_siswa": profil_siswa,
-        "hasil_kuis_list": hasil_kuis,
+        "linimasa_riwayat": _linimasa_riwayat(request.user.id, "riwayat_progres"),
         "semua_lencana": semua_lencana,
         "lencana_dimiliki_ids": lencana_dimiliki_ids,
         "siswa": request.user,
@@ -389,12 +437,33 @@ def progres_view(request):
     return render(request, "core/progres.html", context)
 
 
+@login_required
+@user_passes_test(is_siswa, login_url="/login/")
+@cache_control(**CACHE_CONTROL_PRIVAT)
+def riwayat_progres_view(request, jenis):
+    # Feed JSON riwayat milik siswa yang login: ?kursor=&ukuran=
+    return _feed_riwayat(request, request.user.id, jenis)
+
+
+# Penulisan progres dalam satu transaksi tulis; penghitung modul
+# (StatistikModul) ikut diperbarui oleh sinyal di core/signals.py
+@transaksi_tulis
+def _tandai_selesai(user, materi):
+    UserMateriProgress.objects.get_or_create(user=user, materi=materi)
+
+
+@transaksi_tulis
+def _batalkan_selesai(user, materi):
+    jumlah_dihapus, _ = UserMateriProgress.objects.filter(user=user, materi=materi).delete()
+    return jumlah_dihapus
+
+
 # --- VIEW TANDAI SELESAI (SUDAH BENAR) ---
 @login_required
 @user_passes_test(is_siswa, login_url="/login/")
 def tandai_materi_selesai_view(request, pk):
     materi = get_object_or_404(SubTopik, pk=pk)
-    UserMateriProgress.objects.get_or_create(user=request.user, materi=materi)
+    _tandai_selesai(request.user, materi)
     messages.success(request, f"Materi '{materi.judul}' telah ditandai selesai!")
     return redirect("subtopik_detail", pk=pk)
 
@@ -404,9 +473,7 @@ def tandai_materi_selesai_view(request, pk):
 @user_passes_test(is_siswa, login_url="/login/")
 def batalkan_materi_selesai_view(request, pk):
     materi = get_object_or_404(SubTopik, pk=pk)
-    progress_entry = UserMateriProgress.objects.filter(user=request.user, materi=materi)
-    if progress_entry.exists():
-        progress_entry.delete()
+    if _batalkan_selesai(request.user, materi):
         messages.info(
             request, f"Materi '{materi.judul}' ditandai sebagai 'Belum Selesai'."
         )
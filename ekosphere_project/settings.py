@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +44,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Hanya aktif jika EKOSPHERE_INSTRUMENTASI = True (lihat di bawah)
+    "core.middleware.InstrumentasiQueryMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -79,9 +83,138 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Database uji berupa berkas (bukan :memory:) agar uji penulis serentak
+        # (core.tests.TransaksiTulisTest) memakai WAL dan penguncian berkas
+        # yang sama dengan produksi
+        "TEST": {"NAME": Path(tempfile.gettempdir()) / "ekosphere_test.sqlite3"},
     }
 }
 
+# Mode produksi SQLite (EKOSPHERE_SQLITE_PRODUKSI=1): pragma di bawah diterapkan
+# pada setiap koneksi baru (core.basisdata.terapkan_pragma_sqlite) dan transaksi
+# tulis (core.basisdata.transaksi_tulis) mengantre per proses lalu dibuka dengan
+# BEGIN IMMEDIATE, sehingga penulis serentak menunggu giliran (antrean di dalam
+# proses, busy_timeout antarproses) alih-alih gagal dengan "database is locked".
+# Transaksi lain tetap BEGIN biasa agar pembaca tidak ikut mengantre.
+# BEGIN IMMEDIATE per transaksi membutuhkan Django 5.1+.
+EKOSPHERE_SQLITE_PRODUKSI = os.environ.get("EKOSPHERE_SQLITE_PRODUKSI") == "1"
+
+# Anggaran tunggu penulis dihitung dari jumlah penulis serentak yang harus
+# dilayani dan biaya satu transaksi tulis (diukur dengan `python manage.py
+# stress_penulisan`: ~25 ms per transaksi pada data sintetis). Penulis
+# terakhir dalam antrean menunggu kira-kira PENULIS x BIAYA; dua kali lipatnya
+# dipakai sebagai batas antrean per proses (core.basisdata._antrean_tulis)
+# maupun busy_timeout SQLite untuk penulis dari proses lain.
+EKOSPHERE_SQLITE_PENULIS_SERENTAK = int(os.environ.get("EKOSPHERE_SQLITE_PENULIS_SERENTAK", 200))
+EKOSPHERE_SQLITE_BIAYA_TULIS_MS = 25
+EKOSPHERE_SQLITE_ANTREAN_MS = 2 * EKOSPHERE_SQLITE_PENULIS_SERENTAK * EKOSPHERE_SQLITE_BIAYA_TULIS_MS
+EKOSPHERE_SQLITE_PRAGMA = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": EKOSPHERE_SQLITE_ANTREAN_MS,  # milidetik
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negatif = KiB, yaitu 64 MiB
+    "temp_store": "MEMORY",
+}
+if EKOSPHERE_SQLITE_PRODUKSI:
+    DATABASES["default"]["OPTIONS"] = {"timeout": EKOSPHERE_SQLITE_ANTREAN_MS / 1000}
+
+# Pengulangan transaksi tulis (core.basisdata.transaksi_tulis) saat database
+# terkunci: jumlah percobaan dan jeda awal (detik, berlipat dua tiap percobaan)
+EKOSPHERE_RETRY_TULIS = {"percobaan": 5, "jeda_awal": 0.05}
+
+
+# Cache
+# Stempel versi konten (core/versi.py) disimpan di cache ini. Jika aplikasi
+# dijalankan dengan lebih dari satu proses worker, isi EKOSPHERE_CACHE_URL
+# (redis://host:6379/0 atau memcached://host:11211) agar invalidasi sampai ke
+# semua proses. Tanpa itu dipakai LocMem yang hanya terlihat oleh prosesnya
+# sendiri; stempelnya lalu kedaluwarsa setelah EKOSPHERE_VERSI_TTL detik
+# sehingga proses lain paling lambat selama itu melihat data basi.
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+EKOSPHERE_CACHE_URL = os.environ.get("EKOSPHERE_CACHE_URL", "")
+if EKOSPHERE_CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": EKOSPHERE_CACHE_URL,
+        }
+    }
+elif EKOSPHERE_CACHE_URL.startswith("memcached://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": EKOSPHERE_CACHE_URL.removeprefix("memcached://"),
+        }
+    }
+else:
+    # Per siswa aktif ada sekitar empat kunci hidup (stempel data, snapshot
+    # dashboard, parameter dan posisi rotasi info), ditambah snapshot basi
+    # yang menunggu digusur. 300 ribu entri cukup untuk 50 ribu siswa; ukur
+    # dengan `python manage.py ukur_cache_snapshot`. Hit rate snapshot di sini
+    # tetap dibatasi EKOSPHERE_VERSI_TTL: setiap stempel yang kedaluwarsa
+    # membuat semua snapshot turunannya tidak terpakai. Untuk kelas sebesar
+    # itu gunakan EKOSPHERE_CACHE_URL.
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "ekosphere",
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.environ.get("EKOSPHERE_CACHE_MAKS_ENTRI", 300_000)),
+            },
+        }
+    }
+
+# Umur stempel versi (detik); None = tidak kedaluwarsa (cache bersama)
+EKOSPHERE_VERSI_TTL = None if EKOSPHERE_CACHE_URL else 60
+
+# Jumlah maksimum kunci jawaban kuis yang disimpan di memori tiap proses
+EKOSPHERE_CACHE_KUNCI_JAWABAN_MAKS = 256
+
+# Papan peringkat di memori dibangun ulang dari database paling lambat setiap
+# sekian detik, agar perubahan poin dari proses lain ikut terlihat
+EKOSPHERE_PAPAN_PERINGKAT_TTL = 60
+
+# Instrumentasi query per view (core.middleware.InstrumentasiQueryMiddleware).
+# Ringkasan: `python manage.py laporan_query`
+EKOSPHERE_INSTRUMENTASI = False
+EKOSPHERE_INSTRUMENTASI_LOG = BASE_DIR / "instrumentasi_query.jsonl"
+# Catatan ditampung di memori dan ditulis ke log setiap sekian baris (atau
+# paling lambat tiap 5 detik)
+EKOSPHERE_INSTRUMENTASI_BUFFER = 100
+if EKOSPHERE_INSTRUMENTASI:
+    # Waktu render template diukur oleh backend ini; tanpa instrumentasi
+    # backend bawaan Django dipakai apa adanya
+    TEMPLATES[0]["BACKEND"] = "core.middleware.DjangoTemplatesTerukur"
+# Budget per nama URL. "*" berlaku untuk semua view; budget per view hanya
+# menimpa kunci yang disebutnya (kunci lain tetap dari "*").
+# Kunci yang didukung: query (jumlah), db_ms (total waktu SQL), duplikat
+# (jumlah sidik jari query yang berulang dalam satu request).
+EKOSPHERE_BUDGET_QUERY = {
+    "*": {"query": 20, "db_ms": 200, "duplikat": 0},
+    "teacher_dashboard": {"query": 15, "db_ms": 300},
+    "subtopik_detail": {"query": 10},
+    "api_simpan_jawaban": {"query": 12},
+}
+
+# Log jawaban (QuizAttemptLog/JawabanSiswa) yang lebih tua dari sekian hari
+# dipadatkan ke rekap harian oleh `python manage.py kompaksi_log`
+EKOSPHERE_RETENSI_LOG_HARI = 90
+
+# Snapshot KPI dashboard guru (core.analitik_kelas). Dashboard selalu menampilkan
+# snapshot terakhir dan menandainya basi jika lebih tua dari MAKS_UMUR detik;
+# snapshot baru dibuat oleh `python manage.py buat_snapshot_kelas` (jadwalkan
+# lewat cron) atau tombol "Perbarui", yang diabaikan jika snapshot terakhir lebih
+# muda dari JEDA_MINIMUM detik. Hanya SIMPAN snapshot terbaru yang dipertahankan.
+EKOSPHERE_SNAPSHOT_KELAS_MAKS_UMUR = 15 * 60
+EKOSPHERE_SNAPSHOT_KELAS_JEDA_MINIMUM = 30
+EKOSPHERE_SNAPSHOT_KELAS_SIMPAN = 500
+
+# Regex sidik jari query (lihat core.middleware.sidik_jari_sql) yang boleh
+# melakukan full scan/temp B-tree di `python manage.py cek_query_plan`
+EKOSPHERE_QUERY_PLAN_DIIZINKAN = []
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -101,6 +234,16 @@ AUTH_PASSWORD_VALIDATORS = [
     # },
 ]
 
+# Validator password untuk baris roster (`python manage.py impor_roster`) yang
+# mencantumkan password. Selama AUTH_PASSWORD_VALIDATORS kosong, roster tetap
+# memakai validator bawaan Django agar impor massal tidak melonggarkan aturan.
+EKOSPHERE_ROSTER_VALIDATOR_PASSWORD = AUTH_PASSWORD_VALIDATORS or [
+    {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
+    {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
+    {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator"},
+    {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/